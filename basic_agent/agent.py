@@ -1,47 +1,161 @@
 from termcolor import colored
-from tool_functions import basic_calculator, reverse_string, timer, summarise_text
-import requests, json, aiohttp, asyncio
-
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text, PURE_TOOLS
+from ollama_client import OllamaPool, default_client, make_client
+from json_stream import IncrementalJsonParser
+from router import IntentRouter
+from model_registry import registry
+from response_cache import LayeredCache, SqliteCache, TTLCache, MISSING, make_key, normalize_prompt
+from singleflight import SingleFlight
+from prompts import PromptBuilder, MODES as PROMPT_MODES
+from tool_executor import default_executor
+from metrics import metrics, span, debug, set_debug, STAGE_SECONDS
+import argparse, functools, json, time, aiohttp, asyncio
+
+
+# timing and token counts Ollama reports in the final chunk of every response (durations in nanoseconds)
+OLLAMA_STATS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
+OLLAMA_SECONDS = metrics.histogram("ollama_request_seconds", "Wall-clock time of Ollama requests, as seen by the agent.")
+OLLAMA_TTFT = metrics.histogram("ollama_ttft_seconds", "Time from sending a streaming Ollama request to its first token.")
+OLLAMA_QUEUE = metrics.histogram("ollama_queue_seconds", "Part of an Ollama request spent outside Ollama's own processing: "
+                                                         "waiting for a connection, on the network and in Ollama's queue.")
+OLLAMA_PHASES = metrics.histogram("ollama_phase_seconds", "Ollama's reported model load, prompt evaluation and generation times.")
+OLLAMA_TOKENS = metrics.counter("ollama_tokens_total", "Tokens Ollama evaluated (prompt) and generated (eval).")
+OLLAMA_ERRORS = metrics.counter("ollama_errors_total", "Ollama requests that failed.")
+AGENT_TURNS = metrics.counter("agent_turns_total", "Agent turns by how the decision was made: routed, cached or model.")
+
+def record_ollama_stats(stats, elapsed, mode):
+    """
+    Records one Ollama request: its wall-clock time and, if the response was complete, Ollama's own
+    durations (in nanoseconds) and token counts.
+    """
+    OLLAMA_SECONDS.observe(elapsed, mode = mode)
+    if "total_duration" in stats:
+        OLLAMA_QUEUE.observe(max(0.0, elapsed - stats["total_duration"] / 1e9), mode = mode)
+    for phase in ("load", "prompt_eval", "eval"):
+        if f"{phase}_duration" in stats:
+            OLLAMA_PHASES.observe(stats[f"{phase}_duration"] / 1e9, phase = phase)
+    for kind in ("prompt_eval", "eval"):
+        if f"{kind}_count" in stats:
+            OLLAMA_TOKENS.inc(stats[f"{kind}_count"], kind = "prompt" if kind == "prompt_eval" else "eval")
 
 class OllamaModel:
-    def __init__(self, model, system_prompt, temperature = 0.2, stop = None):
+    def __init__(self, model, system_prompt, temperature = 0.2, stop = None, client = None, keep_alive = "30m",
+                 coalesce = True):
         """
         Initializes the OllamaModel with the given parameters.
+
+        The HTTP connection pool lives in `client` (the shared `default_client` unless one is given),
+        so creating a new OllamaModel doesn't open new connections. `keep_alive` asks Ollama to keep the
+        model, and with it the evaluated system-prompt prefix, loaded between requests. With `coalesce`,
+        concurrent calls with the same prompt share a single Ollama request.
         """
-        self.model_endpoint = "http://localhost:11434/api/generate"
+        self.client = client or default_client
+        self.model_endpoint = f"{self.client.base_url}/api/generate"
         self.temperature = temperature
         self.model = model
         self.system_prompt = system_prompt
-        self.headers = {"Content-Type": "application/json"}
         self.stop = stop
+        self.keep_alive = keep_alive
+        self.last_stats = {}
+        self.flight = SingleFlight() if coalesce else None
 
-    async def generate_text(self, prompt):
+    def build_payload(self, prompt, stream = False):
         """
-        Generates a response from the Ollama model based on the provided prompt.
+        Builds the JSON body of a generate request for the given prompt.
+
+        The system prompt is sent byte-for-byte the same on every call, so Ollama can reuse the KV cache
+        of that prefix and only evaluate the new prompt tokens. The `context` Ollama returns is
+        deliberately not sent back: it encodes the previous prompt and answer, so it would replay the
+        last turn in front of every new one.
         """
-        payload = {
+        return {
             "model": self.model,
             "format": "json",
             "prompt": prompt,
             "system": self.system_prompt,
-            "stream": False,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
             "temperature": self.temperature,
             "stop": self.stop
         }
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.model_endpoint, headers = self.headers, json = payload) as request_response:
-                    request_response_json = await request_response.json()
-                    response = request_response_json['response']
-                    response_dict = json.loads(response)
-
-                    print(f"\n\n[ollama response]: {response_dict}")
+    async def generate_text(self, prompt):
+        """
+        Generates a response from the Ollama model based on the provided prompt.
+        """
+        payload = self.build_payload(prompt)
+        start = time.perf_counter()
 
-                    return response_dict
-        except aiohttp.ClientError as e:
+        try:
+            if self.flight is None:
+                request_response_json = await self.client.generate(payload)
+            else:
+                request_response_json = await self.flight.do(make_key(payload), lambda: self.client.generate(payload))
+            self.last_stats = {key: request_response_json[key] for key in OLLAMA_STATS if key in request_response_json}
+            record_ollama_stats(self.last_stats, time.perf_counter() - start, "generate")
+            response = request_response_json['response']
+            with span("parse"):
+                response_dict = json.loads(response)
+
+            debug(f"\n\n[ollama response]: {response_dict}")
+
+            return response_dict
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            OLLAMA_ERRORS.inc(error = type(e).__name__)
             response = {"[error]": f"Error in invoking model! {str(e)}."}
             return response
+
+    async def stream_text(self, prompt, stats = None):
+        """
+        Streams the response of the Ollama model token by token as it is generated.
+
+        If the request fails, the error is kept in `stats["error"]`. When nothing was yielded yet, a `no tool`
+        answer carrying the error is yielded as well, so callers receive a well-formed agent response; once
+        tokens have gone out, nothing more is yielded, since it would run into the JSON already sent.
+
+        Parameters:
+        prompt (str): The user's prompt.
+        stats (dict): Optional dictionary filled with the timings of this call: `ttft` and `total` in
+                      seconds, plus Ollama's token counts and durations if the stream ran to completion,
+                      and `error` if it failed.
+
+        Yields:
+        str: Pieces of the JSON response text as Ollama produces them.
+        """
+        payload = self.build_payload(prompt, stream = True)
+        stats = {} if stats is None else stats
+        stats["ttft"] = None
+        stats["error"] = None
+        start = time.perf_counter()
+
+        if self.flight is None:
+            chunks = self.client.stream(payload)
+        else:
+            # identical concurrent prompts read the same Ollama stream
+            chunks = self.flight.stream(make_key(payload), lambda: self.client.stream(payload))
+        try:
+            async for chunk in chunks:
+                token = chunk.get("response", "")
+                if token:
+                    if stats["ttft"] is None:
+                        stats["ttft"] = time.perf_counter() - start
+                        OLLAMA_TTFT.observe(stats["ttft"])
+                    yield token
+                if chunk.get("done"):
+                    stats.update({key: chunk[key] for key in OLLAMA_STATS if key in chunk})
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            OLLAMA_ERRORS.inc(error = type(e).__name__)
+            stats["error"] = f"Error in invoking model! {str(e)}."
+            if stats["ttft"] is None:
+                yield json.dumps({"tool_choice": "no tool", "tool_input": f"[error]: {stats['error']}"})
+        finally:
+            # closing early releases the connection, which tells Ollama to stop generating
+            await chunks.aclose()
+            stats["total"] = time.perf_counter() - start
+            self.last_stats = stats
+            record_ollama_stats(stats, stats["total"], "stream")
+
 class ToolBox:
     def __init__(self):
         self.tools_dict = {}
@@ -72,171 +186,304 @@ class ToolBox:
             tools_str += f"{name}: \"{doc}\"\n"
         return tools_str.strip()
     
-system_prompt_template = """
-You are an intelligent AI assistant with access to specific tools. Your responses must ALWAYS be in this JSON format:
-{{
-    "tool_choice": "name_of_the_tool",
-    "tool_input": "inputs_to_the_tool"
-}}
-
-TOOLS AND WHEN TO USE THEM:
-
-1. basic_calculator: Use for ANY mathematical calculations
-   - Input format: {{"num1": number, "num2": number, "operation": "add/subtract/multiply/divide"}}
-   - Supported operations: add/plus, subtract/minus, multiply/times, divide
-   - Example inputs and outputs:
-     Input: "Calculate 15 plus 7"
-     Output: {{"tool_choice": "basic_calculator", "tool_input": {{"num1": 15, "num2": 7, "operation": "add"}}}}
-     
-     Input: "What is 100 divided by 5?"
-     Output: {{"tool_choice": "basic_calculator", "tool_input": {{"num1": 100, "num2": 5, "operation": "divide"}}}}
-
-2. reverse_string: Use for ANY request involving reversing text
-   - Input format: Just the text to be reversed as a string
-   - ALWAYS use this tool when user mentions "reverse", "backwards", or asks to reverse text
-   - Example inputs and outputs:
-     Input: "Reverse of 'Howwwww'?"
-     Output: {{"tool_choice": "reverse_string", "tool_input": "Howwwww"}}
-     
-     Input: "What is the reverse of Python?"
-     Output: {{"tool_choice": "reverse_string", "tool_input": "Python"}}
-
-3. timer: Use for setting a timer for a specified duration
-   - Input format: The duration of the timer in seconds as a string
-   - ALWAYS use this tool when user mentions "timer" or asks to set a timer or a countdown
-   - Example inputs and outputs:
-     Input: "Set a timer for 10 seconds"
-     Output: {{"tool_choice": "timer", "tool_input": "10"}}
-
-     Input: "Timer for 60 seconds"
-     Output: {{"tool_choice": "timer", "tool_input": "60"}}
-
-     Input: "Timer for seconds"
-     Output: {{"tool_choice": "timer", "tool_input": "Error: Invalid duration. Please provide a valid number of seconds."}}
-
-4. summarise_text: Use for summarizing text
-   - Input format: The text to be summarized as a string
-   - ALWAYS use this tool when user mentions "summarize" or asks to summarize text
-   - Simply extract the text to be summarized from the prompt and pass it to this tool; DO NOT summarize the text yourself
-   - Example inputs and outputs:
-     Input: "Summarize the text: 'This is a long text that needs to be summarized.'"
-     Output: {{"tool_choice": "summarise_text", "tool_input": "This is a long text that needs to be summarized."}}
-
-     Input: "Can you summarize 'this paragraph'?"
-     Output: {{"tool_choice": "summarise_text", "tool_input": "'this paragraph'"}}
-
-     Input: "Generate a summary of this 'long paragraph'."
-     Output: {{"tool_choice": "summarise_text", "tool_input": "'long paragraph'"}}
-
-5. no tool: Use for general conversation and questions
-   - Example inputs and outputs:
-     Input: "Who are you?"
-     Output: {{"tool_choice": "no tool", "tool_input": "I am an AI assistant that can help you with calculations, reverse text, and answer questions. I can perform mathematical operations and reverse strings. How can I help you today?"}}
-     
-     Input: "How are you?"
-     Output: {{"tool_choice": "no tool", "tool_input": "I'm functioning well, thank you for asking! I'm here to help you with calculations, text reversal, or answer any questions you might have."}}
-
-STRICT RULES:
-1. For questions about identity, capabilities, feelings, and general questions:
-   - ALWAYS use `no tool`
-   - ALWAYS provide a complete, friendly response
-   - If user asks a question, ALWAYS answer it; do not simply repeat the question
-   - ALWAYS keep your answers relevant to the user's query
-   - If the user asks a question like 'What can you do?', ALWAYS mention your capabilities
-
-2. For ANY text reversal request:
-   - ALWAYS use `reverse_string`
-   - Extract ONLY the text to be reversed
-   - Provide the text as is to the reversal tool; do not modify it before sending it to `reverse_string`
-   - Remove quotes, "reverse of", and other extra text
-
-3. For ANY math operations:
-   - ALWAYS use `basic_calculator`
-   - Extract the numbers and operation
-   - Convert text numbers to digits
-
-4. For ANY timer requests:
-   - ALWAYS use `timer`
-   - Extract the duration in seconds
-   - Ensure the duration is a valid number
-   - If the duration is not provided, tell the user to try again; DO NOT set a timer
-
-5. For ANY text summarization requests:
-   - ALWAYS use `summarise_text`
-   - If the user requests a summary, ALWAYS delegate the task to the `summarise_text` tool; DO NOT summarize the text yourself
-   - DO NOT modify the text given in the prompt before sending it to `summarise_text`
-   - Use the entire text given in the prompt as the input to `summarise_text`; DO NOT pass your own summary
-   - STRICTLY follow the input format for the `summarise_text` tool
-
-Here is a list of your tools along with their descriptions:
-{tool_descriptions}
-
-Remember: Your response must ALWAYS be valid JSON with "tool_choice" and "tool_input" fields.
-"""
-
 class Agent:
-    def __init__(self, tools, model_service, model_name, stop = None):
+    def __init__(self, tools, model_service, model_name, stop = None, router = None, cache = None, coalesce = True,
+                 executor = None, prompt_mode = "full", prefilter = False):
         """
         Initializes the agent with a list of tools and a model.
+
+        `router` is an optional fast-path router (e.g. router.IntentRouter) whose `route(prompt)` returns
+        a decision dictionary for prompts it can resolve without the model, or None to fall back to it.
+        `cache` is an optional response_cache.LayeredCache for the model's decisions and the results of
+        pure tools; its on-disk tier is used from worker threads. With `coalesce`, concurrent calls of a pure tool with the same
+        input share one execution. Tools are run by `executor` (the shared `default_executor` unless one is
+        given), which applies each tool's declared mode, timeout and concurrency limit.
+        The system prompt is rendered from the tools' docs (see prompts.py) in `prompt_mode` ("full" or
+        "compact"); with `prefilter`, each prompt is only shown the tools its keywords point to.
         """
         self.tools = tools
+        self.router = router
+        self.cache = cache
         self.model_service = model_service
         self.model_name = model_name
         self.stop = stop
-        print("[agent]: Agent initialized with model:", model_name)
-
-    def prepare_tools(self):
+        self.flight = SingleFlight() if coalesce else None
+        self.executor = executor or default_executor
+        self.prompts = PromptBuilder(mode = prompt_mode, prefilter = prefilter)
+        self.system_prompt = None
+        self.system_prompt_hash = None
+        self._tool_docs = None
+        self._model_instances = {}  # names of the offered tools -> (model instance, system prompt, its hash)
+        self._tools_key = None
+        debug("[agent]: Agent initialized with model:", model_name)
+
+    def model_instance(self, prompt = None):
         """
-        Stores the tools in the toolbox and returns their descriptions.
+        Returns the instance of the model service with the system prompt for the tools offered for the prompt.
+
+        A system prompt is rendered and an instance created once per set of offered tools: just one set
+        without the pre-filter, or without a prompt. All of them are rebuilt only when `self.tools` changes.
         """
-        toolbox = ToolBox()
-        toolbox.store(self.tools)
-        tool_descriptions = toolbox.tools()
-        return tool_descriptions
+        tools_key = tuple(self.tools)
+        if tools_key != self._tools_key:
+            self._tool_docs = self.prompts.tool_docs(self.tools)
+            self._model_instances = {}
+            self._tools_key = tools_key
+
+        docs = self.prompts.select(self._tool_docs, prompt)
+        names = tuple(doc.name for doc in docs)
+        entry = self._model_instances.get(names)
+        if entry is None:
+            with span("prompt_build"):
+                system_prompt = self.prompts.render(docs)
+            instance = self.model_service(
+                model = self.model_name,
+                system_prompt = system_prompt,
+                temperature = 0.2,
+                stop = self.stop
+            )
+            entry = self._model_instances[names] = (instance, system_prompt, make_key(system_prompt))
+        _, self.system_prompt, self.system_prompt_hash = entry
+        return entry[0]
 
     async def think(self, prompt):
         """
-        Runs the generate_text method on the model using the system prompt template and tool descriptions.
+        Runs the generate_text method on the model using the system prompt built from the tool docs.
         """
-        tool_descriptions = self.prepare_tools()
-        agent_system_prompt = system_prompt_template.format(tool_descriptions = tool_descriptions)
-
-        # create an instance of the model service with the system prompt
-        model_instance = self.model_service(
-            model = self.model_name,
-            system_prompt = agent_system_prompt,
-            temperature = 0.2,
-            stop = self.stop
-        )
+        model_instance = self.model_instance(prompt)
 
         # generate and return the response dictionary
-        print("[agent]: Thinking...\n")
+        debug("[agent]: Thinking...\n")
         agent_response_dict = await model_instance.generate_text(prompt)
         return agent_response_dict
 
-    async def work(self, prompt):
+    async def run_tool(self, prompt, tool_choice, tool_input):
+        """
+        Executes the tool chosen by the model, or returns the model's own answer when no tool matches.
+
+        Results of pure tools are memoized in the cache, if the agent has one; errors aren't cached.
+        Concurrent identical calls of a pure tool share one execution.
         """
-        Parses the dictionary returned from think and executes the appropriate tool.
+        if tool_choice not in PURE_TOOLS or (self.cache is None and self.flight is None):
+            return await self.call_tool(prompt, tool_choice, tool_input)
+
+        # the summarizer works on the whole prompt rather than the model's tool input
+        key = make_key("tool", tool_choice, normalize_prompt(prompt) if tool_choice == "summarise_text" else tool_input)
+        response = await self.cache.aget(key) if self.cache is not None else MISSING
+        if response is MISSING:
+            if self.flight is None:
+                response = await self.call_and_cache(key, prompt, tool_choice, tool_input)
+            else:
+                response = await self.flight.do(key, lambda: self.call_and_cache(key, prompt, tool_choice, tool_input))
+        return response
+
+    async def call_and_cache(self, key, prompt, tool_choice, tool_input):
         """
-        agent_response_dict = await self.think(prompt)
-        tool_choice = agent_response_dict.get("tool_choice")
-        tool_input = agent_response_dict.get("tool_input")
+        Calls a pure tool and caches its response under the key, unless it is an error.
+        """
+        response = await self.call_tool(prompt, tool_choice, tool_input)
+        if self.cache is not None and not str(response).startswith("[error]"):
+            await self.cache.aset(key, response)
+        return response
 
+    async def call_tool(self, prompt, tool_choice, tool_input):
+        """
+        Calls the chosen tool, or returns the model's own answer when no tool matches.
+        """
         if tool_choice == "summarise_text":
-                response = await summarise_text(prompt)
-                # response = f"Here're two summaries for you!\n1. Prepared by the summarizer - {response}\n2. Prepared by LLM ({self.model_name}) - {str(tool_input)}"
-                print(f"[agent]: {colored(response, 'cyan')}")
-                return f"{response}"  # for streamlit app
+            # response = f"Here're two summaries for you!\n1. Prepared by the summarizer - {response}\n2. Prepared by LLM ({self.model_name}) - {str(tool_input)}"
+            return await self.executor.run(summarise_text, prompt)
 
         for tool in self.tools:
             if tool.__name__ == tool_choice:
-                response = await tool(tool_input)  # make sure tool function is async
-                print(f"[agent]: {colored(response, 'cyan')}")
-                return f"{response}"  # for streamlit app
+                return await self.executor.run(tool, tool_input)
+
+        return f"{tool_input}"
+
+    @staticmethod
+    def cacheable(decision):
+        """
+        Checks whether a decision from the model is worth caching: complete and not an error.
+        """
+        tool_choice = decision.get("tool_choice")
+        return isinstance(tool_choice, str) and ("tool_input" in decision or tool_choice == "summarise_text") \
+            and not str(decision.get("tool_input", "")).startswith("[error]")
+
+    @staticmethod
+    def ready_to_dispatch(values):
+        """
+        Checks whether the streamed decision is complete enough to act on.
+
+        The summarizer works on the whole prompt, so it can start as soon as `tool_choice` is known;
+        everything else also needs a complete `tool_input`.
+        """
+        tool_choice = values.get("tool_choice")
+        return tool_choice is not None and ("tool_input" in values or tool_choice == "summarise_text")
+
+    async def work(self, prompt, stats = None):
+        """
+        Runs work_stream to completion and returns the whole answer.
+        """
+        response = "".join([chunk async for chunk in self.work_stream(prompt, stats)])
+        debug(f"[agent]: {colored(response, 'cyan')}")
+        return f"{response}"  # for streamlit app
+
+    async def work_stream(self, prompt, stats = None):
+        """
+        Streaming variant of work: yields the answer in pieces as soon as they are available.
+
+        The model's JSON is parsed while it streams in. A `no tool` answer is yielded token by token, and a
+        tool is started as soon as `tool_choice` and a complete `tool_input` have arrived, without waiting
+        for the rest of the generation (which is cancelled). The tool's response is yielded in one piece.
+        Prompts the router (if any) resolves with enough confidence, and prompts whose decision is cached,
+        skip the model altogether.
+        Timings of the call in seconds (time to first token from Ollama, time until the decision was
+        ready, time to the first yielded piece and total time) are kept in `stats`, if given, and in
+        `self.last_metrics`; every stage is also recorded in the process-wide metrics (see metrics.py).
+        If the model failed, `stats["error"]` says why, so a failed turn can be told from an answer.
+        Concurrent callers should pass their own `stats`, since `self.last_metrics` only holds the latest call.
+        """
+        start = time.perf_counter()
+        self.last_metrics = {} if stats is None else stats
+        self.last_metrics.update({"ttft": None, "decision": None, "first_chunk": None, "total": None, "routed": False,
+                                  "cached": False, "error": None})
+        turn = self.last_metrics
+        with span("route"):
+            decision = self.router.route(prompt) if self.router is not None else None
+        streamed = False
+
+        if decision is not None:
+            # resolved locally by the fast-path router, no LLM round trip needed
+            turn["routed"] = True
+            AGENT_TURNS.inc(path = "routed")
+        else:
+            model_instance = self.model_instance(prompt)
+            with span("cache_lookup"):
+                decision_key = make_key("decision", normalize_prompt(prompt), self.model_name, self.system_prompt_hash)
+                decision = await self.cache.aget(decision_key) if self.cache is not None else MISSING
+            turn["cached"] = decision is not MISSING
+            AGENT_TURNS.inc(path = "model" if decision is MISSING else "cached")
+
+        if decision is MISSING:
+            parser = IncrementalJsonParser()
+            model_stats = {}
+            parse_time = 0.0
+
+            debug("[agent]: Thinking...\n")
+            tokens = model_instance.stream_text(prompt, stats = model_stats)
+            try:
+                async for token in tokens:
+                    parse_start = time.perf_counter()
+                    events = parser.feed(token)
+                    parse_time += time.perf_counter() - parse_start
+                    for kind, key, payload in events:
+                        if kind == "delta" and key == "tool_input" and parser.values.get("tool_choice") == "no tool":
+                            if not streamed:
+                                turn["first_chunk"] = time.perf_counter() - start
+                                streamed = True
+                            yield payload
+                    if self.ready_to_dispatch(parser.values):
+                        break
+            finally:
+                # stops Ollama generating the trailing tokens we no longer need
+                await tokens.aclose()
+                STAGE_SECONDS.observe(parse_time, stage = "parse")
+            decision = {key: parser.values[key] for key in ("tool_choice", "tool_input") if key in parser.values}
+            turn["ttft"] = model_stats.get("ttft")
+            turn["model"] = model_stats  # Ollama's token counts are only there if the stream ran to the end
+            turn["error"] = model_stats.get("error")
+            if turn["error"] is not None and turn["ttft"] is not None:
+                # the stream broke after the model had started answering, so no error answer came with it
+                if streamed:
+                    yield f"\n[error]: {turn['error']}"
+                else:
+                    decision = {"tool_choice": "no tool", "tool_input": f"[error]: {turn['error']}"}
+            if self.cache is not None and turn["error"] is None and self.cacheable(decision):
+                await self.cache.aset(decision_key, decision)
+        turn["decision"] = time.perf_counter() - start
+        STAGE_SECONDS.observe(turn["decision"], stage = "decision")
+
+        if not streamed:
+            with span("dispatch", tool = str(decision.get("tool_choice"))):
+                response = await self.run_tool(prompt, decision.get("tool_choice"), decision.get("tool_input"))
+            turn["first_chunk"] = time.perf_counter() - start
+            yield f"{response}"
+        turn["total"] = time.perf_counter() - start
+        STAGE_SECONDS.observe(turn["total"], stage = "turn")
+
+def add_agent_arguments(parser):
+    """
+    Adds the options the agent is built from (see build_agent) to the parser of an entry point.
+
+    Returns:
+    argparse.ArgumentParser: The parser.
+    """
+    parser.add_argument("--model", default = "llama3.2:3b", help = "Ollama model to use")
+    parser.add_argument("--ollama-url", action = "append", help = "base URL of an Ollama server; repeat to spread requests over several")
+    parser.add_argument("--strategy", choices = OllamaPool.STRATEGIES, default = "least_outstanding", help = "how requests are spread over several Ollama servers")
+    parser.add_argument("--cache-db", help = "SQLite file that keeps cached decisions and tool results across restarts")
+    parser.add_argument("--prompt-mode", choices = PROMPT_MODES, default = "full", help = "how much of the tool docs the system prompt includes")
+    parser.add_argument("--prefilter", action = "store_true", help = "only show the model the tools a prompt's keywords point to")
+    return parser
+
+def build_client(args):
+    """
+    Returns the Ollama client for the `--ollama-url` and `--strategy` options: a pool over the given servers,
+    or the shared `default_client`.
+    """
+    return make_client(args.ollama_url, strategy = args.strategy) if args.ollama_url else default_client
+
+def build_agent(args, client = None):
+    """
+    Builds the agent with every tool, the fast-path router and the response cache from the options added
+    by add_agent_arguments.
+
+    Parameters:
+    args (argparse.Namespace): The parsed options.
+    client: The Ollama client; built by build_client by default.
+
+    Returns:
+    Agent: The agent.
+    """
+    tools = [basic_calculator, reverse_string, timer, summarise_text]
+    router = IntentRouter(ToolBox().store(tools))  # answers obvious tool requests without the model
+    cache = LayeredCache(TTLCache(), SqliteCache(args.cache_db) if args.cache_db else None)
+    return Agent(tools = tools, model_service = functools.partial(OllamaModel, client = client or build_client(args)),
+                 model_name = args.model, stop = "<|eot_id|>", router = router, cache = cache,
+                 prompt_mode = args.prompt_mode, prefilter = args.prefilter)
+
+def format_seconds(seconds):
+    """
+    Formats a duration for display, or 'n/a' if it wasn't measured.
+    """
+    return "n/a" if seconds is None else f"{seconds:.2f}s"
+
+async def chat_loop(agent):
+    """
+    Runs the interactive CLI on a single event loop, so pooled connections are reused across prompts.
+    """
+    try:
+        while True:
+            prompt = await asyncio.to_thread(input, "[agent]: Ask me anything: ")
+            if prompt.lower() == "exit":
+                break
+
+            prefix = "[agent]: "
+            async for chunk in agent.work_stream(prompt):
+                print(prefix + colored(chunk, 'cyan'), end = "", flush = True)
+                prefix = ""
+            print(f"\n[agent]: Time to first token: {format_seconds(agent.last_metrics['ttft'])}, "
+                  f"decision: {format_seconds(agent.last_metrics['decision'])}, "
+                  f"total: {format_seconds(agent.last_metrics['total'])}\n")
+    finally:
+        client = agent.model_instance().client
+        await client.close()
+        if agent.cache is not None:
+            print(f"[agent]: Cache stats: {agent.cache.stats()}")
+        print(f"[agent]: Tool stats: {agent.executor.stats()}")
+        if isinstance(client, OllamaPool):
+            print(f"[agent]: Ollama endpoints: {client.stats()}")
 
-        print(f"[agent]: {colored(tool_input, 'cyan')}\n")
-        return f"{tool_input}" # for streamlit app
-    
     # example usage
 if __name__ == "__main__":
     """
@@ -265,14 +512,19 @@ if __name__ == "__main__":
        - "What can you help me with?"
     """
 
-    tools = [basic_calculator, reverse_string, timer, summarise_text]
+    parser = argparse.ArgumentParser(description = "Chat with the AI agent in the terminal.")
+    add_agent_arguments(parser)
+    parser.add_argument("--warm-up", action = "store_true", help = "load the summarization model in the background at startup instead of on first use")
+    parser.add_argument("--quiet", action = "store_true", help = "turn off the debug output of the agent and its tools (same as AGENT_DEBUG=0)")
+    args = parser.parse_args()
 
-    # using ollama with llama3.2-3b model
-    model_service = OllamaModel
-    model_name = "llama3.2:3b"  
-    stop = "<|eot_id|>"
+    if args.quiet:
+        set_debug(False)
+    if args.warm_up:
+        registry.warm_up("summarizer")
 
-    agent = Agent(tools = tools, model_service = model_service, model_name = model_name, stop = stop)
+    # using ollama with llama3.2-3b model by default
+    agent = build_agent(args)
 
     print("\n[agent] : Hello, I'm your AI Assistant!")
     print("You can ask me to:")
@@ -283,9 +535,4 @@ if __name__ == "__main__":
     print("    5. Answer general questions (e.g., 'What day comes after Sunday?')")
     print("Type 'exit' to end the conversation.\n")
 
-    while True:
-        prompt = input("[agent]: Ask me anything: ")
-        if prompt.lower() == "exit":
-            break
-
-        asyncio.run(agent.work(prompt))
\ No newline at end of file
+    asyncio.run(chat_loop(agent))
\ No newline at end of file
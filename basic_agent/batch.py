@@ -0,0 +1,177 @@
+from agent import add_agent_arguments, build_agent, build_client
+from model_registry import registry
+from metrics import metrics, set_debug
+import argparse, asyncio, json, os, time
+
+
+def completed_ids(path, retry_errors = False):
+    """
+    Reads the ids of the records already written to an output file, one line at a time.
+
+    Parameters:
+    path (str): The JSONL output file of a previous run; it doesn't have to exist.
+    retry_errors (bool): Whether records that failed should be left out, so they are run again.
+
+    Returns:
+    set: The ids of the finished records.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding = "utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short when the previous run was interrupted
+            if not (retry_errors and record.get("error")):
+                done.add(record["id"])
+    return done
+
+
+def read_prompts(path, skip = ()):
+    """
+    Yields `(id, prompt)` pairs from a JSONL file without loading it into memory.
+
+    Each line is either an object with a `prompt` and an optional `id`, or just a JSON string. Records
+    without an id are numbered by their line, so a resumed run finds them again.
+
+    Parameters:
+    path (str): The JSONL input file.
+    skip (set): Ids that are already done.
+    """
+    with open(path, encoding = "utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"prompt": record}
+            record_id = record.get("id", line_number)
+            if record_id not in skip:
+                yield record_id, record["prompt"]
+
+
+async def run_record(agent, record_id, prompt, timeout):
+    """
+    Runs one prompt through the agent and returns its output record with timings in seconds. A prompt
+    the model failed on is recorded with its error, even if the agent answered with an error message.
+    """
+    start = time.perf_counter()
+    timings = {"first_chunk": None, "total": None}
+    record = {"id": record_id, "prompt": prompt, "response": None, "error": None}
+    turn = {}
+
+    async def collect():
+        chunks = []
+        async for chunk in agent.work_stream(prompt, turn):
+            if timings["first_chunk"] is None:
+                timings["first_chunk"] = round(time.perf_counter() - start, 4)
+            chunks.append(chunk)
+        return "".join(chunks)
+
+    try:
+        record["response"] = await asyncio.wait_for(collect(), timeout)
+        record["error"] = turn.get("error")
+    except asyncio.TimeoutError:
+        record["error"] = f"Timed out after {timeout} seconds."
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {str(e)}"
+    timings["total"] = round(time.perf_counter() - start, 4)
+    record["timings"] = timings
+    return record
+
+
+async def run_batch(agent, input_path, output_path, concurrency = 8, timeout = None, retry_errors = False):
+    """
+    Runs every prompt of the input file through the agent with at most `concurrency` in flight, appending
+    each result to the output file as soon as it is done.
+
+    Prompts are read lazily into a bounded queue, so memory stays flat however long the file is. Records
+    whose id is already in the output file are skipped, which makes an interrupted run resumable.
+
+    Parameters:
+    agent (Agent): The agent to run the prompts through.
+    input_path (str): JSONL file with the prompts.
+    output_path (str): JSONL file the results are appended to.
+    concurrency (int): Number of prompts processed at the same time.
+    timeout (float): Seconds after which a single prompt is given up, or None.
+    retry_errors (bool): Whether records that failed in a previous run are run again.
+
+    Returns:
+    dict: Counts of processed, failed and skipped records, and the elapsed time.
+    """
+    done = completed_ids(output_path, retry_errors)
+    queue = asyncio.Queue(maxsize = concurrency * 2)
+    summary = {"processed": 0, "errors": 0, "skipped": len(done), "elapsed": 0.0}
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding = "utf-8") as output:
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                record = await run_record(agent, *item, timeout)
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                summary["processed"] += 1
+                summary["errors"] += record["error"] is not None
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for item in read_prompts(input_path, done):
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    summary["elapsed"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+async def main(args):
+    client = build_client(args)
+    agent = build_agent(args, client)
+
+    try:
+        summary = await run_batch(agent, args.input, args.output, args.concurrency, args.timeout, args.retry_errors)
+    finally:
+        await client.close()
+    rate = summary["processed"] / summary["elapsed"] if summary["elapsed"] else 0.0
+    if args.metrics_out:
+        with open(args.metrics_out, "w", encoding = "utf-8") as file:
+            file.write(metrics.prometheus() if args.metrics_out.endswith(".prom") else metrics.json())
+    print(f"[batch]: {summary['processed']} prompts processed ({summary['errors']} failed, {summary['skipped']} already done) "
+          f"in {summary['elapsed']:.2f}s, {rate:.2f} prompts/s.")
+
+
+if __name__ == "__main__":
+    """
+    Runs a file of prompts through the agent, e.g.
+
+        python batch.py prompts.jsonl results.jsonl --concurrency 16
+
+    where every line of prompts.jsonl looks like {"id": "q1", "prompt": "Calculate 15 plus 7"}. Running the
+    same command again after an interruption only processes the prompts missing from results.jsonl.
+    """
+    parser = argparse.ArgumentParser(description = "Run a JSONL file of prompts through the agent.")
+    parser.add_argument("input", help = "JSONL file with one prompt per line")
+    parser.add_argument("output", help = "JSONL file the results are appended to; existing results are skipped")
+    parser.add_argument("--concurrency", type = int, default = 8, help = "prompts processed at the same time")
+    parser.add_argument("--timeout", type = float, default = None, help = "seconds after which a single prompt is given up")
+    parser.add_argument("--retry-errors", action = "store_true", help = "run prompts that failed in a previous run again")
+    add_agent_arguments(parser)
+    parser.add_argument("--warm-up", action = "store_true", help = "load the summarization model in the background at startup")
+    parser.add_argument("--metrics-out", help = "file the per-stage metrics are written to at the end: Prometheus text if it ends in .prom, else JSON")
+    parser.add_argument("--debug", action = "store_true", help = "print the debug output of the agent and its tools")
+    args = parser.parse_args()
+
+    set_debug(args.debug)  # thousands of prompts would flood the terminal
+    if args.warm_up:
+        registry.warm_up("summarizer")
+
+    asyncio.run(main(args))
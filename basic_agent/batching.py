@@ -0,0 +1,103 @@
+import asyncio
+
+
+class MicroBatcher:
+    def __init__(self, process_batch, max_batch_size = 8, max_wait_ms = 10):
+        """
+        Collects requests that arrive close together and processes them as one batch.
+
+        The first request of a batch waits at most `max_wait_ms` for others to join it; the batch is
+        then handed to `process_batch` in a worker thread and each result goes back to its caller.
+
+        Parameters:
+        process_batch (callable): Blocking function taking a list of items and returning a list of
+                                  results in the same order.
+        max_batch_size (int): Largest number of items processed together.
+        max_wait_ms (float): Longest time in milliseconds the first item waits for the batch to fill.
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.pending = 0  # submitted items whose result hasn't been delivered yet
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+    async def submit(self, item):
+        """
+        Adds an item to the next batch and waits for its result.
+
+        Parameters:
+        item (object): The item to process.
+
+        Returns:
+        object: The result `process_batch` produced for the item.
+
+        Raises:
+        Exception: Whatever `process_batch` raised for the batch the item was in.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # the queue and worker are bound to the loop they were created on
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+            self._loop = loop
+
+        future = loop.create_future()
+        self.pending += 1
+        try:
+            self._queue.put_nowait((item, future))
+            return await future
+        finally:
+            self.pending -= 1
+
+    async def _collect(self):
+        """
+        Waits for the first item, then gathers more until the batch is full or the wait runs out.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # callers that gave up while waiting don't need to be processed
+        return [(item, future) for item, future in batch if not future.done()]
+
+    async def _run(self):
+        """
+        The worker: processes one batch at a time and fans the results out to the waiting callers.
+        """
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await asyncio.to_thread(self.process_batch, [item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        """
+        Returns the batcher's counters, including the average batch size so far.
+        """
+        return {"pending": self.pending, "batches": self.batches, "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0}
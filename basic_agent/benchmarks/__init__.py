@@ -0,0 +1,4 @@
+"""
+Benchmarks for the basic agent. Run them from the `basic_agent` directory, e.g.
+`python -m benchmarks.bench_http_client`.
+"""
@@ -0,0 +1,86 @@
+import argparse, asyncio, random, time
+from benchmarks.common import summarise_latencies, report
+from benchmarks.bench_tool_executor import measure_lag
+from expressions import MAX_ELEMENTS, compile_expression
+from metrics import set_debug
+from tool_functions import basic_calculator
+from tool_executor import ToolExecutor
+
+EXPRESSION = "(15 + 7) * 2 ** 3 / (4 - 1.5) >= 70"
+
+
+def time_calls(name, inputs, before_call = None, elements = 1):
+    """
+    Calls the calculator once per input; `elements` is how many numbers each call computes on.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for calculator_input in inputs:
+        if before_call:
+            before_call()
+        call_start = time.perf_counter()
+        basic_calculator(calculator_input)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    return summarise_latencies(name, latencies, elapsed, elements_per_s = round(len(latencies) * elements / elapsed, 2))
+
+
+async def through_executor(iterations, bulk_size):
+    """
+    Runs the calculator as the agent does, in the executor's thread pool: the cost of the thread hop on a
+    single expression, and how long the event loop stalls during a bulk call of `bulk_size` numbers.
+    """
+    executor = ToolExecutor()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        await executor.run(basic_calculator, {"expression": EXPRESSION})
+        latencies.append(time.perf_counter() - call_start)
+    results = [summarise_latencies("executor_single_expression", latencies, time.perf_counter() - start)]
+
+    numbers = [1.5] * bulk_size
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    start = time.perf_counter()
+    response = await executor.run(basic_calculator, {"expression": "sqrt(x) * 1.08 + x ** 2", "x": numbers})
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = await lag_task
+    results.append(summarise_latencies(f"executor_bulk_{bulk_size}", [elapsed], elapsed, answered = "answer is" in response,
+                                       timed_out = "timed out" in response, loop_lag_max_ms = round(max(lags, default = 0.0) * 1000, 3)))
+    executor.shutdown(wait = True)  # a timed-out call runs on in its thread
+    return results
+
+
+def main(iterations, sizes, per_element_limit, bulk_size):
+    set_debug(False)  # the tool's debug prints would dominate the timings
+    results = [
+        time_calls("single_operation_dict", [{"num1": 15, "num2": 7, "operation": "add"}] * iterations),
+        time_calls("single_expression", [{"expression": EXPRESSION}] * iterations),
+        time_calls("single_expression_string", [EXPRESSION] * iterations),
+        # parsed every time, as a new expression would be
+        time_calls("single_expression_uncached", [{"expression": EXPRESSION}] * iterations, compile_expression.cache_clear),
+    ]
+
+    rng = random.Random(0)
+    for size in sizes:
+        prices = [round(rng.uniform(1, 500), 2) for _ in range(size)]
+        # the old way: one two-number operation per element (each would also be a model round trip)
+        per_element = [{"num1": price, "num2": 1.08, "operation": "multiply"} for price in prices[:per_element_limit]]
+        results.append(time_calls(f"per_element_{size}", per_element))
+        repeats = max(1, min(20, 2_000_000 // size))
+        results.append(time_calls(f"vectorized_{size}", [{"expression": "x * 1.08", "x": prices}] * repeats, elements = size))
+        results.append(time_calls(f"vectorized_sum_{size}", [{"expression": "sum(x * 1.08)", "x": prices}] * repeats, elements = size))
+    results.extend(asyncio.run(through_executor(min(iterations, 2000), bulk_size)))
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Calculator latency for single expressions and throughput of element-wise calls vs vectorized batch expressions.")
+    parser.add_argument("--iterations", type = int, default = 20000)
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [1000, 100_000, 1_000_000], help = "numbers per batch")
+    parser.add_argument("--per-element-limit", type = int, default = 20000, help = "calls timed for the element-by-element baseline")
+    parser.add_argument("--bulk-size", type = int, default = MAX_ELEMENTS, help = "numbers in the bulk call run through the executor")
+    args = parser.parse_args()
+    main(args.iterations, args.sizes, args.per_element_limit, args.bulk_size)
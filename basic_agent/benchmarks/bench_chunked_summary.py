@@ -0,0 +1,44 @@
+import argparse, asyncio, resource, time
+from benchmarks.common import report
+from model_registry import registry
+from summarizer import summarise_long
+
+PARAGRAPH = ("The city council met on Tuesday to discuss the new public transport plan. Members debated the cost "
+             "of extending the tram line to the northern suburbs, the timetable for construction and how to keep "
+             "disruption to local businesses low. ")
+
+
+def document(words):
+    """
+    Builds a document of roughly the given number of words, with numbered paragraphs so chunks differ.
+    """
+    paragraph_words = len(PARAGRAPH.split())
+    return "".join(f"Section {i}. {PARAGRAPH}" for i in range(max(1, words // paragraph_words)))
+
+
+async def main(sizes, max_in_flight):
+    tokenizer, _ = registry.get("summarizer")  # keep model loading out of the measurements
+    results = []
+    for words in sizes:
+        text = document(words)
+        tokens = len(tokenizer.encode(text, add_special_tokens = False))
+        start = time.perf_counter()
+        await summarise_long(text, max_in_flight = max_in_flight)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "name": f"summarise_long_{words}_words",
+            "tokens": tokens,
+            "seconds": round(elapsed, 3),
+            "tokens_per_s": round(tokens / elapsed, 2),
+            # ru_maxrss is in kilobytes on Linux and never goes down, so growth across sizes shows unbounded memory
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        })
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure chunked summarisation throughput against document size.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [500, 2000, 8000, 32000], help = "document sizes in words")
+    parser.add_argument("--max-in-flight", type = int, default = 8)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.max_in_flight))
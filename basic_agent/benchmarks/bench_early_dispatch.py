@@ -0,0 +1,52 @@
+import argparse, asyncio, time
+from functools import partial
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+DECISION = {"tool_choice": "basic_calculator", "tool_input": {"num1": 15, "num2": 7, "operation": "add"}}
+
+
+async def wait_for_whole_response(agent, prompt):
+    """
+    The old behaviour: wait for the complete JSON (and any trailing tokens) before running the tool.
+    """
+    agent_response_dict = await agent.think(prompt)
+    return await agent.run_tool(prompt, agent_response_dict.get("tool_choice"), agent_response_dict.get("tool_input"))
+
+
+async def main(turns, latency, token_rate, trailing_tokens):
+    mock = MockOllama(latency = latency, token_rate = token_rate, response = DECISION, trailing_tokens = trailing_tokens)
+    base_url = await mock.start()
+    client = OllamaClient(base_url = base_url)
+    agent = Agent(tools = [basic_calculator, reverse_string, timer, summarise_text],
+                  model_service = partial(OllamaModel, client = client), model_name = "mock")
+    prompt = "Calculate 15 plus 7"
+
+    results = []
+    try:
+        for name, call in (("wait_for_whole_response", lambda: wait_for_whole_response(agent, prompt)),
+                           ("early_dispatch", lambda: agent.work(prompt))):
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(turns):
+                turn_start = time.perf_counter()
+                await call()
+                latencies.append(time.perf_counter() - turn_start)
+            results.append(summarise_latencies(name, latencies, time.perf_counter() - start, trailing_tokens = trailing_tokens))
+    finally:
+        await client.close()
+        await mock.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Compare tool-routed turns with and without early dispatch.")
+    parser.add_argument("--turns", type = int, default = 50)
+    parser.add_argument("--latency", type = float, default = 0.2, help = "mock prompt-eval time in seconds")
+    parser.add_argument("--token-rate", type = float, default = 40.0, help = "mock tokens per second")
+    parser.add_argument("--trailing-tokens", type = int, default = 10, help = "whitespace tokens after the JSON")
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency, args.token_rate, args.trailing_tokens))
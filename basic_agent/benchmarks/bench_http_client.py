@@ -0,0 +1,65 @@
+import argparse, asyncio, json, time, aiohttp
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient
+
+
+async def per_call_session(base_url, payload):
+    """
+    The old behaviour of `OllamaModel.generate_text`: a fresh session (and connection) for every prompt.
+    """
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{base_url}/api/generate", headers = {"Content-Type": "application/json"}, json = payload) as request_response:
+            request_response_json = await request_response.json()
+            return json.loads(request_response_json["response"])
+
+
+async def pooled_client(client, payload):
+    """
+    The new behaviour: requests share the connection pool owned by an OllamaClient.
+    """
+    request_response_json = await client.generate(payload)
+    return json.loads(request_response_json["response"])
+
+
+async def run_case(name, call, requests, concurrency):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return summarise_latencies(name, latencies, time.perf_counter() - start, concurrency = concurrency)
+
+
+async def main(requests, concurrency, latency, pool_size):
+    mock = MockOllama(latency = latency)
+    base_url = await mock.start()
+    payload = {"model": "mock", "format": "json", "prompt": "Who are you?", "system": "", "stream": False}
+
+    client = OllamaClient(base_url = base_url, pool_size = pool_size)
+
+    results = []
+    try:
+        for level in sorted({1, concurrency}):
+            results.append(await run_case("per_call_session", lambda: per_call_session(base_url, payload), requests, level))
+            results.append(await run_case("pooled_client", lambda: pooled_client(client, payload), requests, level))
+    finally:
+        await client.close()
+        await mock.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Compare a per-call aiohttp session with the pooled OllamaClient.")
+    parser.add_argument("--requests", type = int, default = 2000)
+    parser.add_argument("--concurrency", type = int, default = 16)
+    parser.add_argument("--latency", type = float, default = 0.0, help = "mock server latency in seconds")
+    parser.add_argument("--pool-size", type = int, default = 16)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency, args.pool_size))
@@ -0,0 +1,70 @@
+import argparse, asyncio, contextlib, io, time
+from benchmarks.common import summarise_latencies, report
+from metrics import MetricsRegistry, metrics, span, set_debug
+from agent import Agent, OllamaModel, ToolBox
+from router import IntentRouter
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+PROMPTS = ["Calculate 15 plus 7", "Reverse the word 'hello world'", "What is 100 divided by 5?", "Multiply 23 and 4"]
+
+
+def span_overhead(iterations):
+    """
+    Returns the cost of an empty span and of an empty block, in seconds per call.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with span("bench"):
+            pass
+    with_span = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with contextlib.nullcontext():
+            pass
+    return with_span / iterations, (time.perf_counter() - start) / iterations
+
+
+async def routed_turns(agent, turns):
+    """
+    Runs routed (model-free) turns, where the agent's own overhead is all there is to measure.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for i in range(turns):
+        turn_start = time.perf_counter()
+        await agent.work(PROMPTS[i % len(PROMPTS)])
+        latencies.append(time.perf_counter() - turn_start)
+    return latencies, time.perf_counter() - start
+
+
+async def main(turns, iterations, to_terminal):
+    with_span, without = span_overhead(iterations)
+    results = [{"name": "span_overhead", "count": iterations, "span_ns": round(with_span * 1e9, 1), "baseline_ns": round(without * 1e9, 1)}]
+
+    tools = [basic_calculator, reverse_string, timer, summarise_text]
+    agent = Agent(tools = tools, model_service = OllamaModel, model_name = "mock", router = IntentRouter(ToolBox().store(tools)))
+    for name, enabled in (("debug_prints_on", True), ("debug_prints_off", False)):
+        set_debug(enabled)
+        sink = contextlib.nullcontext() if to_terminal else contextlib.redirect_stdout(io.StringIO())
+        with sink:
+            latencies, elapsed = await routed_turns(agent, turns)
+        results.append(summarise_latencies(name, latencies, elapsed))
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", "Benchmark samples.")
+    for i in range(1000):
+        histogram.observe(i / 1000, stage = f"stage{i % 8}")
+    start = time.perf_counter()
+    text = registry.prometheus()
+    results.append({"name": "prometheus_export", "series": 8, "bytes": len(text), "ms": round((time.perf_counter() - start) * 1000, 3)})
+    results.append({"name": "recorded_stages", "stages": sorted({series["labels"]["stage"] for series in metrics.as_dict()["agent_stage_seconds"]["series"]})})
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Cost of the tracing spans and of the debug prints on routed agent turns.")
+    parser.add_argument("--turns", type = int, default = 2000)
+    parser.add_argument("--iterations", type = int, default = 200000, help = "empty spans timed for the overhead estimate")
+    parser.add_argument("--to-terminal", action = "store_true", help = "let the debug prints reach the terminal instead of a buffer")
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.iterations, args.to_terminal))
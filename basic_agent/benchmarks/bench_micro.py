@@ -0,0 +1,63 @@
+import argparse, asyncio, time
+from benchmarks.common import summarise_latencies, report
+from agent import ToolBox
+from metrics import set_debug
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+TEXT = ("The city council met on Tuesday to discuss the new budget. After hours of debate, members agreed to increase "
+        "funding for public transport and parks, while cutting spending on administration. The changes take effect "
+        "next year, and residents can comment on the plan at a public hearing next month.")
+
+
+async def time_async(name, func, argument, iterations):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        await func(argument)
+        latencies.append(time.perf_counter() - call_start)
+    return summarise_latencies(name, latencies, time.perf_counter() - start)
+
+
+def time_sync(name, func, iterations):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_start)
+    return summarise_latencies(name, latencies, time.perf_counter() - start)
+
+
+async def main(iterations, summarizer_iterations):
+    set_debug(False)  # the tools' debug prints would dominate the timings
+    results = [
+        time_sync("basic_calculator_dict", lambda: basic_calculator({"num1": 67869, "num2": 9030393, "operation": "divide"}), iterations),
+        time_sync("basic_calculator_json", lambda: basic_calculator('{"num1": 5, "num2": 3, "operation": "power"}'), iterations),
+        await time_async("reverse_string", reverse_string, "Python Programming " * 8, iterations),
+    ]
+
+    toolbox = ToolBox()
+    toolbox.store([basic_calculator, reverse_string, timer, summarise_text])
+    results.append(time_sync("toolbox_tools", toolbox.tools, iterations))
+
+    if summarizer_iterations:
+        # imported here: loading torch and the model takes seconds
+        from summarizer import summarise_batch
+        from model_registry import registry
+        start = time.perf_counter()
+        registry.get("summarizer")
+        load_time = time.perf_counter() - start
+        result = time_sync("summarizer_inference", lambda: summarise_batch([TEXT]), summarizer_iterations)
+        result["load_s"] = round(load_time, 3)
+        results.append(result)
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Microbenchmarks of the tools, the tool descriptions and summarizer inference.")
+    parser.add_argument("--iterations", type = int, default = 20000)
+    parser.add_argument("--summarizer", type = int, default = 0, metavar = "N",
+                        help = "also time N summarizer inferences (loads the real model, CPU)")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.summarizer))
@@ -0,0 +1,82 @@
+import argparse, asyncio, socket, time, aiohttp
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient, OllamaPool
+
+PAYLOAD = {"model": "mock", "format": "json", "prompt": "Who are you?", "system": "", "stream": False}
+
+
+def dead_url():
+    """
+    Returns the URL of a local port nothing listens on, standing in for a crashed Ollama server.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+async def run(client, requests, concurrency):
+    """
+    Sends `requests` generate requests, at most `concurrency` at a time.
+
+    Returns:
+    tuple: Latencies of the successful requests, the number of failed ones, and the wall-clock time.
+    """
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                await client.generate(PAYLOAD)
+                latencies.append(time.perf_counter() - start)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def main(requests, concurrency, latency, slow_factor, parallel):
+    fast = MockOllama(latency = latency, parallel = parallel)
+    slow = MockOllama(latency = latency * slow_factor, parallel = parallel)
+    fast_url, slow_url = await fast.start(), await slow.start()
+    urls = [fast_url, slow_url, dead_url()]
+
+    cases = [("single_endpoint", lambda: OllamaClient(fast_url))]
+    cases += [(f"pool_{strategy}", lambda strategy = strategy: OllamaPool(urls, strategy = strategy, backoff = 0.01, cooldown = 5, health_interval = 1))
+              for strategy in OllamaPool.STRATEGIES]
+
+    results = []
+    try:
+        for name, make in cases:
+            client = make()
+            try:
+                latencies, errors, elapsed = await run(client, requests, concurrency)
+                extra = {"errors": errors}
+                if isinstance(client, OllamaPool):
+                    stats = client.stats()
+                    extra["retried"] = stats["retried"]
+                    extra["endpoints"] = {f"{i}:{endpoint['state']}": endpoint["requests"] for i, endpoint in enumerate(stats["endpoints"])}
+                results.append(summarise_latencies(name, latencies, elapsed, **extra))
+            finally:
+                await client.close()
+    finally:
+        await fast.stop()
+        await slow.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Compare one Ollama endpoint with a pool of a fast, a slow and a dead one.")
+    parser.add_argument("--requests", type = int, default = 400)
+    parser.add_argument("--concurrency", type = int, default = 16)
+    parser.add_argument("--latency", type = float, default = 0.05, help = "response time of the fast mock server in seconds")
+    parser.add_argument("--slow-factor", type = float, default = 4.0, help = "how many times slower the slow server is")
+    parser.add_argument("--parallel", type = int, default = 4, help = "requests each mock server generates at the same time")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency, args.slow_factor, args.parallel))
@@ -0,0 +1,76 @@
+import argparse, asyncio, time
+from functools import partial
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent
+from prompts import PromptBuilder
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+TOOLS = [basic_calculator, reverse_string, timer, summarise_text]
+
+
+def build_every_turn(client):
+    """
+    The old behaviour of `Agent.think`: the tool docs collected, the prompt rendered and a model instance created on every turn.
+    """
+    builder = PromptBuilder()
+    system_prompt = builder.render(builder.tool_docs(TOOLS))
+    return OllamaModel(model = "mock", system_prompt = system_prompt, client = client)
+
+
+def bench_prompt_build(client, iterations):
+    agent = Agent(tools = TOOLS, model_service = partial(OllamaModel, client = client), model_name = "mock")
+    results = []
+    for name, build in (("prompt_build_every_turn", lambda: build_every_turn(client)),
+                        ("prompt_build_cached", agent.model_instance)):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(iterations):
+            op_start = time.perf_counter()
+            build()
+            latencies.append(time.perf_counter() - op_start)
+        results.append(summarise_latencies(name, latencies, time.perf_counter() - start))
+    return results
+
+
+async def bench_turns(client, turns, keep_alive, gap):
+    agent = Agent(tools = TOOLS, model_service = partial(OllamaModel, client = client, keep_alive = keep_alive), model_name = "mock")
+    latencies, prompt_eval_counts = [], []
+    start = time.perf_counter()
+    for turn in range(turns):
+        turn_start = time.perf_counter()
+        await agent.think(f"Who are you? (turn {turn})")
+        latencies.append(time.perf_counter() - turn_start)
+        prompt_eval_counts.append(agent.model_instance().last_stats.get("prompt_eval_count", 0))
+        await asyncio.sleep(gap)
+    return summarise_latencies(f"turns_keep_alive_{keep_alive}", latencies, time.perf_counter() - start,
+                               mean_prompt_eval_tokens = round(sum(prompt_eval_counts) / len(prompt_eval_counts), 1),
+                               first_turn_prompt_eval_tokens = prompt_eval_counts[0])
+
+
+async def main(iterations, turns, prefill_rate, load_time, gap):
+    mock = MockOllama(prefill_rate = prefill_rate, load_time = load_time)
+    base_url = await mock.start()
+    client = OllamaClient(base_url = base_url)
+    try:
+        results = bench_prompt_build(client, iterations)
+        # keep_alive 0 unloads the model after every request, as happens to the default 5 minutes under
+        # sparse traffic, so every turn re-evaluates the whole system prompt
+        results.append(await bench_turns(client, turns, 0, gap))
+        results.append(await bench_turns(client, turns, "30m", gap))
+    finally:
+        await client.close()
+        await mock.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure prompt build cost and prompt-eval tokens per turn.")
+    parser.add_argument("--iterations", type = int, default = 2000, help = "prompt builds to time")
+    parser.add_argument("--turns", type = int, default = 20)
+    parser.add_argument("--prefill-rate", type = float, default = 1000.0, help = "mock prompt tokens per second")
+    parser.add_argument("--load-time", type = float, default = 0.5, help = "mock model load time in seconds")
+    parser.add_argument("--gap", type = float, default = 0.0, help = "seconds between turns")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.turns, args.prefill_rate, args.load_time, args.gap))
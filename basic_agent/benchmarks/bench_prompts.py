@@ -0,0 +1,221 @@
+import argparse, asyncio, re, time
+from functools import partial
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from benchmarks.router_corpus import LABELLED_PROMPTS
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent, ToolBox
+from metrics import set_debug
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+TOOLS = [basic_calculator, reverse_string, timer, summarise_text]
+
+# rough stand-in for the model's tokenizer: words and single punctuation marks
+APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# the system prompt before it was generated from the tool docs: hand-written examples for every tool,
+# followed by every docstring again
+LEGACY_TEMPLATE = '''
+You are an intelligent AI assistant with access to specific tools. Your responses must ALWAYS be in this JSON format:
+{{
+    "tool_choice": "name_of_the_tool",
+    "tool_input": "inputs_to_the_tool"
+}}
+
+TOOLS AND WHEN TO USE THEM:
+
+1. basic_calculator: Use for ANY mathematical calculations
+   - Input format: {{"num1": number, "num2": number, "operation": "add/subtract/multiply/divide"}}
+   - Supported operations: add/plus, subtract/minus, multiply/times, divide
+   - Example inputs and outputs:
+     Input: "Calculate 15 plus 7"
+     Output: {{"tool_choice": "basic_calculator", "tool_input": {{"num1": 15, "num2": 7, "operation": "add"}}}}
+     
+     Input: "What is 100 divided by 5?"
+     Output: {{"tool_choice": "basic_calculator", "tool_input": {{"num1": 100, "num2": 5, "operation": "divide"}}}}
+
+2. reverse_string: Use for ANY request involving reversing text
+   - Input format: Just the text to be reversed as a string
+   - ALWAYS use this tool when user mentions "reverse", "backwards", or asks to reverse text
+   - Example inputs and outputs:
+     Input: "Reverse of 'Howwwww'?"
+     Output: {{"tool_choice": "reverse_string", "tool_input": "Howwwww"}}
+     
+     Input: "What is the reverse of Python?"
+     Output: {{"tool_choice": "reverse_string", "tool_input": "Python"}}
+
+3. timer: Use for setting a timer for a specified duration
+   - Input format: The duration of the timer in seconds as a string
+   - ALWAYS use this tool when user mentions "timer" or asks to set a timer or a countdown
+   - Example inputs and outputs:
+     Input: "Set a timer for 10 seconds"
+     Output: {{"tool_choice": "timer", "tool_input": "10"}}
+
+     Input: "Timer for 60 seconds"
+     Output: {{"tool_choice": "timer", "tool_input": "60"}}
+
+     Input: "Timer for seconds"
+     Output: {{"tool_choice": "timer", "tool_input": "Error: Invalid duration. Please provide a valid number of seconds."}}
+
+4. summarise_text: Use for summarizing text
+   - Input format: The text to be summarized as a string
+   - ALWAYS use this tool when user mentions "summarize" or asks to summarize text
+   - Simply extract the text to be summarized from the prompt and pass it to this tool; DO NOT summarize the text yourself
+   - Example inputs and outputs:
+     Input: "Summarize the text: 'This is a long text that needs to be summarized.'"
+     Output: {{"tool_choice": "summarise_text", "tool_input": "This is a long text that needs to be summarized."}}
+
+     Input: "Can you summarize 'this paragraph'?"
+     Output: {{"tool_choice": "summarise_text", "tool_input": "'this paragraph'"}}
+
+     Input: "Generate a summary of this 'long paragraph'."
+     Output: {{"tool_choice": "summarise_text", "tool_input": "'long paragraph'"}}
+
+5. no tool: Use for general conversation and questions
+   - Example inputs and outputs:
+     Input: "Who are you?"
+     Output: {{"tool_choice": "no tool", "tool_input": "I am an AI assistant that can help you with calculations, reverse text, and answer questions. I can perform mathematical operations and reverse strings. How can I help you today?"}}
+     
+     Input: "How are you?"
+     Output: {{"tool_choice": "no tool", "tool_input": "I'm functioning well, thank you for asking! I'm here to help you with calculations, text reversal, or answer any questions you might have."}}
+
+STRICT RULES:
+1. For questions about identity, capabilities, feelings, and general questions:
+   - ALWAYS use `no tool`
+   - ALWAYS provide a complete, friendly response
+   - If user asks a question, ALWAYS answer it; do not simply repeat the question
+   - ALWAYS keep your answers relevant to the user's query
+   - If the user asks a question like 'What can you do?', ALWAYS mention your capabilities
+
+2. For ANY text reversal request:
+   - ALWAYS use `reverse_string`
+   - Extract ONLY the text to be reversed
+   - Provide the text as is to the reversal tool; do not modify it before sending it to `reverse_string`
+   - Remove quotes, "reverse of", and other extra text
+
+3. For ANY math operations:
+   - ALWAYS use `basic_calculator`
+   - Extract the numbers and operation
+   - Convert text numbers to digits
+
+4. For ANY timer requests:
+   - ALWAYS use `timer`
+   - Extract the duration in seconds
+   - Ensure the duration is a valid number
+   - If the duration is not provided, tell the user to try again; DO NOT set a timer
+
+5. For ANY text summarization requests:
+   - ALWAYS use `summarise_text`
+   - If the user requests a summary, ALWAYS delegate the task to the `summarise_text` tool; DO NOT summarize the text yourself
+   - DO NOT modify the text given in the prompt before sending it to `summarise_text`
+   - Use the entire text given in the prompt as the input to `summarise_text`; DO NOT pass your own summary
+   - STRICTLY follow the input format for the `summarise_text` tool
+
+Here is a list of your tools along with their descriptions:
+{tool_descriptions}
+
+Remember: Your response must ALWAYS be valid JSON with "tool_choice" and "tool_input" fields.
+'''
+
+# prompt variants: (name, prompt mode, pre-filter), None for the legacy prompt
+VARIANTS = [("legacy", None, False), ("full", "full", False), ("compact", "compact", False),
+            ("full_prefilter", "full", True), ("compact_prefilter", "compact", True)]
+
+
+def legacy_prompt():
+    toolbox = ToolBox()
+    toolbox.store(TOOLS)
+    return LEGACY_TEMPLATE.format(tool_descriptions = toolbox.tools())
+
+
+def approx_tokens(text):
+    return len(APPROX_TOKEN.findall(text))
+
+
+def prompt_sizes(agents):
+    """
+    Returns the system prompt size of every variant, averaged over the labelled prompts, and for the
+    pre-filtered ones how often the right tool was still on offer.
+    """
+    results = []
+    legacy = legacy_prompt()
+    for name, agent in agents.items():
+        chars, tokens, offered, recalled = [], [], [], 0
+        for prompt, tool, _ in LABELLED_PROMPTS:
+            if agent is None:
+                system_prompt, names = legacy, [func.__name__ for func in TOOLS] + ["no tool"]
+            else:
+                agent.model_instance(prompt)
+                system_prompt = agent.system_prompt
+                names = [doc.name for doc in agent.prompts.select(agent.prompts.tool_docs(TOOLS), prompt)]
+            chars.append(len(system_prompt))
+            tokens.append(approx_tokens(system_prompt))
+            offered.append(len(names))
+            recalled += tool in names
+        results.append({"name": f"size_{name}", "mean_chars": round(sum(chars) / len(chars)), "mean_approx_tokens": round(sum(tokens) / len(tokens)),
+                        "mean_tools_offered": round(sum(offered) / len(offered), 2), "prefilter_recall": round(recalled / len(LABELLED_PROMPTS), 3)})
+    return results
+
+
+async def turns(variants, legacy_model, passes, score):
+    """
+    Runs the labelled prompts through every variant and returns latency, prompt-eval tokens and, with
+    `score`, how often the model picked the labelled tool.
+    """
+    results = []
+    for name, agent in variants.items():
+        latencies, evaluated, correct = [], [], 0
+        start = time.perf_counter()
+        for _ in range(passes):
+            for prompt, tool, _ in LABELLED_PROMPTS:
+                turn_start = time.perf_counter()
+                model = legacy_model if agent is None else agent.model_instance(prompt)
+                decision = await model.generate_text(prompt)
+                latencies.append(time.perf_counter() - turn_start)
+                evaluated.append(model.last_stats.get("prompt_eval_count", 0))
+                correct += isinstance(decision, dict) and decision.get("tool_choice") == tool
+        result = summarise_latencies(f"turns_{name}", latencies, time.perf_counter() - start,
+                                     mean_prompt_eval_tokens = round(sum(evaluated) / len(evaluated), 1))
+        if score:
+            result["accuracy"] = round(correct / len(latencies), 3)
+        results.append(result)
+    return results
+
+
+async def main(ollama_url, model_name, passes, prefill_rate, keep_alive):
+    set_debug(False)
+    mock = None
+    if ollama_url:
+        client = OllamaClient(base_url = ollama_url)
+    else:
+        # the mock answers every prompt the same way, so accuracy is only scored against a real model
+        mock = MockOllama(prefill_rate = prefill_rate)
+        client = OllamaClient(base_url = await mock.start())
+        model_name = "mock"
+
+    variants = {}
+    for name, mode, prefilter in VARIANTS:
+        variants[name] = None if mode is None else Agent(tools = TOOLS, model_service = partial(OllamaModel, client = client, keep_alive = keep_alive),
+                                                         model_name = model_name, stop = "<|eot_id|>",
+                                                         prompt_mode = mode, prefilter = prefilter)
+    try:
+        results = prompt_sizes(variants)
+        legacy_model = OllamaModel(model = model_name, system_prompt = legacy_prompt(), stop = "<|eot_id|>", client = client, keep_alive = keep_alive)
+        results.extend(await turns(variants, legacy_model, passes, score = mock is None))
+    finally:
+        await client.close()
+        if mock is not None:
+            await mock.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "System prompt size, prompt-eval tokens, latency and tool-choice accuracy of the legacy, full, compact and pre-filtered prompts.")
+    parser.add_argument("--ollama-url", help = "measure against this Ollama server instead of the mock (needed for accuracy)")
+    parser.add_argument("--model", default = "llama3.2:3b", help = "Ollama model to use with --ollama-url")
+    parser.add_argument("--passes", type = int, default = 1, help = "passes over the labelled prompts per variant")
+    parser.add_argument("--prefill-rate", type = float, default = 1000.0, help = "mock prompt tokens per second")
+    parser.add_argument("--keep-alive", default = 0, help = "keep_alive sent with each request; 0 re-evaluates the whole prompt every turn, "
+                                                            "the cost the slimmer prompts cut")
+    args = parser.parse_args()
+    asyncio.run(main(args.ollama_url, args.model, args.passes, args.prefill_rate, args.keep_alive))
@@ -0,0 +1,69 @@
+import argparse, asyncio, os, random, tempfile, time
+from functools import partial
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent
+from response_cache import LayeredCache, SqliteCache, TTLCache
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+FAQ = ["What can you do?", "Who are you?", "How are you?", "What day comes after Sunday?", "Tell me a joke."]
+
+
+def workload(turns, distinct, seed = 0):
+    """
+    FAQ-heavy traffic: most turns repeat a handful of questions, the rest are spread over `distinct` others.
+    """
+    rng = random.Random(seed)
+    return [rng.choice(FAQ) if rng.random() < 0.7 else f"Tell me something about topic {rng.randrange(distinct)}." for _ in range(turns)]
+
+
+async def run(agent, prompts):
+    latencies = []
+    start = time.perf_counter()
+    for prompt in prompts:
+        turn_start = time.perf_counter()
+        await agent.work(prompt)
+        latencies.append(time.perf_counter() - turn_start)
+    return latencies, time.perf_counter() - start
+
+
+async def main(turns, distinct, max_entries, latency, token_rate):
+    mock = MockOllama(latency = latency, token_rate = token_rate)
+    client = OllamaClient(base_url = await mock.start())
+    tools = [basic_calculator, reverse_string, timer, summarise_text]
+    prompts = workload(turns, distinct)
+
+    results = []
+    directory = tempfile.TemporaryDirectory()
+    disk = SqliteCache(os.path.join(directory.name, "cache.sqlite"))
+    try:
+        for name, cache in (("no_cache", None), ("cache", LayeredCache(TTLCache(max_entries = max_entries))),
+                            # misses in memory fall through to SQLite, which is read and written off the event loop
+                            ("cache_with_disk", LayeredCache(TTLCache(max_entries = max_entries), disk))):
+            agent = Agent(tools = tools, model_service = partial(OllamaModel, client = client), model_name = "mock", cache = cache)
+            requests_before = mock.requests
+            latencies, elapsed = await run(agent, prompts)
+            extra = {"backend_calls": mock.requests - requests_before}
+            if cache is not None:
+                stats = cache.stats()["memory"]
+                extra.update(hit_ratio = round(stats["hit_ratio"], 3), evictions = stats["evictions"], approx_bytes = stats["approx_bytes"])
+                if cache.disk is not None:
+                    extra.update(disk_hits = cache.disk.stats()["hits"])
+            results.append(summarise_latencies(name, latencies, elapsed, **extra))
+    finally:
+        await client.close()
+        await mock.stop()
+        directory.cleanup()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure the response cache on FAQ-heavy traffic.")
+    parser.add_argument("--turns", type = int, default = 300)
+    parser.add_argument("--distinct", type = int, default = 200, help = "number of distinct non-FAQ prompts")
+    parser.add_argument("--max-entries", type = int, default = 64, help = "in-memory cache size")
+    parser.add_argument("--latency", type = float, default = 0.05, help = "mock prompt-eval time in seconds")
+    parser.add_argument("--token-rate", type = float, default = 200.0, help = "mock tokens per second")
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.distinct, args.max_entries, args.latency, args.token_rate))
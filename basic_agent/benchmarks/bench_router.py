@@ -0,0 +1,51 @@
+import argparse, time
+from benchmarks.common import summarise_latencies, report
+from benchmarks.router_corpus import LABELLED_PROMPTS
+from router import IntentRouter
+
+TOOL_NAMES = {"basic_calculator": "", "reverse_string": "", "timer": "", "summarise_text": ""}
+
+
+def accuracy(router):
+    """
+    Scores the router on the labelled corpus. Falling back to the LLM is never wrong, only a missed shortcut.
+    """
+    routed = correct = 0
+    mistakes = []
+    for prompt, tool, tool_input in LABELLED_PROMPTS:
+        decision = router.route(prompt)
+        if decision is None:
+            continue
+        routed += 1
+        if decision["tool_choice"] == tool and (tool_input is None or decision["tool_input"] == tool_input):
+            correct += 1
+        else:
+            mistakes.append(prompt)
+    for prompt in mistakes:
+        print(f"[bench]: misrouted: {prompt!r}")
+    return {"coverage": round(routed / len(LABELLED_PROMPTS), 3), "precision": round(correct / routed, 3) if routed else 1.0}
+
+
+def main(iterations, threshold):
+    router = IntentRouter(TOOL_NAMES, threshold = threshold)
+    scores = accuracy(router)
+
+    hit_latencies, miss_latencies = [], []
+    for _ in range(iterations):
+        for prompt, _tool, _tool_input in LABELLED_PROMPTS:
+            route_start = time.perf_counter()
+            decision = router.route(prompt)
+            (hit_latencies if decision else miss_latencies).append(time.perf_counter() - route_start)
+
+    report([
+        summarise_latencies("router_hit", hit_latencies, sum(hit_latencies), threshold = threshold, **scores),
+        summarise_latencies("router_miss", miss_latencies, sum(miss_latencies), threshold = threshold),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure accuracy and latency of the fast-path intent router.")
+    parser.add_argument("--iterations", type = int, default = 1000, help = "passes over the labelled corpus")
+    parser.add_argument("--threshold", type = float, default = 0.9)
+    args = parser.parse_args()
+    main(args.iterations, args.threshold)
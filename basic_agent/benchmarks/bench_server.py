@@ -0,0 +1,97 @@
+import argparse, asyncio, time, aiohttp
+from aiohttp import web
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient
+from agent import add_agent_arguments
+from server import build_server
+
+
+async def start(app):
+    """
+    Serves the app on a free local port and returns its runner and base URL.
+    """
+    runner = web.AppRunner(app, access_log = None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+async def load(base_url, requests, rate, clients, stream):
+    """
+    Open-loop load: sends `requests` distinct prompts at `rate` per second from `clients` client ids,
+    whatever the server's response times are.
+
+    Returns:
+    tuple: Latencies of the successful requests, counts per status code, and the wall-clock time.
+    """
+    statuses = {}
+    latencies = []
+    path = "/chat/stream" if stream else "/chat"
+
+    async def one(session, i):
+        start = time.perf_counter()
+        headers = {"X-Client-Id": f"client-{i % clients}"}
+        try:
+            async with session.post(base_url + path, json = {"prompt": f"Tell me something about topic {i}."}, headers = headers) as response:
+                await response.read()
+                status = response.status
+        except aiohttp.ClientError:
+            status = "connection error"
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit = 0)
+    async with aiohttp.ClientSession(connector = connector, timeout = aiohttp.ClientTimeout(total = 300)) as session:
+        start = time.perf_counter()
+        tasks = []
+        for i in range(requests):
+            tasks.append(asyncio.create_task(one(session, i)))
+            await asyncio.sleep(1 / rate)
+        await asyncio.gather(*tasks)
+    return latencies, statuses, time.perf_counter() - start
+
+
+async def main(requests, rate, clients, stream, latency, token_rate, parallel, max_concurrency, max_queue, per_client):
+    mock = MockOllama(latency = latency, token_rate = token_rate, parallel = parallel)
+    mock_url = await mock.start()
+    agent_args = add_agent_arguments(argparse.ArgumentParser()).parse_args(["--model", "mock"])
+
+    cases = (
+        ("unbounded", dict(max_concurrency = requests, max_queue = requests, per_client = requests, max_model_in_flight = requests)),
+        ("admission_control", dict(max_concurrency = max_concurrency, max_queue = max_queue, per_client = per_client, queue_timeout = 2)),
+    )
+    results = []
+    try:
+        for name, limits in cases:
+            client = OllamaClient(base_url = mock_url, pool_size = limits.get("max_model_in_flight", 10))
+            server = build_server(agent_args, client = client, **limits)
+            runner, base_url = await start(server.app())
+            try:
+                latencies, statuses, elapsed = await load(base_url, requests, rate, clients, stream)
+            finally:
+                await runner.cleanup()
+            results.append(summarise_latencies(name, latencies, elapsed, statuses = {str(k): v for k, v in sorted(statuses.items(), key = str)},
+                                               rejected = server.admission.stats()["rejected"]))
+    finally:
+        await mock.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Load-test the HTTP server with and without admission control against a mock Ollama.")
+    parser.add_argument("--requests", type = int, default = 400)
+    parser.add_argument("--rate", type = float, default = 100.0, help = "requests sent per second")
+    parser.add_argument("--clients", type = int, default = 20, help = "distinct client ids the requests come from")
+    parser.add_argument("--stream", action = "store_true", help = "use /chat/stream instead of /chat")
+    parser.add_argument("--latency", type = float, default = 0.1, help = "mock prompt-eval time in seconds")
+    parser.add_argument("--token-rate", type = float, default = 200.0, help = "mock tokens per second")
+    parser.add_argument("--parallel", type = int, default = 4, help = "requests the mock generates at the same time")
+    parser.add_argument("--max-concurrency", type = int, default = 8)
+    parser.add_argument("--max-queue", type = int, default = 32)
+    parser.add_argument("--per-client", type = int, default = 4)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rate, args.clients, args.stream, args.latency, args.token_rate, args.parallel,
+                     args.max_concurrency, args.max_queue, args.per_client))
@@ -0,0 +1,92 @@
+import argparse, asyncio, functools, random, time
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+PROMPTS = ["Reverse the word 'burst'", "Reverse the word 'demo'", "Reverse the word 'queue'"]
+
+
+def counted(tool, tool_time, counter):
+    """
+    Wraps a tool so every real execution is counted and takes `tool_time` seconds, like a model inference would.
+    """
+    @functools.wraps(tool)
+    async def wrapper(tool_input):
+        counter["tool_calls"] += 1
+        await asyncio.sleep(tool_time)
+        return await tool(tool_input)
+    return wrapper
+
+
+def workload(requests, distinct, seed = 0):
+    """
+    Duplicate-heavy burst: `requests` prompts drawn from only `distinct` different ones.
+    """
+    rng = random.Random(seed)
+    return [PROMPTS[rng.randrange(distinct)] for _ in range(requests)]
+
+
+async def burst(agent, prompts, cancel_ratio, seed = 0):
+    """
+    Sends every prompt at once and cancels a share of them shortly after they started.
+
+    Returns:
+    tuple: Latencies of the completed requests, wall-clock time and the number of cancelled requests.
+    """
+    rng = random.Random(seed)
+    latencies = []
+
+    async def one(prompt):
+        turn_start = time.perf_counter()
+        await agent.work(prompt)
+        latencies.append(time.perf_counter() - turn_start)
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(one(prompt)) for prompt in prompts]
+    await asyncio.sleep(0.01)
+    for task in tasks:
+        if rng.random() < cancel_ratio:
+            task.cancel()
+    outcomes = await asyncio.gather(*tasks, return_exceptions = True)
+    cancelled = sum(1 for outcome in outcomes if isinstance(outcome, asyncio.CancelledError))
+    errors = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    if errors:
+        raise errors[0]
+    return latencies, time.perf_counter() - start, cancelled
+
+
+async def main(requests, distinct, cancel_ratio, latency, token_rate, tool_time):
+    mock = MockOllama(latency = latency, token_rate = token_rate,
+                      response = {"tool_choice": "reverse_string", "tool_input": "burst"})
+    client = OllamaClient(base_url = await mock.start(), pool_size = requests)
+    prompts = workload(requests, distinct)
+
+    results = []
+    try:
+        for name, coalesce in (("independent", False), ("coalesced", True)):
+            counter = {"tool_calls": 0}
+            tools = [basic_calculator, counted(reverse_string, tool_time, counter), timer, summarise_text]
+            agent = Agent(tools = tools, model_service = functools.partial(OllamaModel, client = client, coalesce = coalesce),
+                          model_name = "mock", coalesce = coalesce)
+            requests_before = mock.requests
+            latencies, elapsed, cancelled = await burst(agent, prompts, cancel_ratio)
+            results.append(summarise_latencies(name, latencies, elapsed, backend_calls = mock.requests - requests_before,
+                                               tool_calls = counter["tool_calls"], cancelled = cancelled))
+    finally:
+        await client.close()
+        await mock.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure request coalescing on a burst of duplicate prompts.")
+    parser.add_argument("--requests", type = int, default = 200, help = "concurrent requests in the burst")
+    parser.add_argument("--distinct", type = int, default = 3, choices = range(1, len(PROMPTS) + 1), help = "number of different prompts")
+    parser.add_argument("--cancel-ratio", type = float, default = 0.1, help = "share of requests cancelled mid-flight")
+    parser.add_argument("--latency", type = float, default = 0.05, help = "mock prompt-eval time in seconds")
+    parser.add_argument("--token-rate", type = float, default = 200.0, help = "mock tokens per second")
+    parser.add_argument("--tool-time", type = float, default = 0.05, help = "seconds each tool execution takes")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.distinct, args.cancel_ratio, args.latency, args.token_rate, args.tool_time))
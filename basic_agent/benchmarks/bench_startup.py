@@ -0,0 +1,60 @@
+import argparse, asyncio, json, subprocess, sys, time
+from benchmarks.common import summarise_latencies, report
+
+
+def child(eager):
+    """
+    Runs in a fresh interpreter: times importing the CLI entry point and answering a first prompt.
+    """
+    start = time.perf_counter()
+    import agent
+    from model_registry import registry
+    if eager:
+        # the old behaviour: the summarization model was loaded while tool_functions was imported
+        registry.get("summarizer")
+    import_time = time.perf_counter() - start
+
+    from functools import partial
+    from benchmarks.mock_ollama import MockOllama
+    from ollama_client import OllamaClient
+
+    async def first_response():
+        mock = MockOllama(response = {"tool_choice": "basic_calculator", "tool_input": {"num1": 15, "num2": 7, "operation": "add"}})
+        client = OllamaClient(base_url = await mock.start())
+        tools = [agent.basic_calculator, agent.reverse_string, agent.timer, agent.summarise_text]
+        cli_agent = agent.Agent(tools = tools, model_service = partial(agent.OllamaModel, client = client), model_name = "mock")
+        await cli_agent.work("Calculate 15 plus 7")
+        await client.close()
+        await mock.stop()
+
+    asyncio.run(first_response())
+    print(json.dumps({"import": import_time, "first_response": time.perf_counter() - start}))
+
+
+def main(runs):
+    results = []
+    for name, flags in (("eager_load", ["--eager"]), ("lazy_load", [])):
+        imports, first_responses = [], []
+        start = time.perf_counter()
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", *flags],
+                                    capture_output = True, text = True, check = True).stdout
+            timings = json.loads(output.strip().splitlines()[-1])
+            imports.append(timings["import"])
+            first_responses.append(timings["first_response"])
+        elapsed = time.perf_counter() - start
+        results.append(summarise_latencies(f"{name}_import", imports, elapsed))
+        results.append(summarise_latencies(f"{name}_first_response", first_responses, elapsed))
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure import time and time to first response of the CLI entry point.")
+    parser.add_argument("--runs", type = int, default = 5, help = "fresh interpreters per case")
+    parser.add_argument("--child", action = "store_true", help = argparse.SUPPRESS)
+    parser.add_argument("--eager", action = "store_true", help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.eager)
+    else:
+        main(args.runs)
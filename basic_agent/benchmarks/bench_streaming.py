@@ -0,0 +1,53 @@
+import argparse, asyncio, time
+from functools import partial
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+
+async def main(turns, latency, token_rate):
+    mock = MockOllama(latency = latency, token_rate = token_rate)
+    base_url = await mock.start()
+    client = OllamaClient(base_url = base_url)
+    agent = Agent(tools = [basic_calculator, reverse_string, timer, summarise_text],
+                  model_service = partial(OllamaModel, client = client), model_name = "mock")
+
+    blocking, ttft, first_chunk, streaming_total = [], [], [], []
+    try:
+        start = time.perf_counter()
+        for _ in range(turns):
+            turn_start = time.perf_counter()
+            await agent.work("Who are you?")
+            blocking.append(time.perf_counter() - turn_start)
+        blocking_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(turns):
+            async for _chunk in agent.work_stream("Who are you?"):
+                pass
+            ttft.append(agent.last_metrics["ttft"])
+            first_chunk.append(agent.last_metrics["first_chunk"])
+            streaming_total.append(agent.last_metrics["total"])
+        streaming_elapsed = time.perf_counter() - start
+    finally:
+        await client.close()
+        await mock.stop()
+
+    # with blocking generation nothing is shown before the whole answer, so its first output is its total
+    report([
+        summarise_latencies("blocking_first_output", blocking, blocking_elapsed),
+        summarise_latencies("streaming_ttft", ttft, streaming_elapsed),
+        summarise_latencies("streaming_first_output", first_chunk, streaming_elapsed),
+        summarise_latencies("streaming_total", streaming_total, streaming_elapsed),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Compare time to first output of blocking and streaming agent turns.")
+    parser.add_argument("--turns", type = int, default = 50)
+    parser.add_argument("--latency", type = float, default = 0.2, help = "mock prompt-eval time in seconds")
+    parser.add_argument("--token-rate", type = float, default = 40.0, help = "mock tokens per second")
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency, args.token_rate))
@@ -0,0 +1,115 @@
+import argparse, asyncio, contextlib, io, time
+from functools import partial
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from benchmarks.workloads import WORKLOADS
+from event_loop import BackgroundLoop
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent, ToolBox
+from router import IntentRouter
+from metrics import set_debug
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+TOOLS = [basic_calculator, reverse_string, timer, summarise_text]
+
+
+def make_agent(client):
+    return Agent(tools = TOOLS, model_service = partial(OllamaModel, client = client), model_name = "mock",
+                 router = IntentRouter(ToolBox().store(TOOLS)))
+
+
+async def respond(agent, prompt, client):
+    """
+    The old click handler: streams the answer on a loop of its own, then closes the client with it.
+    """
+    try:
+        return "".join([chunk async for chunk in agent.work_stream(prompt)])
+    finally:
+        await client.close()
+
+
+def per_click_app(base_url):
+    """
+    The old app: a new agent on every rerun and an `asyncio.run` (new loop, new connections) per click.
+
+    Returns:
+    tuple: A function answering one prompt, and one cleaning up.
+    """
+    client = OllamaClient(base_url = base_url)
+
+    def ask(prompt):
+        return asyncio.run(respond(make_agent(client), prompt, client))
+    return ask, lambda: None
+
+
+def persistent_app(base_url):
+    """
+    The new app: one cached agent and client, all work on one background loop, streamed to the caller.
+    """
+    loop = BackgroundLoop()
+    client = OllamaClient(base_url = base_url)
+    agent = make_agent(client)
+
+    def ask(prompt):
+        return "".join(loop.stream(agent.work_stream(prompt)))
+
+    def close():
+        loop.run(client.close())
+        loop.stop()
+    return ask, close
+
+
+def interactions(ask, prompts):
+    latencies = []
+    start = time.perf_counter()
+    for prompt in prompts:
+        click_start = time.perf_counter()
+        ask(prompt)
+        latencies.append(time.perf_counter() - click_start)
+    return latencies, time.perf_counter() - start
+
+
+def timer_fires(ask):
+    """
+    Sets a one-second timer and reports whether its expiry is announced.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        ask("Set a timer for 1 seconds")
+        time.sleep(1.5)
+    return "has expired" in output.getvalue()
+
+
+def main(workload_name, turns, latency, token_rate):
+    set_debug(False)
+    workload = WORKLOADS[workload_name]
+    prompts = workload.prompts(turns)
+    # the mock runs on a loop of its own, like a separate Ollama process
+    server = BackgroundLoop(name = "mock-ollama")
+    mock = MockOllama(latency = latency, token_rate = token_rate, responses = workload.responses())
+    base_url = server.run(mock.start())
+    try:
+        results = []
+        for name, app in (("per_click_asyncio_run", per_click_app), ("persistent_loop", persistent_app)):
+            ask, close = app(base_url)
+            try:
+                before = mock.requests
+                latencies, elapsed = interactions(ask, prompts)
+                results.append(summarise_latencies(name, latencies, elapsed, backend_calls = mock.requests - before,
+                                                   timer_fired = timer_fires(ask)))
+            finally:
+                close()
+    finally:
+        server.run(mock.stop())
+        server.stop()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Per-interaction latency of the Streamlit app's old per-click event loop vs a persistent background loop.")
+    parser.add_argument("--workload", choices = sorted(WORKLOADS), default = "mixed", help = "prompts to send; `no_tool` always goes to the model")
+    parser.add_argument("--turns", type = int, default = 200)
+    parser.add_argument("--latency", type = float, default = 0.02, help = "mock prompt-eval time in seconds")
+    parser.add_argument("--token-rate", type = float, default = 500.0, help = "mock tokens per second")
+    args = parser.parse_args()
+    main(args.workload, args.turns, args.latency, args.token_rate)
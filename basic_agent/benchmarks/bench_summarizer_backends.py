@@ -0,0 +1,90 @@
+import argparse, json, os, resource, subprocess, sys, time
+from benchmarks.common import summarise_latencies, report
+
+SAMPLES = [
+    "The city council met on Tuesday to discuss the new public transport plan. Members debated the cost of extending "
+    "the tram line to the northern suburbs, the timetable for construction and how to keep disruption to local "
+    "businesses low. After three hours the plan was approved with minor changes, and work is expected to start next spring.",
+    "Researchers have found that regular short walks after meals can lower blood sugar levels. In a study of two hundred "
+    "adults, participants who walked for ten minutes after eating showed smaller spikes than those who sat down, and "
+    "the effect was strongest after the evening meal.",
+    "The company reported a rise in quarterly profits thanks to strong demand for its cloud services, although hardware "
+    "sales fell for the third quarter in a row. The chief executive said the firm would keep investing in data centres "
+    "and expected growth to continue through the next year.",
+]
+
+# (backend, decoding) pairs to compare; the first is the baseline the others are scored against
+CASES = [("pytorch", "beam"), ("inference", "beam"), ("int8", "beam"), ("inference", "greedy"), ("int8", "greedy")]
+
+
+def rouge_l(candidate, reference):
+    """
+    ROUGE-L F1 between two texts: the longest common subsequence of their words, relative to both lengths.
+    """
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for word in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if word == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def child(repeats):
+    """
+    Runs in a fresh interpreter configured through the environment: loads the model and times summaries.
+    """
+    from model_registry import registry
+    from summarizer import summarise_batch
+
+    start = time.perf_counter()
+    registry.get("summarizer")
+    load_time = time.perf_counter() - start
+
+    latencies, summaries = [], []
+    for _ in range(repeats):
+        summaries = []
+        for text in SAMPLES:
+            call_start = time.perf_counter()
+            summaries.append(summarise_batch([text])[0])
+            latencies.append(time.perf_counter() - call_start)
+    print(json.dumps({"load": load_time, "latencies": latencies, "summaries": summaries,
+                      "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def main(repeats, threads):
+    runs = {}
+    for backend, decoding in CASES:
+        env = dict(os.environ, SUMMARIZER_BACKEND = backend, SUMMARIZER_DECODING = decoding, SUMMARIZER_THREADS = str(threads))
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_summarizer_backends", "--child", "--repeats", str(repeats)],
+                                env = env, capture_output = True, text = True, check = True).stdout
+        runs[(backend, decoding)] = (json.loads(output.strip().splitlines()[-1]), time.perf_counter() - start)
+
+    baseline = runs[CASES[0]][0]["summaries"]
+    results = []
+    for (backend, decoding), (run, elapsed) in runs.items():
+        similarity = sum(rouge_l(summary, reference) for summary, reference in zip(run["summaries"], baseline)) / len(baseline)
+        results.append(summarise_latencies(f"{backend}_{decoding}", run["latencies"], sum(run["latencies"]),
+                                           load_s = round(run["load"], 2), peak_rss_mb = round(run["peak_rss_mb"], 1),
+                                           rouge_l_vs_baseline = round(similarity, 3), threads = threads))
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Compare summarizer backends on latency, peak memory and output similarity.")
+    parser.add_argument("--repeats", type = int, default = 3, help = "passes over the sample texts per backend")
+    parser.add_argument("--threads", type = int, default = 0, help = "torch CPU threads, 0 for torch's default")
+    parser.add_argument("--child", action = "store_true", help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.repeats)
+    else:
+        main(args.repeats, args.threads)
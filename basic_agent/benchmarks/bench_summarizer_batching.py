@@ -0,0 +1,47 @@
+import argparse, asyncio, time
+from benchmarks.common import summarise_latencies, report
+from batching import MicroBatcher
+from model_registry import registry
+from summarizer import summarise_batch
+
+TEXT = ("The city council met on Tuesday to discuss the new public transport plan. Members debated the cost of "
+        "extending the tram line to the northern suburbs, the timetable for construction and how to keep "
+        "disruption to local businesses low. After three hours the plan was approved with minor changes, and "
+        "work is expected to start next spring.")
+
+
+async def run_level(batcher, concurrency, requests):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await batcher.submit(f"{TEXT} (report {i})")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+async def main(levels, requests, max_batch_size, max_wait_ms):
+    registry.get("summarizer")  # keep model loading out of the measurements
+    results = []
+    for concurrency in levels:
+        for name, batcher in (("unbatched", MicroBatcher(summarise_batch, max_batch_size = 1, max_wait_ms = 0)),
+                              ("batched", MicroBatcher(summarise_batch, max_batch_size = max_batch_size, max_wait_ms = max_wait_ms))):
+            latencies, elapsed = await run_level(batcher, concurrency, requests)
+            results.append(summarise_latencies(f"{name}_c{concurrency}", latencies, elapsed, concurrency = concurrency,
+                                               mean_batch_size = round(batcher.stats()["mean_batch_size"], 2)))
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure summarizer throughput and latency with and without micro-batching.")
+    parser.add_argument("--levels", type = int, nargs = "+", default = [1, 2, 4, 8, 16], help = "concurrency levels")
+    parser.add_argument("--requests", type = int, default = 32, help = "requests per level")
+    parser.add_argument("--max-batch-size", type = int, default = 8)
+    parser.add_argument("--max-wait-ms", type = float, default = 10)
+    args = parser.parse_args()
+    asyncio.run(main(args.levels, args.requests, args.max_batch_size, args.max_wait_ms))
@@ -0,0 +1,74 @@
+import argparse, asyncio, random, time
+from benchmarks.common import summarise_latencies, report
+from timer_scheduler import TimerScheduler
+
+
+async def probe_loop_lag(stop, interval = 0.01):
+    """
+    Measures how late the event loop wakes a coroutine that sleeps for `interval` seconds.
+    """
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+
+async def blocking_timer(duration):
+    # the old timer tool: declared async, but sleeps the whole event loop
+    time.sleep(duration)
+
+
+async def bench_blocking(duration):
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(stop))
+    await asyncio.sleep(0.05)
+    await blocking_timer(duration)
+    await asyncio.sleep(0.05)
+    stop.set()
+    lags = await probe
+    return summarise_latencies("blocking_sleep_loop_lag", lags, duration + 0.1, timers = 1)
+
+
+async def bench_scheduler(timers, max_duration):
+    loop = asyncio.get_running_loop()
+    scheduler = TimerScheduler()
+    lateness = []
+    done = asyncio.Event()
+
+    def on_expiry(handle):
+        lateness.append(loop.time() - handle.deadline)
+        if len(lateness) == timers:
+            done.set()
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(stop))
+    start = time.perf_counter()
+    for _ in range(timers):
+        scheduler.schedule(random.uniform(0, max_duration), on_expiry)
+    schedule_elapsed = time.perf_counter() - start
+    await done.wait()
+    stop.set()
+    lags = await probe
+
+    return [
+        summarise_latencies("scheduler_expiry_lateness", lateness, time.perf_counter() - start, timers = timers,
+                            schedule_per_s = round(timers / schedule_elapsed, 2)),
+        summarise_latencies("scheduler_loop_lag", lags, time.perf_counter() - start, timers = timers),
+    ]
+
+
+async def main(timers, max_duration, blocking_duration):
+    results = [await bench_blocking(blocking_duration)]
+    results.extend(await bench_scheduler(timers, max_duration))
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure the timer scheduler against the old blocking timer.")
+    parser.add_argument("--timers", type = int, default = 10000, help = "concurrent timers for the scheduler")
+    parser.add_argument("--max-duration", type = float, default = 2.0, help = "timers expire uniformly within this many seconds")
+    parser.add_argument("--blocking-duration", type = float, default = 1.0, help = "duration of the old blocking timer")
+    args = parser.parse_args()
+    asyncio.run(main(args.timers, args.max_duration, args.blocking_duration))
@@ -0,0 +1,95 @@
+import argparse, asyncio, time
+from benchmarks.common import percentile, summarise_latencies, report
+from tool_executor import ToolExecutor, tool
+
+
+def burn(iterations):
+    """
+    CPU-bound stand-in for a heavy tool.
+    """
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return total
+
+
+# one copy per mode; process-mode tools must be module-level functions so they can be pickled
+@tool(mode = "inline", max_concurrency = 4)
+def crunch_inline(iterations):
+    return burn(iterations)
+
+@tool(mode = "thread", max_concurrency = 4)
+def crunch_thread(iterations):
+    return burn(iterations)
+
+@tool(mode = "process", max_concurrency = 4)
+def crunch_process(iterations):
+    return burn(iterations)
+
+@tool(mode = "thread", timeout = 0.1)
+def hang(seconds):
+    time.sleep(seconds)
+    return "done"
+
+
+async def measure_lag(stop, interval = 0.005):
+    """
+    Samples how late the event loop wakes up from short sleeps, in seconds, until `stop` is set.
+    """
+    loop = asyncio.get_running_loop()
+    lags = []
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+    return lags
+
+
+async def run(executor, func, calls, argument):
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await executor.run(func, argument)
+        latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = await lag_task
+    return latencies, elapsed, lags
+
+
+async def main(calls, iterations, hang_seconds):
+    executor = ToolExecutor(max_threads = 4, max_processes = 4)
+    results = []
+    try:
+        # warm the pools up so process start-up isn't counted
+        await executor.run(crunch_thread, 1)
+        await executor.run(crunch_process, 1)
+        for func in (crunch_inline, crunch_thread, crunch_process):
+            latencies, elapsed, lags = await run(executor, func, calls, iterations)
+            stats = executor.stats()[func.__name__]
+            results.append(summarise_latencies(func.tool_spec.mode, latencies, elapsed,
+                                               loop_lag_p99_ms = round(percentile(lags, 99) * 1000, 3),
+                                               loop_lag_max_ms = round(max(lags, default = 0.0) * 1000, 3),
+                                               avg_queue_wait_ms = stats["avg_queue_wait_ms"]))
+
+        latencies, elapsed, lags = await run(executor, hang, 4, hang_seconds)
+        results.append(summarise_latencies("thread_timeout", latencies, elapsed, timeouts = executor.stats()["hang"]["timeouts"],
+                                           loop_lag_p99_ms = round(percentile(lags, 99) * 1000, 3)))
+    finally:
+        executor.shutdown(wait = False)
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Event-loop lag and throughput of a CPU-heavy tool run inline, in threads and in processes.")
+    parser.add_argument("--calls", type = int, default = 32)
+    parser.add_argument("--iterations", type = int, default = 2_000_000, help = "work per call")
+    parser.add_argument("--hang-seconds", type = float, default = 1.0, help = "how long the hanging tool blocks; its timeout is 0.1s")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.iterations, args.hang_seconds))
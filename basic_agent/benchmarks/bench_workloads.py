@@ -0,0 +1,61 @@
+import argparse, asyncio, time
+from functools import partial
+from benchmarks.common import summarise_latencies, report
+from benchmarks.mock_ollama import MockOllama
+from benchmarks.workloads import WORKLOADS
+from ollama_client import OllamaClient
+from agent import OllamaModel, Agent, ToolBox
+from router import IntentRouter
+from tool_executor import ToolExecutor
+from timer_scheduler import get_scheduler
+from metrics import set_debug
+from tool_functions import basic_calculator, reverse_string, timer, summarise_text
+
+
+async def run(agent, prompts):
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for prompt in prompts:
+        turn_start = time.perf_counter()
+        response = await agent.work(prompt)
+        latencies.append(time.perf_counter() - turn_start)
+        errors += response.startswith("[error]")
+    return latencies, errors, time.perf_counter() - start
+
+
+async def main(names, turns, use_router, latency, token_rate, seed):
+    set_debug(False)
+    tools = [basic_calculator, reverse_string, timer, summarise_text]
+    results = []
+    for name in names:
+        workload = WORKLOADS[name]
+        mock = MockOllama(latency = latency, token_rate = token_rate, responses = workload.responses())
+        client = OllamaClient(base_url = await mock.start())
+        executor = ToolExecutor()
+        router = IntentRouter(ToolBox().store(tools)) if use_router else None
+        agent = Agent(tools = tools, model_service = partial(OllamaModel, client = client), model_name = "mock",
+                      router = router, executor = executor)
+        try:
+            latencies, errors, elapsed = await run(agent, workload.prompts(turns, seed))
+        finally:
+            get_scheduler().cancel_all()  # the timer workload leaves long timers behind
+            await client.close()
+            await mock.stop()
+        tool_calls = sum(stats["calls"] for stats in executor.stats().values())
+        results.append(summarise_latencies(name, latencies, elapsed, backend_calls = mock.requests, tool_calls = tool_calls,
+                                           routed = router.hits if router is not None else 0, errors = errors))
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run canned prompt workloads for each tool path through the agent against a mock Ollama.")
+    parser.add_argument("--workloads", nargs = "+", choices = sorted(WORKLOADS), default = ["calculator", "reverse", "timer", "no_tool", "mixed"],
+                        help = "workloads to run; `summarise` loads the real summarization model")
+    parser.add_argument("--turns", type = int, default = 200)
+    parser.add_argument("--router", action = "store_true", help = "let the fast-path router answer the prompts it recognises")
+    parser.add_argument("--latency", type = float, default = 0.02, help = "mock prompt-eval time in seconds")
+    parser.add_argument("--token-rate", type = float, default = 500.0, help = "mock tokens per second")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the prompt sequence")
+    args = parser.parse_args()
+    asyncio.run(main(args.workloads, args.turns, args.router, args.latency, args.token_rate, args.seed))
@@ -0,0 +1,56 @@
+import json, math, time
+
+
+def percentile(values, pct):
+    """
+    Returns the pct-th percentile (0-100) of the values using nearest-rank.
+
+    Parameters:
+    values (list): The samples.
+    pct (float): The percentile to compute.
+
+    Returns:
+    float: The percentile, or 0.0 if there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarise_latencies(name, latencies, elapsed, **extra):
+    """
+    Builds a result record (throughput and latency percentiles in milliseconds) for a benchmark run.
+
+    Parameters:
+    name (str): Name of the benchmark case.
+    latencies (list): Per-operation latencies in seconds.
+    elapsed (float): Wall-clock duration of the whole run in seconds.
+    **extra: Additional fields to include in the record.
+
+    Returns:
+    dict: The result record.
+    """
+    result = {
+        "name": name,
+        "count": len(latencies),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+
+def report(results):
+    """
+    Prints benchmark results as a table followed by a machine-readable JSON line.
+
+    Parameters:
+    results (list): Result records as returned by `summarise_latencies`.
+    """
+    for result in results:
+        fields = ", ".join(f"{key}={value}" for key, value in result.items() if key != "name")
+        print(f"[bench]: {result['name']}: {fields}")
+    print(json.dumps({"timestamp": time.time(), "results": results}))
@@ -0,0 +1,183 @@
+import argparse, asyncio, json, time
+from aiohttp import web
+
+
+def parse_keep_alive(keep_alive):
+    """
+    Converts an Ollama `keep_alive` value (seconds, or a duration like "30m") into seconds; negative means forever.
+    """
+    if isinstance(keep_alive, (int, float)):
+        return float("inf") if keep_alive < 0 else float(keep_alive)
+    units = {"s": 1, "m": 60, "h": 3600}
+    value = float(keep_alive[:-1]) * units[keep_alive[-1]] if keep_alive[-1] in units else float(keep_alive)
+    return float("inf") if value < 0 else value
+
+
+class MockOllama:
+    def __init__(self, latency = 0.0, token_rate = 0.0, response = None, trailing_tokens = 0, prefill_rate = 0.0, load_time = 0.0,
+                 parallel = 0, responses = None):
+        """
+        Initializes an in-process stand-in for Ollama's `/api/generate` endpoint.
+
+        Parameters:
+        latency (float): Seconds to wait before the first token of each response.
+        token_rate (float): Tokens generated per second after the first one; 0 means instantly.
+        response (dict): The agent decision to return; defaults to a `no tool` answer.
+        trailing_tokens (int): Whitespace tokens generated after the closing brace, as llama models in JSON
+                               mode often do before they hit a stop token.
+        prefill_rate (float): Prompt tokens evaluated per second; 0 means instantly. Like Ollama, the
+                              longest prefix shared with the previous prompt is reused while the model
+                              is kept alive, and only the rest is evaluated.
+        load_time (float): Seconds to load the model when it isn't loaded (first request, or after its
+                           `keep_alive` ran out).
+        parallel (int): Requests generated at the same time, like OLLAMA_NUM_PARALLEL; the others wait
+                        their turn. 0 means no limit.
+        responses (dict): Decisions to return for specific prompts, e.g. a workload's expected decisions;
+                          other prompts get `response`.
+        """
+        self.latency = latency
+        self.token_rate = token_rate
+        self.response = response or {"tool_choice": "no tool", "tool_input": "Hello from the mock Ollama server! How can I help you today?"}
+        self.trailing_tokens = trailing_tokens
+        self.prefill_rate = prefill_rate
+        self.load_time = load_time
+        self.parallel = parallel
+        self.responses = responses or {}
+        self.requests = 0
+        self._slots = None
+        self._cached_prompt = None
+        self._expires = 0.0
+        self._runner = None
+        self.base_url = None
+
+    def tokens(self, prompt = None):
+        """
+        Splits the encoded response to the prompt into roughly token-sized pieces.
+        """
+        text = json.dumps(self.responses.get(prompt, self.response))
+        return [text[i:i + 4] for i in range(0, len(text), 4)] + ["\n"] * self.trailing_tokens
+
+    def prefill(self, payload):
+        """
+        Works out what evaluating the request's prompt costs, reusing the cached prefix where possible.
+
+        Returns:
+        dict: Ollama-style `load_duration`, `prompt_eval_count` and `prompt_eval_duration` (in nanoseconds).
+        """
+        prompt_tokens = (payload.get("system") or "").split() + (payload.get("prompt") or "").split()
+        now = time.monotonic()
+        loaded = self._cached_prompt is not None and now < self._expires
+        cached = 0
+        if loaded:
+            for new, old in zip(prompt_tokens, self._cached_prompt):
+                if new != old:
+                    break
+                cached += 1
+        self._cached_prompt = prompt_tokens
+        self._expires = now + parse_keep_alive(payload.get("keep_alive", "5m"))
+
+        evaluated = len(prompt_tokens) - cached
+        return {
+            "load_duration": 0 if loaded else int(self.load_time * 1e9),
+            "prompt_eval_count": evaluated,
+            "prompt_eval_duration": int(evaluated / self.prefill_rate * 1e9) if self.prefill_rate else 0
+        }
+
+    async def handle_generate(self, request):
+        """
+        Answers a generate request with the configured decision, encoded the way Ollama does, either in
+        one JSON body or as newline-delimited chunks when the request asks for streaming.
+        """
+        payload = await request.json()
+        self.requests += 1
+        if not self.parallel:
+            return await self.generate(request, payload)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.parallel)
+        async with self._slots:
+            return await self.generate(request, payload)
+
+    async def generate(self, request, payload):
+        """
+        Produces the response to one generate request.
+        """
+        tokens = self.tokens(payload.get("prompt"))
+        delay = 1 / self.token_rate if self.token_rate else 0.0
+        stats = self.prefill(payload)
+        stats["eval_count"] = len(tokens)
+        wait = self.latency + (stats["load_duration"] + stats["prompt_eval_duration"]) / 1e9
+        if wait:
+            await asyncio.sleep(wait)
+
+        if not payload.get("stream", True):
+            if delay:
+                await asyncio.sleep(delay * (len(tokens) - 1))
+            return web.json_response(dict(stats, model = payload.get("model"), response = "".join(tokens), done = True))
+
+        stream_response = web.StreamResponse(headers = {"Content-Type": "application/x-ndjson"})
+        await stream_response.prepare(request)
+        try:
+            for i, token in enumerate(tokens):
+                if i and delay:
+                    await asyncio.sleep(delay)
+                chunk = {"model": payload.get("model"), "response": token, "done": False}
+                await stream_response.write((json.dumps(chunk) + "\n").encode())
+            final_chunk = dict(stats, model = payload.get("model"), response = "", done = True)
+            await stream_response.write((json.dumps(final_chunk) + "\n").encode())
+            await stream_response.write_eof()
+        except ConnectionResetError:
+            pass  # the client stopped reading, as the agent does once it has its decision
+        return stream_response
+
+    async def handle_version(self, request):
+        """
+        Answers the version request clients use as a health check.
+        """
+        return web.json_response({"version": "mock"})
+
+    async def start(self, host = "127.0.0.1", port = 0):
+        """
+        Starts serving in the running event loop.
+
+        Parameters:
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free one.
+
+        Returns:
+        str: The base URL of the server.
+        """
+        app = web.Application()
+        app.router.add_post("/api/generate", self.handle_generate)
+        app.router.add_get("/api/version", self.handle_version)
+        self._runner = web.AppRunner(app, access_log = None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self):
+        """
+        Stops the server.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve(host, port, latency, token_rate):
+    mock = MockOllama(latency = latency, token_rate = token_rate)
+    base_url = await mock.start(host, port)
+    print(f"[mock-ollama]: Serving on {base_url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run a stand-in Ollama server for benchmarks.")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 11434)
+    parser.add_argument("--latency", type = float, default = 0.0, help = "seconds to wait before the first token")
+    parser.add_argument("--token-rate", type = float, default = 0.0, help = "tokens per second, 0 for instant")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.latency, args.token_rate))
@@ -0,0 +1,41 @@
+# labelled prompts for the fast-path router: (prompt, correct tool, correct tool input or None to skip the input check)
+LABELLED_PROMPTS = [
+    ("Calculate 15 plus 7", "basic_calculator", {"num1": 15, "num2": 7, "operation": "add"}),
+    ("What is 100 divided by 5?", "basic_calculator", {"num1": 100, "num2": 5, "operation": "divide"}),
+    ("Multiply 23 and 4", "basic_calculator", {"num1": 23, "num2": 4, "operation": "multiply"}),
+    ("subtract 3 from 10", "basic_calculator", {"num1": 10, "num2": 3, "operation": "subtract"}),
+    ("what's 2.5 times 4", "basic_calculator", {"num1": 2.5, "num2": 4, "operation": "multiply"}),
+    ("12 - 19", "basic_calculator", {"num1": 12, "num2": 19, "operation": "subtract"}),
+    ("2 to the power of 8", "basic_calculator", {"num1": 2, "num2": 8, "operation": "power"}),
+    ("17 mod 5", "basic_calculator", {"num1": 17, "num2": 5, "operation": "modulus"}),
+    ("Divide 81 by 9", "basic_calculator", {"num1": 81, "num2": 9, "operation": "divide"}),
+    ("What is fifteen plus seven?", "basic_calculator", None),
+    ("Is 5 greater than 3?", "basic_calculator", None),
+    ("What's the sum of 4, 5 and 6?", "basic_calculator", None),
+    ("Reverse the word 'hello world'", "reverse_string", "hello world"),
+    ("Can you reverse 'Python Programming'?", "reverse_string", "Python Programming"),
+    ("Reverse of 'Howwwww'?", "reverse_string", "Howwwww"),
+    ("What is the reverse of Python?", "reverse_string", "Python"),
+    ("reverse \"racecar\"", "reverse_string", "racecar"),
+    ("Reverse hello world", "reverse_string", None),
+    ("Write 'stressed' backwards", "reverse_string", None),
+    ("Set a timer for 10 seconds", "timer", "10"),
+    ("Timer for 60 seconds", "timer", "60"),
+    ("set a timer for 2 minutes", "timer", "120"),
+    ("Set a 5 minute timer", "timer", "300"),
+    ("countdown 30", "timer", "30"),
+    ("Remind me in 10 seconds", "timer", None),
+    ("Summarize the text: 'This is a long text that needs to be summarized.'", "summarise_text", None),
+    ("Can you summarize 'this paragraph'?", "summarise_text", None),
+    ("Generate a summary of this 'long paragraph'.", "summarise_text", None),
+    ("Give me the gist of this: 'a very long story'", "summarise_text", None),
+    ("Who are you?", "no tool", None),
+    ("How are you?", "no tool", None),
+    ("What can you help me with?", "no tool", None),
+    ("What day comes after Sunday?", "no tool", None),
+    ("What is the capital of France?", "no tool", None),
+    ("Tell me a joke about timers", "no tool", None),
+    ("Why do people reverse park?", "no tool", None),
+    ("What is 5G?", "no tool", None),
+    ("Explain what a summary is", "no tool", None),
+]
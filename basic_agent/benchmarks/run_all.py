@@ -0,0 +1,136 @@
+import argparse, json, os, subprocess, sys, time
+
+# suite label -> bench module and the arguments that keep a full run to a few minutes, without real models
+SUITE = {
+    "micro": ("bench_micro", []),
+    "calculator": ("bench_calculator", []),
+    "workloads": ("bench_workloads", []),
+    "workloads_routed": ("bench_workloads", ["--router"]),
+    "http_client": ("bench_http_client", []),
+    "streaming": ("bench_streaming", ["--turns", "20"]),
+    "early_dispatch": ("bench_early_dispatch", ["--turns", "20"]),
+    "prompt_cache": ("bench_prompt_cache", []),
+    "response_cache": ("bench_response_cache", []),
+    "router": ("bench_router", ["--iterations", "200"]),
+    "prompts": ("bench_prompts", []),
+    "singleflight": ("bench_singleflight", []),
+    "server": ("bench_server", []),
+    "ollama_pool": ("bench_ollama_pool", []),
+    "tool_executor": ("bench_tool_executor", []),
+    "timers": ("bench_timers", []),
+    "metrics": ("bench_metrics", []),
+    "streamlit": ("bench_streamlit", ["--turns", "100"]),
+}
+
+# benches that load the summarization model or spawn many interpreters; only run when asked for
+HEAVY = {
+    "startup": ("bench_startup", []),
+    "micro_summarizer": ("bench_micro", ["--iterations", "1000", "--summarizer", "5"]),
+    "workloads_summarise": ("bench_workloads", ["--workloads", "summarise", "--turns", "10"]),
+    "summarizer_batching": ("bench_summarizer_batching", []),
+    "summarizer_backends": ("bench_summarizer_backends", []),
+    "chunked_summary": ("bench_chunked_summary", []),
+}
+
+
+def run_bench(module, arguments, timeout):
+    """
+    Runs one bench module in a fresh interpreter and returns the results of its JSON line.
+
+    Parameters:
+    module (str): Module name inside the benchmarks package.
+    arguments (list): Command-line arguments for the bench.
+    timeout (float): Seconds the bench may take.
+
+    Returns:
+    list: The bench's result records.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run([sys.executable, "-m", f"benchmarks.{module}", *arguments], cwd = root,
+                               capture_output = True, text = True, timeout = timeout, env = {**os.environ, "AGENT_DEBUG": "0"})
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"exit code {completed.returncode}")
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith('{"timestamp"'):
+            return json.loads(line)["results"]
+    raise RuntimeError("no JSON result line in the output")
+
+
+def worse(field, baseline, current, tolerance):
+    """
+    Returns whether a metric moved the wrong way by more than the tolerance (a fraction of the baseline).
+    Throughputs should not drop; latencies and durations (`*_ms`, `*_s`, `*_ns`) should not grow.
+    """
+    if not isinstance(baseline, (int, float)) or not isinstance(current, (int, float)) or baseline <= 0:
+        return False
+    if field.startswith("throughput"):
+        return current < baseline * (1 - tolerance)
+    if field.endswith(("_ms", "_s", "_ns")):
+        return current > baseline * (1 + tolerance)
+    return False
+
+
+def compare(baseline, current, tolerance):
+    """
+    Lists the metrics of the current run that regressed against the baseline run.
+
+    Returns:
+    list: `(suite label, case, field, baseline value, current value)` tuples.
+    """
+    regressions = []
+    for label, results in current.items():
+        previous = {result["name"]: result for result in baseline.get(label) or []}
+        for result in results or []:
+            old = previous.get(result["name"])
+            if old is None:
+                continue
+            for field, value in result.items():
+                if worse(field, old.get(field), value, tolerance):
+                    regressions.append((label, result["name"], field, old[field], value))
+    return regressions
+
+
+def main(labels, output, baseline_path, tolerance, timeout):
+    suite = {**SUITE, **HEAVY}
+    benches = {}
+    failures = {}
+    for label in labels:
+        module, arguments = suite[label]
+        start = time.perf_counter()
+        try:
+            benches[label] = run_bench(module, arguments, timeout)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            failures[label] = str(e)
+            print(f"[error]: {label}: {e}")
+            continue
+        print(f"[bench]: {label}: {len(benches[label])} results in {time.perf_counter() - start:.1f} s")
+
+    run = {"timestamp": time.time(), "python": sys.version.split()[0], "benches": benches, "failures": failures}
+    if output:
+        with open(output, "w") as f:
+            json.dump(run, f, indent = 2)
+        print(f"[bench]: results written to {output}")
+
+    regressions = []
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline["benches"], benches, tolerance)
+        for label, name, field, old, new in regressions:
+            print(f"[regression]: {label}/{name}: {field} {old} -> {new}")
+        if not regressions:
+            print(f"[bench]: no regressions beyond {tolerance:.0%} against {baseline_path}")
+    return 1 if regressions or failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run the benchmark suite, save the results and compare them against a baseline run.")
+    parser.add_argument("--only", nargs = "+", choices = sorted({**SUITE, **HEAVY}), help = "suite entries to run instead of the default suite")
+    parser.add_argument("--heavy", action = "store_true", help = "also run the benches that load the summarization model")
+    parser.add_argument("--out", default = None, help = "file to write the collected results to (JSON)")
+    parser.add_argument("--baseline", default = None, help = "results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type = float, default = 0.2, help = "allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--timeout", type = float, default = 600, help = "seconds each bench may take")
+    args = parser.parse_args()
+    labels = args.only or (list(SUITE) + (list(HEAVY) if args.heavy else []))
+    sys.exit(main(labels, args.out, args.baseline, args.tolerance, args.timeout))
@@ -0,0 +1,75 @@
+import random
+
+# canned prompts for each tool path of Agent.work, with the decision a well-behaved model returns for them
+CALCULATOR = [
+    ("Calculate 15 plus 7", {"tool_choice": "basic_calculator", "tool_input": {"num1": 15, "num2": 7, "operation": "add"}}),
+    ("What is 100 divided by 5?", {"tool_choice": "basic_calculator", "tool_input": {"num1": 100, "num2": 5, "operation": "divide"}}),
+    ("Multiply 23 and 4", {"tool_choice": "basic_calculator", "tool_input": {"num1": 23, "num2": 4, "operation": "multiply"}}),
+    ("What's two to the power of ten?", {"tool_choice": "basic_calculator", "tool_input": {"num1": 2, "num2": 10, "operation": "power"}}),
+    ("How much is 7 take away 12?", {"tool_choice": "basic_calculator", "tool_input": {"num1": 7, "num2": 12, "operation": "subtract"}}),
+]
+
+REVERSE = [
+    ("Reverse the word 'hello world'", {"tool_choice": "reverse_string", "tool_input": "hello world"}),
+    ("What is the reverse of Python?", {"tool_choice": "reverse_string", "tool_input": "Python"}),
+    ("Can you reverse 'Python Programming'?", {"tool_choice": "reverse_string", "tool_input": "Python Programming"}),
+    ("Write stressed backwards", {"tool_choice": "reverse_string", "tool_input": "stressed"}),
+]
+
+TIMER = [
+    ("Set a timer for 600 seconds", {"tool_choice": "timer", "tool_input": "600"}),
+    ("Timer for 900 seconds", {"tool_choice": "timer", "tool_input": "900"}),
+    ("Remind me in a quarter of an hour", {"tool_choice": "timer", "tool_input": "900"}),
+]
+
+SUMMARISE = [
+    ("Summarize the text: 'The city council met on Tuesday to discuss the new budget. After hours of debate, members "
+     "agreed to increase funding for public transport and parks, while cutting spending on administration.'",
+     {"tool_choice": "summarise_text", "tool_input": "The city council met on Tuesday to discuss the new budget."}),
+    ("Can you summarize 'Researchers found that regular exercise improves sleep quality, mood and concentration, "
+     "and that even short daily walks make a measurable difference over a few weeks.'?",
+     {"tool_choice": "summarise_text", "tool_input": "Researchers found that regular exercise improves sleep quality."}),
+]
+
+NO_TOOL = [
+    ("Who are you?", {"tool_choice": "no tool", "tool_input": "I am an AI assistant that can help you with calculations, reverse text, timers and summaries. How can I help you today?"}),
+    ("What can you do?", {"tool_choice": "no tool", "tool_input": "I can perform calculations, reverse strings, set timers, summarise text and answer general questions."}),
+    ("What day comes after Sunday?", {"tool_choice": "no tool", "tool_input": "Monday comes after Sunday."}),
+    ("How are you?", {"tool_choice": "no tool", "tool_input": "I'm functioning well, thank you for asking! How can I help you?"}),
+]
+
+
+class Workload:
+    def __init__(self, name, cases):
+        """
+        A reproducible stream of prompts for one tool path.
+
+        Parameters:
+        name (str): Name of the workload.
+        cases (list): `(prompt, decision)` pairs; the decision is what the mock model answers.
+        """
+        self.name = name
+        self.cases = cases
+
+    def responses(self):
+        """
+        Returns the decision for every prompt, for MockOllama's `responses`.
+        """
+        return dict(self.cases)
+
+    def prompts(self, turns, seed = 0):
+        """
+        Returns `turns` prompts drawn from the cases; the same seed always gives the same sequence.
+        """
+        rng = random.Random(seed)
+        return [rng.choice(self.cases)[0] for _ in range(turns)]
+
+
+WORKLOADS = {
+    "calculator": Workload("calculator", CALCULATOR),
+    "reverse": Workload("reverse", REVERSE),
+    "timer": Workload("timer", TIMER),
+    "no_tool": Workload("no_tool", NO_TOOL),
+    "summarise": Workload("summarise", SUMMARISE),  # runs the real summarization model
+    "mixed": Workload("mixed", CALCULATOR + REVERSE + TIMER + NO_TOOL),
+}
@@ -0,0 +1,72 @@
+import asyncio, queue, threading
+
+_DONE = object()
+
+
+class BackgroundLoop:
+    def __init__(self, name = "agent-loop"):
+        """
+        An event loop running forever in a daemon thread, for synchronous callers such as Streamlit.
+
+        Everything bound to a loop (pooled HTTP sessions, timers, coalesced calls, health checks) lives
+        as long as this loop does, instead of dying with an `asyncio.run` per call.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target = self._run, name = name, daemon = True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine):
+        """
+        Schedules a coroutine on the loop from any thread.
+
+        Returns:
+        concurrent.futures.Future: The coroutine's future result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout = None):
+        """
+        Runs a coroutine on the loop and waits for its result.
+        """
+        return self.submit(coroutine).result(timeout)
+
+    def stream(self, async_iterable):
+        """
+        Iterates an async iterable on the loop and yields its items to the calling thread as they arrive.
+
+        If the caller stops iterating early, the async iterable is cancelled on the loop.
+        """
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in async_iterable:
+                    items.put(item)
+            except BaseException as e:
+                items.put(e)
+                raise
+            finally:
+                items.put(_DONE)
+
+        future = self.submit(pump())
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def stop(self, timeout = 5):
+        """
+        Stops the loop and waits for its thread to finish.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
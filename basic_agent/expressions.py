@@ -0,0 +1,203 @@
+import ast, functools, math, operator
+
+# the calculator's operations by name; the expression evaluator dispatches its operators through the same table
+OPERATIONS = {
+    'add': operator.add, # +
+    'plus': operator.add, # +
+    'subtract': operator.sub, # -
+    'minus': operator.sub,  # -
+    'multiply': operator.mul, # *
+    'times': operator.mul,  # *
+    'divide': operator.truediv, # /
+    'floor_divide': operator.floordiv, # //
+    'modulus': operator.mod, # %
+    'power': operator.pow, # **
+    'lt': operator.lt, # <
+    'le': operator.le, # <=
+    'eq': operator.eq, # ==
+    'ne': operator.ne, # !=
+    'ge': operator.ge, # >=
+    'gt': operator.gt # >
+}
+DIVISIONS = {operator.truediv, operator.floordiv, operator.mod}
+
+BINARY_OPERATORS = {
+    ast.Add: OPERATIONS['add'], ast.Sub: OPERATIONS['subtract'], ast.Mult: OPERATIONS['multiply'],
+    ast.Div: OPERATIONS['divide'], ast.FloorDiv: OPERATIONS['floor_divide'], ast.Mod: OPERATIONS['modulus'],
+    ast.Pow: OPERATIONS['power'],
+}
+COMPARISONS = {
+    ast.Lt: OPERATIONS['lt'], ast.LtE: OPERATIONS['le'], ast.Eq: OPERATIONS['eq'],
+    ast.NotEq: OPERATIONS['ne'], ast.GtE: OPERATIONS['ge'], ast.Gt: OPERATIONS['gt'],
+}
+UNARY_OPERATORS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+CONSTANTS = {"pi": math.pi, "e": math.e}
+
+
+def round_number(x, digits = 0):
+    return round(x, int(digits))  # literals are floats, but a number of digits has to be an integer
+
+
+def round_array(np, x, digits = 0):
+    return np.round(x, int(digits))
+
+
+# functions an expression may call: (on numbers, on arrays); the array versions take numpy as their first argument,
+# and sum/mean/min/max of a single array reduce it
+FUNCTIONS = {
+    "abs": (abs, lambda np, *args: np.abs(*args)),
+    "round": (round_number, round_array),
+    "sqrt": (math.sqrt, lambda np, x: np.sqrt(x)),
+    "sum": (lambda *args: math.fsum(args), lambda np, *args: np.sum(args[0]) if len(args) == 1 else functools.reduce(operator.add, args)),
+    "mean": (lambda *args: math.fsum(args) / len(args), lambda np, *args: np.mean(args[0]) if len(args) == 1 else np.mean(args, axis = 0)),
+    "min": (min, lambda np, *args: np.min(args[0]) if len(args) == 1 else functools.reduce(np.minimum, args)),
+    "max": (max, lambda np, *args: np.max(args[0]) if len(args) == 1 else functools.reduce(np.maximum, args)),
+}
+
+MAX_EXPRESSION_LENGTH = 100_000
+# numbers a variable may hold; converting a Python list to an array holds the GIL, so even in a worker
+# thread a much larger one would stall the event loop
+MAX_ELEMENTS = 1_000_000
+
+
+def numpy():
+    """
+    Imports numpy on first use, so scalar arithmetic never pays for it.
+    """
+    import numpy
+    return numpy
+
+
+def is_array(value):
+    return getattr(value, "ndim", 0) > 0
+
+
+def to_operand(value):
+    """
+    Converts a number, or a (nested) list of numbers, to what the evaluator computes with: a float, or a float array.
+    """
+    if type(value) in (int, float):
+        return float(value)  # floats, so 10 ** 10 ** 10 overflows instead of building a huge integer
+    if isinstance(value, (list, tuple)):
+        count = sum(len(item) if isinstance(item, (list, tuple)) else 1 for item in value)
+        if count > MAX_ELEMENTS:
+            raise ValueError(f"Too many numbers ({count}, at most {MAX_ELEMENTS}).")
+        array = numpy().asarray(value, dtype = float)
+        if array.size > MAX_ELEMENTS:
+            raise ValueError(f"Too many numbers ({array.size}, at most {MAX_ELEMENTS}).")
+        return array
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"Expected a number or a list of numbers, got {value!r}.")
+    return float(value)
+
+
+def apply(operation, left, right):
+    """
+    Applies a binary operation from OPERATIONS to numbers or arrays; array operations run element-wise in numpy.
+
+    Raises:
+    ZeroDivisionError: If a division's divisor is, or contains, zero.
+    """
+    if operation in DIVISIONS and (bool((right == 0).any()) if is_array(right) else right == 0):
+        raise ZeroDivisionError("Division by zero is not allowed")
+    if is_array(left) or is_array(right):
+        with numpy().errstate(over = "raise", invalid = "raise"):
+            return operation(left, right)
+    return operation(left, right)
+
+
+def call(name, args):
+    scalar_function, array_function = FUNCTIONS[name]
+    if any(is_array(arg) for arg in args):
+        np = numpy()
+        with np.errstate(over = "raise", invalid = "raise"):
+            return array_function(np, *args)
+    return scalar_function(*args)
+
+
+def compile_node(node, names):
+    """
+    Turns a node of a parsed expression into a function of the variables. Only numbers, lists of numbers, the
+    operators in the tables above, the FUNCTIONS and the given variable names are allowed; anything else raises.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda variables: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in names:
+            return lambda variables: variables[name]
+        if name in CONSTANTS:
+            value = CONSTANTS[name]
+            return lambda variables: value
+        raise ValueError(f"Unknown name {name!r}; expected one of {', '.join(sorted(set(names) | set(CONSTANTS)))}.")
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        operation, left, right = BINARY_OPERATORS[type(node.op)], compile_node(node.left, names), compile_node(node.right, names)
+        return lambda variables: apply(operation, left(variables), right(variables))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        operation, operand = UNARY_OPERATORS[type(node.op)], compile_node(node.operand, names)
+        return lambda variables: operation(operand(variables))
+    if isinstance(node, ast.Compare) and all(type(op) in COMPARISONS for op in node.ops):
+        operands = [compile_node(operand, names) for operand in [node.left, *node.comparators]]
+        comparisons = [COMPARISONS[type(op)] for op in node.ops]
+
+        def compare(variables):
+            values = [operand(variables) for operand in operands]
+            # `a < b < c` is `a < b and b < c`; `&` keeps it element-wise for arrays
+            return functools.reduce(operator.and_, (comparison(left, right) for comparison, left, right
+                                                    in zip(comparisons, values, values[1:])))
+        return compare
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS and node.args and not node.keywords:
+        name, args = node.func.id, [compile_node(arg, names) for arg in node.args]
+        return lambda variables: call(name, [arg(variables) for arg in args])
+    if isinstance(node, (ast.List, ast.Tuple)) and node.elts:
+        elements = [compile_node(element, names) for element in node.elts]
+        if all(isinstance(element, ast.Constant) for element in node.elts):
+            array = to_operand([element(None) for element in elements])  # a literal list of numbers is converted once
+            return lambda variables: array
+        return lambda variables: numpy().asarray([element(variables) for element in elements], dtype = float)
+    raise ValueError(f"Unsupported expression element: {ast.dump(node)[:80]}.")
+
+
+@functools.lru_cache(maxsize = 256)
+def compile_expression(expression, names = ()):
+    """
+    Parses and compiles an arithmetic expression once; repeated expressions come from the cache.
+
+    Parameters:
+    expression (str): The expression, e.g. "(15 + 7) * 2" or "sum(x * 1.08)".
+    names (tuple): Names of the variables the expression may use.
+
+    Returns:
+    callable: Evaluates the expression given a dict of the variables' values.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression is too long ({len(expression)} characters, at most {MAX_EXPRESSION_LENGTH}).")
+    tree = ast.parse(expression.replace("^", "**").strip(), mode = "eval")
+    return compile_node(tree.body, names)
+
+
+def evaluate(expression, variables = None):
+    """
+    Safely evaluates an arithmetic expression. Nothing is `eval`ed: the expression is parsed and only numbers,
+    + - * / // % ** (or ^), comparisons, parentheses, pi, e and the FUNCTIONS are allowed. Variables that are
+    lists, and list literals, are numpy arrays, so the expression is computed over all their elements at once.
+
+    Parameters:
+    expression (str): The expression, e.g. "2 ^ 10 / 4" or "x * 1.08" with x a list of prices.
+    variables (dict): Values of the names used in the expression, numbers or lists of numbers.
+
+    Returns:
+    float or bool or numpy.ndarray: The result.
+
+    Raises:
+    ValueError: If the expression has a syntax error or uses anything that isn't allowed.
+    ZeroDivisionError: If it divides by zero.
+    """
+    variables = {name: to_operand(value) for name, value in (variables or {}).items()}
+    try:
+        function = compile_expression(expression, tuple(sorted(variables)))
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression {expression!r}: {e.msg}.") from None
+    return function(variables)
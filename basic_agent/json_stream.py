@@ -0,0 +1,202 @@
+import json
+
+# decoded values of the single-character JSON string escapes
+ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class IncrementalJsonParser:
+    def __init__(self):
+        """
+        Incrementally parses one streamed JSON object, such as the agent's `tool_choice`/`tool_input` answer.
+
+        Text is fed in chunks as it arrives. Top-level string values are decoded as they stream in, and
+        every top-level value is reported as soon as it is complete, without waiting for the closing brace.
+        """
+        self.values = {}  # completed top-level values
+        self.partial = {}  # decoded text so far of top-level string values
+        self.done = False
+        self._depth = 0
+        self._expect = "key"  # what comes next inside the top-level object: key, colon, value, scalar or comma
+        self._in_string = False
+        self._string_role = None  # key, value (a top-level string) or nested
+        self._escape = False
+        self._unicode = None  # hex digits collected for a \u escape
+        self._surrogate = None  # high surrogate waiting for its low half
+        self._key_chars = []
+        self._key = None
+        self._raw = []  # raw JSON text of the value being parsed
+
+    def feed(self, chunk):
+        """
+        Feeds the next chunk of streamed text to the parser.
+
+        Parameters:
+        chunk (str): The next piece of the JSON text.
+
+        Returns:
+        list: Events as (kind, key, payload) tuples, in order. `("delta", key, text)` carries newly decoded
+              text of a top-level string value; `("value", key, value)` carries a completed top-level value.
+        """
+        events = []
+        delta = []
+        for char in chunk:
+            if self.done:
+                break
+            if self._in_string:
+                self._string_char(char, delta, events)
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+            elif self._depth == 1:
+                self._top_level_char(char, events)
+            else:
+                self._nested_char(char, events)
+        if delta:
+            self._emit_delta(delta, events)
+        return events
+
+    def _string_char(self, char, delta, events):
+        """
+        Handles one character inside a string, decoding top-level string values on the fly.
+        """
+        if self._string_role != "key":
+            self._raw.append(char)
+        if self._string_role != "value":
+            # keys and nested strings are decoded with json.loads once they're complete
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._end_string(delta, events)
+                return
+            if self._string_role == "key":
+                self._key_chars.append(char)
+            return
+
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) == 4:
+                self._decode_unicode(delta)
+        elif self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                delta.append(ESCAPES.get(char, char))
+        elif char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._end_string(delta, events)
+        else:
+            delta.append(char)
+
+    def _decode_unicode(self, delta):
+        """
+        Decodes a completed \\uXXXX escape, pairing UTF-16 surrogates.
+        """
+        try:
+            code = int(self._unicode, 16)
+        except ValueError:
+            code = 0xFFFD
+        self._unicode = None
+        if 0xD800 <= code < 0xDC00:
+            self._surrogate = code
+            return
+        if self._surrogate is not None and 0xDC00 <= code < 0xE000:
+            code = 0x10000 + ((self._surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._surrogate = None
+        delta.append(chr(code))
+
+    def _end_string(self, delta, events):
+        """
+        Closes the current string and advances the state depending on what the string was.
+        """
+        self._in_string = False
+        if self._string_role == "key":
+            self._key = self._loads('"' + "".join(self._key_chars) + '"')
+            self._key_chars = []
+            self._expect = "colon"
+        elif self._string_role == "value":
+            self._emit_delta(delta, events)
+            self._finish_value(events)
+            self._expect = "comma"
+
+    def _top_level_char(self, char, events):
+        """
+        Handles one character between the keys and values of the top-level object.
+        """
+        if self._expect == "key":
+            if char == '"':
+                self._in_string = True
+                self._string_role = "key"
+                self._key_chars = []
+            elif char == "}":
+                self.done = True
+        elif self._expect == "colon":
+            if char == ":":
+                self._expect = "value"
+        elif self._expect == "value":
+            if char.isspace():
+                return
+            self._raw = [char]
+            if char == '"':
+                self._in_string = True
+                self._string_role = "value"
+                self.partial[self._key] = ""
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._expect = "scalar"
+        elif self._expect == "scalar":
+            if char in ",}":
+                self._finish_value(events)
+                self._expect = "key"
+                self.done = char == "}"
+            else:
+                self._raw.append(char)
+        elif self._expect == "comma":
+            if char == ",":
+                self._expect = "key"
+            elif char == "}":
+                self.done = True
+
+    def _nested_char(self, char, events):
+        """
+        Handles one character of a nested object or array, which is reported only once complete.
+        """
+        self._raw.append(char)
+        if char == '"':
+            self._in_string = True
+            self._string_role = "nested"
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 1:
+                self._finish_value(events)
+                self._expect = "comma"
+
+    def _emit_delta(self, delta, events):
+        if not delta or self._string_role != "value":
+            return
+        text = "".join(delta)
+        delta.clear()
+        self.partial[self._key] += text
+        events.append(("delta", self._key, text))
+
+    def _finish_value(self, events):
+        value = self._loads("".join(self._raw).strip())
+        self._raw = []
+        self.values[self._key] = value
+        events.append(("value", self._key, value))
+
+    @staticmethod
+    def _loads(text):
+        """
+        Decodes a complete JSON value, falling back to the raw text if the model produced invalid JSON.
+        """
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
@@ -0,0 +1,201 @@
+import bisect, contextlib, json, math, os, threading, time
+
+# seconds; covers everything from a parsed token to a long summary
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# debug prints are on unless AGENT_DEBUG is set to 0/false/no/off, e.g. in production
+DEBUG = os.environ.get("AGENT_DEBUG", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def set_debug(enabled):
+    """
+    Turns the debug prints on or off at runtime.
+    """
+    global DEBUG
+    DEBUG = enabled
+
+
+def debug(*args, **kwargs):
+    """
+    Prints like `print`, but only while debug output is enabled.
+    """
+    if DEBUG:
+        print(*args, **kwargs)
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def format_labels(key, extra = ()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, description):
+        """
+        A monotonically increasing count, optionally split by labels.
+        """
+        self.name = name
+        self.description = description
+        self.kind = "counter"
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount = 1, **labels):
+        key = label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(label_key(labels), 0)
+
+    def prometheus(self):
+        return [f"{self.name}{format_labels(key)} {format_value(value)}" for key, value in sorted(self._values.items())]
+
+    def as_dict(self):
+        return [{"labels": dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    def __init__(self, name, description, buckets = DEFAULT_BUCKETS):
+        """
+        A distribution of observed values (usually seconds) in cumulative buckets, optionally split by labels.
+        """
+        self.name = name
+        self.description = description
+        self.kind = "histogram"
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}  # label key -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def quantile(self, q, **labels):
+        """
+        Estimates a quantile (0-1) from the buckets, as Prometheus' histogram_quantile does.
+        """
+        series = self._series.get(label_key(labels))
+        if series is None or series[2] == 0:
+            return None
+        rank = q * series[2]
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, series[0]):
+            if count and cumulative + count >= rank:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound if bound != math.inf else lower
+        return lower
+
+    def prometheus(self):
+        lines = []
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(key, [('le', format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(key)} {count}")
+        return lines
+
+    def as_dict(self):
+        series = []
+        for key, (_, total, count) in sorted(self._series.items()):
+            labels = dict(key)
+            series.append({"labels": labels, "count": count, "sum": total, "mean": total / count if count else 0.0,
+                           "p50": self.quantile(0.5, **labels), "p99": self.quantile(0.99, **labels)})
+        return series
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Holds the process's counters and histograms and exports them.
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, description):
+        """
+        Returns the counter with the given name, creating it on first use.
+        """
+        return self.register(Counter(name, description))
+
+    def histogram(self, name, description, buckets = DEFAULT_BUCKETS):
+        """
+        Returns the histogram with the given name, creating it on first use.
+        """
+        return self.register(Histogram(name, description, buckets))
+
+    def prometheus(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.prometheus())
+        return "\n".join(lines) + "\n"
+
+    def as_dict(self):
+        return {name: {"type": metric.kind, "description": metric.description, "series": metric.as_dict()}
+                for name, metric in sorted(self._metrics.items())}
+
+    def json(self):
+        """
+        Returns every metric as JSON, with estimated p50/p99 for histograms.
+        """
+        return json.dumps(self.as_dict())
+
+
+# process-wide registry every component records into
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram("agent_stage_seconds", "Time spent in each stage of the agent pipeline.")
+STAGE_ERRORS = metrics.counter("agent_stage_errors_total", "Stages that ended with an exception.")
+
+
+@contextlib.contextmanager
+def span(stage, **labels):
+    """
+    Times the enclosed block as one stage of the pipeline, e.g. `with span("dispatch", tool = name):`.
+    The duration goes to the `agent_stage_seconds` histogram; exceptions are counted and re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage = stage, **labels)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage = stage, **labels)
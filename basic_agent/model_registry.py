@@ -0,0 +1,89 @@
+import threading
+from metrics import debug
+
+
+class ModelRegistry:
+    def __init__(self):
+        """
+        Process-wide registry of models that are loaded lazily, once, on first use.
+
+        Loading is thread-safe: concurrent callers of `get` wait for a single load instead of each
+        loading their own copy.
+        """
+        self._loaders = {}
+        self._models = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """
+        Registers a model without loading it.
+
+        Parameters:
+        name (str): Name the model is looked up by.
+        loader (callable): Function without arguments that loads and returns the model.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name):
+        """
+        Returns the model, loading it first if needed. Blocks while the model loads, so call it from a
+        worker thread (e.g. with `asyncio.to_thread`) inside the event loop.
+
+        Parameters:
+        name (str): Name of a registered model.
+
+        Returns:
+        object: Whatever the model's loader returned.
+
+        Raises:
+        KeyError: If no model is registered under the name.
+        """
+        if name in self._models:
+            return self._models[name]
+        with self._locks[name]:
+            if name not in self._models:
+                self._models[name] = self._loaders[name]()
+                debug(f"[model-registry]: Loaded '{name}'.")
+        return self._models[name]
+
+    def is_loaded(self, name):
+        """
+        Checks whether a model has been loaded.
+        """
+        return name in self._models
+
+    def warm_up(self, name):
+        """
+        Starts loading a model in a background thread, so the first request doesn't pay for it.
+
+        Parameters:
+        name (str): Name of a registered model.
+
+        Returns:
+        threading.Thread: The loading thread, or None if the model is already loaded.
+        """
+        if self.is_loaded(name):
+            return None
+        thread = threading.Thread(target = self._warm_up, args = (name,), name = f"warm-up-{name}", daemon = True)
+        thread.start()
+        return thread
+
+    def _warm_up(self, name):
+        try:
+            self.get(name)
+        except Exception as e:
+            # the next `get` retries and reports the error to its caller
+            print(f"[model-registry]: Warming up '{name}' failed: {str(e)}.")
+
+    def unload(self, name):
+        """
+        Drops a loaded model, so the next `get` loads it again.
+        """
+        with self._locks[name]:
+            self._models.pop(name, None)
+
+
+registry = ModelRegistry()
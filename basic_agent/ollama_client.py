@@ -0,0 +1,453 @@
+import asyncio, json, random, time, aiohttp
+
+
+class OllamaClient:
+    def __init__(self, base_url = "http://localhost:11434", pool_size = 10, keepalive_timeout = 30,
+                 total_timeout = 120, connect_timeout = 5):
+        """
+        Initializes a long-lived, pooled HTTP client for talking to an Ollama server.
+
+        Parameters:
+        base_url (str): Base URL of the Ollama server.
+        pool_size (int): Maximum number of simultaneous connections kept in the pool.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        total_timeout (float): Upper bound in seconds for a whole request, including reading the body.
+        connect_timeout (float): Upper bound in seconds for establishing a new connection.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total = total_timeout, connect = connect_timeout)
+        self.headers = {"Content-Type": "application/json"}
+        self._sessions = {}  # event loop -> the session bound to it
+        self._closers = {}  # event loop -> the task that closes its session when cancelled
+        self.in_flight = 0  # requests sent and not yet finished, a measure of how busy the backend is
+
+    async def session(self):
+        """
+        Returns the shared session of the running event loop, creating it on first use.
+
+        A session is bound to the event loop it was created on, so each loop the client is used from (e.g.
+        one `asyncio.run` per batch) gets its own. Each session is closed on its own loop when that loop
+        shuts down (`asyncio.run` cancels the pending tasks before closing it), or by `close`.
+
+        Returns:
+        aiohttp.ClientSession: The pooled session for the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            for old_loop in [old_loop for old_loop in self._sessions if old_loop.is_closed()]:
+                # closed without cancelling its tasks, so its sockets can't be closed from here; just drop the reference
+                self._sessions.pop(old_loop).detach()
+                self._closers.pop(old_loop, None)
+            if loop in self._closers:
+                self._closers.pop(loop).cancel()
+            connector = aiohttp.TCPConnector(limit = self.pool_size, keepalive_timeout = self.keepalive_timeout)
+            session = self._sessions[loop] = aiohttp.ClientSession(connector = connector, timeout = self.timeout, headers = self.headers)
+            self._closers[loop] = loop.create_task(self.close_when_cancelled(session))
+        return session
+
+    @staticmethod
+    async def close_when_cancelled(session):
+        """
+        Waits until cancelled, then closes the session; cancelling it closes the session on its own loop.
+        """
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await session.close()
+
+    async def generate(self, payload):
+        """
+        Sends a non-streaming request to Ollama's `/api/generate` endpoint.
+
+        Parameters:
+        payload (dict): The JSON body of the request.
+
+        Returns:
+        dict: The decoded JSON response from Ollama.
+
+        Raises:
+        aiohttp.ClientError: If the request fails, Ollama answers with an error status, or its answer isn't JSON
+                             or is an `{"error": ...}` object.
+        asyncio.TimeoutError: If the request takes longer than the configured timeouts.
+        """
+        session = await self.session()
+        self.in_flight += 1
+        try:
+            async with session.post(f"{self.base_url}/api/generate", json = payload) as request_response:
+                request_response.raise_for_status()
+                return decode_chunk(await request_response.read())
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, payload):
+        """
+        Sends a streaming request to Ollama's `/api/generate` endpoint and yields each chunk as it arrives.
+
+        Parameters:
+        payload (dict): The JSON body of the request; `stream` is forced to True.
+
+        Yields:
+        dict: Each decoded newline-delimited JSON chunk, up to and including the one with `done` set.
+
+        Raises:
+        aiohttp.ClientError: If the request fails, Ollama answers with an error status, or a chunk isn't JSON or
+                             is an `{"error": ...}` object (Ollama reports failures mid-stream that way).
+        asyncio.TimeoutError: If the request takes longer than the configured timeouts.
+        """
+        session = await self.session()
+        self.in_flight += 1
+        try:
+            async with session.post(f"{self.base_url}/api/generate", json = dict(payload, stream = True)) as request_response:
+                request_response.raise_for_status()
+                async for line in request_response.content:
+                    if not line.strip():
+                        continue
+                    chunk = decode_chunk(line)
+                    yield chunk
+                    if chunk.get("done"):
+                        break
+        finally:
+            self.in_flight -= 1
+
+    async def check_health(self, timeout = 2):
+        """
+        Asks the server for its version to see whether it is up.
+
+        Returns:
+        bool: Whether the server answered with a success status within `timeout` seconds.
+        """
+        session = await self.session()
+        try:
+            async with session.get(f"{self.base_url}/api/version", timeout = aiohttp.ClientTimeout(total = timeout)) as request_response:
+                return request_response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def close(self):
+        """
+        Closes the pooled sessions and all of their connections; the sessions of other loops that are still
+        open are closed on their own loop.
+        """
+        loop = asyncio.get_running_loop()
+        sessions, self._sessions = self._sessions, {}
+        closers, self._closers = self._closers, {}
+        for session_loop, session in sessions.items():
+            if session_loop is loop:
+                closers[session_loop].cancel()
+                await session.close()
+            elif session_loop.is_closed():
+                session.detach()
+            else:
+                session_loop.call_soon_threadsafe(closers[session_loop].cancel)
+
+
+def decode_chunk(data):
+    """
+    Decodes a JSON object sent by Ollama.
+
+    Raises:
+    aiohttp.ClientPayloadError: If the data isn't a JSON object, or is Ollama's `{"error": ...}`, so callers
+                                handle it like any other failed request.
+    """
+    try:
+        chunk = json.loads(data)
+    except ValueError:
+        raise aiohttp.ClientPayloadError(f"Ollama sent invalid JSON: {data.strip()[:100]!r}") from None
+    if not isinstance(chunk, dict):
+        raise aiohttp.ClientPayloadError(f"Ollama sent {type(chunk).__name__} instead of an object")
+    if "error" in chunk:
+        raise aiohttp.ClientPayloadError(f"Ollama error: {chunk['error']}")
+    return chunk
+
+
+def retryable(error):
+    """
+    Checks whether a failed request is worth retrying on another endpoint: connection problems, timeouts
+    and server errors are; client errors such as an unknown model (4xx) would fail everywhere.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class Endpoint:
+    def __init__(self, client, failure_threshold = 3, cooldown = 10, smoothing = 0.2):
+        """
+        One Ollama server of a pool, with its circuit breaker and metrics.
+
+        The breaker opens after `failure_threshold` consecutive failures and the endpoint then gets no
+        traffic for `cooldown` seconds. After that a single trial request is let through (half-open): it
+        closes the breaker if it succeeds and reopens it if it fails.
+
+        Parameters:
+        client (OllamaClient): The client of the server.
+        failure_threshold (int): Consecutive failures that open the breaker.
+        cooldown (float): Seconds the breaker stays open.
+        smoothing (float): Weight of the newest sample in the latency moving average.
+        """
+        self.client = client
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.latency = None  # exponentially weighted moving average, in seconds
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial = False  # whether the half-open trial request is running
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def available(self):
+        """
+        Checks whether the endpoint may be sent a request now.
+        """
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self.trial)
+
+    def started(self):
+        self.requests += 1
+        if self.state == "half-open":
+            self.trial = True
+
+    def succeeded(self, latency):
+        """
+        Records a successful request and its latency in seconds, closing the breaker.
+        """
+        self.latency = latency if self.latency is None else self.smoothing * latency + (1 - self.smoothing) * self.latency
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failed(self):
+        """
+        Records a failed request, opening the breaker if there were too many in a row.
+        """
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.trial or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+    def stats(self):
+        return {"base_url": self.client.base_url, "state": self.state, "outstanding": self.client.in_flight,
+                "requests": self.requests, "failures": self.failures,
+                "latency_ms": None if self.latency is None else round(self.latency * 1000, 3)}
+
+
+class OllamaPool:
+    STRATEGIES = ("least_outstanding", "latency")
+
+    def __init__(self, base_urls, strategy = "least_outstanding", retries = 2, backoff = 0.1, failure_threshold = 3,
+                 cooldown = 10, health_interval = 5, **client_kwargs):
+        """
+        Spreads requests over several Ollama servers. It has the same interface as OllamaClient, so it
+        can be given to OllamaModel in its place.
+
+        Each request goes to the available endpoint with the fewest outstanding requests
+        (`least_outstanding`) or with the lowest expected wait, its latency average times its
+        outstanding requests plus one (`latency`). Failed requests are retried on another endpoint after
+        an exponential backoff with jitter; streams are only retried before their first chunk, since
+        what was already yielded can't be taken back. Failing endpoints are taken out of rotation by a
+        circuit breaker, and `start_health_checks` brings them back as soon as they answer again.
+
+        Parameters:
+        base_urls (list): Base URLs of the Ollama servers.
+        strategy (str): `least_outstanding` or `latency`.
+        retries (int): Extra attempts after a failed request.
+        backoff (float): Seconds before the first retry; doubled for every further one.
+        failure_threshold (int): Consecutive failures that take an endpoint out of rotation.
+        cooldown (float): Seconds a failing endpoint stays out of rotation before it is tried again.
+        health_interval (float): Seconds between two health checks of every endpoint.
+        **client_kwargs: Passed to the OllamaClient of each endpoint.
+        """
+        if not base_urls:
+            raise ValueError("OllamaPool needs at least one base URL.")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(self.STRATEGIES)}.")
+        self.endpoints = [Endpoint(OllamaClient(base_url, **client_kwargs), failure_threshold, cooldown) for base_url in base_urls]
+        self.strategy = strategy
+        self.retries = retries
+        self.backoff = backoff
+        self.health_interval = health_interval
+        self.retried = 0
+        self._health_task = None
+
+    @property
+    def base_url(self):
+        return self.endpoints[0].client.base_url
+
+    @property
+    def pool_size(self):
+        return sum(endpoint.client.pool_size for endpoint in self.endpoints)
+
+    @property
+    def in_flight(self):
+        return sum(endpoint.client.in_flight for endpoint in self.endpoints)
+
+    def choose(self, exclude = ()):
+        """
+        Picks the endpoint for the next request, ties broken at random.
+
+        Parameters:
+        exclude (iterable): Endpoints already tried for this request; used only if nothing else is available.
+
+        Returns:
+        Endpoint: The chosen endpoint, or None if every endpoint's breaker is open.
+        """
+        available = [endpoint for endpoint in self.endpoints if endpoint.available()]
+        candidates = [endpoint for endpoint in available if endpoint not in exclude] or available
+        if not candidates:
+            return None
+        if self.strategy == "latency":
+            # endpoints without a measurement yet look free, so they get sampled
+            cost = lambda endpoint: (endpoint.latency or 0.0) * (endpoint.client.in_flight + 1)
+        else:
+            cost = lambda endpoint: endpoint.client.in_flight
+        lowest = min(cost(endpoint) for endpoint in candidates)
+        return random.choice([endpoint for endpoint in candidates if cost(endpoint) == lowest])
+
+    async def wait_before_retry(self, attempt):
+        self.retried += 1
+        await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def unavailable(self):
+        return aiohttp.ClientConnectionError("No Ollama endpoint is available, every circuit breaker is open.")
+
+    async def generate(self, payload):
+        """
+        Sends a non-streaming request to one of the endpoints, retrying on another one if it fails.
+
+        Raises:
+        aiohttp.ClientError: If every attempt failed, or no endpoint is available.
+        asyncio.TimeoutError: If the last attempt timed out.
+        """
+        self.ensure_health_checks()
+        tried = []
+        for attempt in range(self.retries + 1):
+            endpoint = self.choose(tried)
+            if endpoint is None:
+                raise self.unavailable()
+            tried.append(endpoint)
+            endpoint.started()
+            start = time.perf_counter()
+            try:
+                response = await endpoint.client.generate(payload)
+            except asyncio.CancelledError:
+                endpoint.trial = False  # the trial didn't tell us anything, let another request try
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not retryable(e):
+                    endpoint.succeeded(time.perf_counter() - start)  # the server itself is fine
+                    raise
+                endpoint.failed()
+                if attempt == self.retries:
+                    raise
+                await self.wait_before_retry(attempt)
+                continue
+            endpoint.succeeded(time.perf_counter() - start)
+            return response
+
+    async def stream(self, payload):
+        """
+        Sends a streaming request to one of the endpoints and yields its chunks. A request that fails
+        before its first chunk is retried on another endpoint; later failures are raised.
+
+        Raises:
+        aiohttp.ClientError: If every attempt failed, or no endpoint is available.
+        asyncio.TimeoutError: If the last attempt timed out.
+        """
+        self.ensure_health_checks()
+        tried = []
+        for attempt in range(self.retries + 1):
+            endpoint = self.choose(tried)
+            if endpoint is None:
+                raise self.unavailable()
+            tried.append(endpoint)
+            endpoint.started()
+            start = time.perf_counter()
+            chunks = endpoint.client.stream(payload)
+            first = True
+            try:
+                async for chunk in chunks:
+                    if first:
+                        # time to first chunk: total time would mostly measure the answer's length
+                        endpoint.succeeded(time.perf_counter() - start)
+                        first = False
+                    yield chunk
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not first:
+                    endpoint.failed()
+                    raise
+                if not retryable(e):
+                    endpoint.succeeded(time.perf_counter() - start)
+                    raise
+                endpoint.failed()
+                if attempt == self.retries:
+                    raise
+            finally:
+                if first:
+                    endpoint.trial = False
+                await chunks.aclose()
+            await self.wait_before_retry(attempt)
+
+    def ensure_health_checks(self):
+        """
+        Starts the background health checks on the running loop, unless they are running already.
+        """
+        if self.health_interval and (self._health_task is None or self._health_task.done()
+                                     or self._health_task.get_loop() is not asyncio.get_running_loop()):
+            self._health_task = asyncio.get_running_loop().create_task(self._check_health())
+
+    async def _check_health(self):
+        """
+        Periodically probes every endpoint; a probe that fails counts as a failed request, and one that
+        succeeds puts an endpoint that was taken out of rotation back in.
+        """
+        while True:
+            await asyncio.sleep(self.health_interval)
+            results = await asyncio.gather(*(endpoint.client.check_health() for endpoint in self.endpoints))
+            for endpoint, healthy in zip(self.endpoints, results):
+                if healthy and endpoint.opened_at is not None:
+                    endpoint.consecutive_failures = 0
+                    endpoint.opened_at = None
+                    endpoint.trial = False
+                elif not healthy:
+                    endpoint.failed()
+
+    def stats(self):
+        """
+        Returns the metrics of every endpoint and the number of retries.
+        """
+        return {"strategy": self.strategy, "retried": self.retried, "endpoints": [endpoint.stats() for endpoint in self.endpoints]}
+
+    async def close(self):
+        """
+        Stops the health checks and closes every endpoint's client.
+        """
+        if self._health_task is not None and not self._health_task.done():
+            self._health_task.cancel()
+        self._health_task = None
+        for endpoint in self.endpoints:
+            await endpoint.client.close()
+
+
+def make_client(base_urls, **pool_kwargs):
+    """
+    Returns a client for the given Ollama servers: a plain OllamaClient for one, an OllamaPool for several.
+    """
+    if len(base_urls) == 1:
+        return OllamaClient(base_urls[0])
+    return OllamaPool(base_urls, **pool_kwargs)
+
+
+# process-wide client shared by every OllamaModel that isn't given its own
+default_client = OllamaClient()
@@ -0,0 +1,168 @@
+import json, re
+
+MODES = ("full", "compact")
+
+TOKEN = re.compile(r"\w+|[^\w\s]+")
+
+NO_TOOL = "no tool"
+
+
+class ToolDoc:
+    def __init__(self, name, purpose, input_format = None, rules = (), examples = (), keywords = ()):
+        """
+        What the model needs to know about one tool, kept as data so the system prompt can be rendered
+        at different lengths and for a subset of the tools.
+
+        Parameters:
+        name (str): Name of the tool, as the model must write it in `tool_choice`.
+        purpose (str): One sentence on when to use the tool.
+        input_format (str): The shape of `tool_input`.
+        rules (iterable): Additional instructions, only rendered in the full prompt.
+        examples (iterable): `(prompt, tool_input)` pairs; the compact prompt shows only the first.
+        keywords (iterable): Lower-case tokens that make the tool a candidate for a prompt (see PromptBuilder.select).
+        """
+        self.name = name
+        self.purpose = purpose
+        self.input_format = input_format
+        self.rules = list(rules)
+        self.examples = list(examples)
+        self.keywords = set(keywords)
+
+    def example_output(self, tool_input):
+        return json.dumps({"tool_choice": self.name, "tool_input": tool_input})
+
+    def render(self, number, compact = False):
+        """
+        Renders the tool's section of the system prompt.
+        """
+        if compact:
+            line = f"- {self.name}: {self.purpose}"
+            if self.input_format:
+                line += f" Input: {self.input_format}."
+            if self.examples:
+                prompt, tool_input = self.examples[0]
+                line += f" Example: \"{prompt}\" -> {self.example_output(tool_input)}"
+            return line
+
+        lines = [f"{number}. {self.name}: {self.purpose}"]
+        if self.input_format:
+            lines.append(f"   - Input format: {self.input_format}")
+        lines.extend(f"   - {rule}" for rule in self.rules)
+        if self.examples:
+            lines.append("   - Example inputs and outputs:")
+            for prompt, tool_input in self.examples:
+                lines.append(f"     Input: \"{prompt}\"")
+                lines.append(f"     Output: {self.example_output(tool_input)}")
+        return "\n".join(lines)
+
+
+def docstring_doc(func):
+    """
+    Builds a ToolDoc for a tool without a registered one from its docstring: the first line is the
+    purpose, the rest (parameters and return value) the input format.
+    """
+    lines = [line.strip() for line in (func.__doc__ or "").strip().splitlines()]
+    purpose = lines[0] if lines else f"Calls {func.__name__}."
+    details = " ".join(line for line in lines[1:] if line)
+    return ToolDoc(func.__name__, purpose, details or None, keywords = {func.__name__.lower()})
+
+
+TOOL_DOCS = {doc.name: doc for doc in [
+    ToolDoc("basic_calculator", "Use for ANY mathematical calculation.",
+            '{"expression": "arithmetic with + - * / // % ** ( ) < > == and sum/mean/min/max/abs/round/sqrt", plus any list of numbers it names, e.g. "x": [1, 2, 3]}',
+            ["Write the whole calculation as one expression; convert numbers written as words to digits",
+             "Put a list of numbers in a name such as x and compute on all of them in one call, e.g. sum(x) or x * 1.08"],
+            [("Calculate 15 plus 7", {"expression": "15 + 7"}),
+             ("What is 100 divided by 5, squared?", {"expression": "(100 / 5) ** 2"}),
+             ("Add 8% tax to 10, 20.5 and 7", {"expression": "x * 1.08", "x": [10, 20.5, 7]})],
+            {"calculate", "compute", "evaluate", "plus", "minus", "times", "multiply", "multiplied", "divide", "divided",
+             "add", "added", "sum", "subtract", "difference", "product", "power", "squared", "mod", "modulo", "modulus",
+             "greater", "less", "equal", "equals", "total", "average", "mean", "percent", "tax", "sqrt", "root",
+             "+", "-", "*", "/", "//", "%", "^", "**", "=", "<", ">", "math"}),
+    ToolDoc("reverse_string", "Use for ANY request to reverse text, or to write it backwards.",
+            "just the text to reverse, as a string",
+            ["Pass the text exactly as given; remove the quotes, \"reverse of\" and any other extra words"],
+            [("Reverse of 'Howwwww'?", "Howwwww"),
+             ("What is the reverse of Python?", "Python")],
+            {"reverse", "reversed", "reversing", "backwards", "backward", "mirror"}),
+    ToolDoc("timer", "Use to set a timer or a countdown.",
+            "the duration in seconds, as a string",
+            ["Convert minutes and hours to seconds",
+             "If no valid duration is given, tell the user to try again instead of setting a timer",
+             "The app tells the user when the timer expires; never say in your answer that it has expired"],
+            [("Set a timer for 10 seconds", "10"),
+             ("Timer for 60 seconds", "60"),
+             ("Timer for seconds", "Error: Invalid duration. Please provide a valid number of seconds.")],
+            {"timer", "timers", "countdown", "remind", "alarm", "seconds", "second", "minutes", "minute", "hours", "hour"}),
+    ToolDoc("summarise_text", "Use for ANY request to summarize text.",
+            "the text to summarize, exactly as given in the prompt",
+            ["Extract the text and pass it on unchanged; DO NOT summarize the text yourself or pass your own summary"],
+            [("Summarize the text: 'This is a long text that needs to be summarized.'", "This is a long text that needs to be summarized."),
+             ("Can you summarize 'this paragraph'?", "'this paragraph'"),
+             ("Generate a summary of this 'long paragraph'.", "'long paragraph'")],
+            {"summarise", "summarize", "summary", "summarising", "summarizing", "summarised", "summarized", "gist", "tldr", "condense", "shorten"}),
+    ToolDoc(NO_TOOL, "Use for general conversation and questions, e.g. about your identity, capabilities or feelings.",
+            "your complete, friendly answer",
+            ["ALWAYS answer the question itself and keep to the user's query; do not simply repeat the question",
+             "If the user asks what you can do, mention your tools"],
+            [("Who are you?", "I am an AI assistant that can help you with calculations, reverse text, set timers, summarize text and answer questions. How can I help you today?"),
+             ("How are you?", "I'm functioning well, thank you for asking! I'm here to help you with calculations, text reversal, timers, summaries or any questions you might have.")]),
+]}
+
+
+class PromptBuilder:
+    def __init__(self, mode = "full", prefilter = False, docs = None):
+        """
+        Renders the agent's system prompt from the tool docs.
+
+        Parameters:
+        mode (str): "full" for every rule and example, "compact" for one line per tool with a single example.
+        prefilter (bool): Whether `select` narrows the tools down to the candidates for a prompt by keyword.
+        docs (dict): ToolDocs by tool name; defaults to TOOL_DOCS. Tools without one are described by their docstring.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown prompt mode {mode!r}; expected one of {', '.join(MODES)}.")
+        self.mode = mode
+        self.prefilter = prefilter
+        self.docs = TOOL_DOCS if docs is None else docs
+
+    def tool_docs(self, tools):
+        """
+        Returns the ToolDocs of the tool functions, in order, followed by the one for answering without a tool.
+        """
+        docs = [self.docs.get(func.__name__) or docstring_doc(func) for func in tools]
+        return docs + [self.docs.get(NO_TOOL) or ToolDoc(NO_TOOL, "Use for general conversation and questions.")]
+
+    def select(self, docs, prompt):
+        """
+        Returns the docs of the tools worth offering the model for a prompt.
+
+        With the pre-filter on, a tool is kept only if one of its keywords appears in the prompt; answering
+        without a tool is always kept. Prompts that mention no keyword at all get every tool, so the filter
+        can only cut tools the prompt gives no hint of.
+        """
+        if not self.prefilter or prompt is None:
+            return docs
+        tokens = set(TOKEN.findall(prompt.lower()))
+        selected = [doc for doc in docs if doc.keywords & tokens]
+        if not selected:
+            return docs
+        return selected + [doc for doc in docs if doc.name == NO_TOOL and doc not in selected]
+
+    def render(self, docs):
+        """
+        Renders the system prompt for the given tool docs.
+        """
+        compact = self.mode == "compact"
+        sections = "\n".join(doc.render(number, compact) for number, doc in enumerate(docs, 1))
+        if compact:
+            return ("You are an AI assistant with tools. Reply ONLY with JSON: "
+                    '{"tool_choice": "<tool name>", "tool_input": <input>}. '
+                    "Pick the tool that fits the request and pass its input exactly as the user gave it; "
+                    "never do a tool's job yourself.\n"
+                    f"Tools:\n{sections}\n")
+        return ("\nYou are an intelligent AI assistant with access to specific tools. Your responses must ALWAYS be in this JSON format:\n"
+                '{\n    "tool_choice": "name_of_the_tool",\n    "tool_input": "inputs_to_the_tool"\n}\n\n'
+                "TOOLS AND WHEN TO USE THEM (ALWAYS use the matching tool; never do a tool's job yourself):\n\n"
+                f"{sections}\n\n"
+                'Remember: Your response must ALWAYS be valid JSON with "tool_choice" and "tool_input" fields.\n')
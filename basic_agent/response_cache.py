@@ -0,0 +1,236 @@
+import asyncio, collections, hashlib, json, sqlite3, threading, time
+
+MISSING = object()  # returned by the caches' `get` when a key isn't cached
+
+
+def make_key(*parts):
+    """
+    Builds a cache key from JSON-serialisable parts.
+
+    Returns:
+    str: A SHA-256 hex digest of the parts.
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys = True, default = str).encode()).hexdigest()
+
+
+def normalize_prompt(prompt):
+    """
+    Normalizes a prompt for use in a cache key by collapsing runs of whitespace. Case is kept, since tools
+    like reverse_string depend on it.
+    """
+    return " ".join(prompt.split())
+
+
+def approx_size(key, value):
+    """
+    Approximates the memory an entry takes by the length of its JSON encoding.
+    """
+    return len(key) + len(json.dumps(value, default = str))
+
+
+class TTLCache:
+    def __init__(self, max_entries = 1024, ttl = 3600):
+        """
+        In-memory LRU cache whose entries also expire after `ttl` seconds.
+
+        Parameters:
+        max_entries (int): Entries kept before the least recently used one is evicted.
+        ttl (float): Seconds an entry stays valid.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()  # key -> (expiry time, value, approximate size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.approx_bytes = 0
+
+    def get(self, key):
+        """
+        Returns the cached value for the key, or MISSING if it isn't cached or has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Caches a value, evicting the least recently used entries if the cache is full.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            size = approx_size(key, value)
+            self._entries[key] = (time.monotonic() + self.ttl, value, size)
+            self.approx_bytes += size
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.approx_bytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.approx_bytes = 0
+
+    def stats(self):
+        """
+        Returns hit ratio, memory footprint and eviction counts.
+        """
+        total = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0, "evictions": self.evictions,
+                "expirations": self.expirations, "approx_bytes": self.approx_bytes}
+
+
+class SqliteCache:
+    def __init__(self, path, ttl = 86400, max_entries = 10000):
+        """
+        On-disk cache in a SQLite database, so cached entries survive restarts. Values are stored as JSON.
+        Expired entries are purged whenever an entry is written, and once the table holds more than
+        `max_entries` the oldest entries are evicted.
+
+        Parameters:
+        path (str): Path of the database file.
+        ttl (float): Seconds an entry stays valid.
+        max_entries (int): Entries kept before the oldest ones are evicted.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path, check_same_thread = False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+        self._connection.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """
+        Returns the cached value for the key, or MISSING if it isn't cached or has expired.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] <= time.time():
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._connection.commit()
+                self.expirations += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key, value):
+        """
+        Caches a value, purging expired entries and evicting the oldest ones if the table is full.
+        """
+        with self._lock:
+            now = time.time()
+            self.expirations += self._connection.execute("DELETE FROM cache WHERE expires <= ?", (now,)).rowcount
+            self._connection.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                                     (key, json.dumps(value), now + self.ttl))
+            overflow = self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                # every entry lives for the same ttl, so the earliest to expire is the oldest written
+                self.evictions += self._connection.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires LIMIT ?)", (overflow,)).rowcount
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM cache")
+            self._connection.commit()
+
+    def stats(self):
+        """
+        Returns hit ratio, the number of stored entries and eviction counts.
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0, "evictions": self.evictions, "expirations": self.expirations}
+
+
+class LayeredCache:
+    def __init__(self, memory = None, disk = None):
+        """
+        An in-memory cache in front of an optional on-disk one. Disk hits are copied into memory.
+
+        Parameters:
+        memory (TTLCache): The in-memory tier; a default TTLCache if not given.
+        disk (SqliteCache): The optional on-disk tier.
+        """
+        self.memory = memory or TTLCache()
+        self.disk = disk
+
+    def get(self, key):
+        """
+        Returns the cached value for the key from the first tier that has it, or MISSING.
+        """
+        value = self.memory.get(key)
+        if value is MISSING and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not MISSING:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        """
+        Caches a value in every tier.
+        """
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    async def aget(self, key):
+        """
+        Like `get`, for the event loop: the on-disk tier is read in a worker thread, so a slow query or a
+        lock held by a concurrent write doesn't stall other requests.
+        """
+        value = self.memory.get(key)
+        if value is MISSING and self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not MISSING:
+                self.memory.set(key, value)
+        return value
+
+    async def aset(self, key, value):
+        """
+        Like `set`, for the event loop: the on-disk tier, which commits and prunes on every write, is
+        written in a worker thread.
+        """
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """
+        Returns the statistics of each tier.
+        """
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
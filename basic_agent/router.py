@@ -0,0 +1,181 @@
+import re
+
+NUMBER = r"(-?\d+(?:\.\d+)?)"
+POLITE = r"(?:please\s+|can\s+you\s+|could\s+you\s+)?"
+END = r"\s*[?.!]*\s*$"
+
+# spoken and symbolic operators understood by basic_calculator
+OPERATORS = {
+    "+": "add", "plus": "add", "added to": "add",
+    "-": "subtract", "minus": "subtract",
+    "*": "multiply", "x": "multiply", "times": "multiply", "multiplied by": "multiply",
+    "/": "divide", "divided by": "divide", "over": "divide",
+    "//": "floor_divide",
+    "%": "modulus", "mod": "modulus", "modulo": "modulus",
+    "^": "power", "**": "power", "to the power of": "power",
+}
+OPERATOR_PATTERN = "|".join(re.escape(op) for op in sorted(OPERATORS, key = len, reverse = True))
+
+# verbs that name the operation up front, e.g. "multiply 23 and 4"
+VERBS = {"add": "add", "sum": "add", "subtract": "subtract", "multiply": "multiply", "divide": "divide"}
+
+# seconds per unit accepted by the timer rule
+TIME_UNITS = {"s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+              "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+              "h": 3600, "hour": 3600, "hours": 3600}
+
+TOKEN = re.compile(r"\w+|[^\w\s]+")
+
+
+def to_number(text):
+    """
+    Converts matched number text to an int when it has no fractional part, else a float.
+    """
+    return float(text) if "." in text else int(text)
+
+
+class Rule:
+    def __init__(self, tool_name, pattern, build_input, confidence, keywords):
+        """
+        A compiled pattern that resolves a prompt to a call of one tool.
+
+        Parameters:
+        tool_name (str): Name of the tool the rule routes to.
+        pattern (str): Regular expression matched case-insensitively against the whole prompt.
+        build_input (callable): Builds the tool input from the match object.
+        confidence (float): How sure the rule is when it matches, between 0 and 1.
+        keywords (iterable): Lower-case tokens that must appear in a prompt for the rule to be tried.
+        """
+        self.tool_name = tool_name
+        self.pattern = re.compile(pattern, re.IGNORECASE | re.DOTALL)
+        self.build_input = build_input
+        self.confidence = confidence
+        self.keywords = set(keywords)
+
+
+def subtract_from(match):
+    """
+    Builds calculator input for "<verb> a and/by/from b" prompts; "subtract 3 from 10" means 10 - 3.
+    """
+    verb, first, joiner, second = match.group(1).lower(), match.group(2), match.group(3).lower(), match.group(4)
+    if verb == "subtract" and joiner == "from":
+        first, second = second, first
+    return {"num1": to_number(first), "num2": to_number(second), "operation": VERBS[verb]}
+
+
+def timer_seconds(match):
+    """
+    Builds timer input (whole seconds, as a string) from a number and an optional unit.
+    """
+    seconds = float(match.group(1)) * TIME_UNITS[(match.group(2) or "s").lower()]
+    return str(int(seconds))
+
+
+DEFAULT_RULES = [
+    Rule("basic_calculator",
+         rf"^{POLITE}(?:calculate|compute|evaluate|what\s+is|what's)?\s*{NUMBER}\s*({OPERATOR_PATTERN})\s*{NUMBER}{END}",
+         lambda m: {"num1": to_number(m.group(1)), "num2": to_number(m.group(3)), "operation": OPERATORS[m.group(2).lower()]},
+         0.95, set(OPERATORS) | {"calculate", "compute", "evaluate", "what", "by", "to", "power", "of", "added", "multiplied", "divided"}),
+    Rule("basic_calculator",
+         rf"^{POLITE}(add|sum|subtract|multiply|divide)\s+{NUMBER}\s+(and|by|to|from|with)\s+{NUMBER}{END}",
+         subtract_from,
+         0.95, set(VERBS)),
+    Rule("reverse_string",
+         rf"^{POLITE}(?:what\s+is\s+|what's\s+)?(?:the\s+)?reverse(?:\s+of)?(?:\s+the\s+(?:word|string|text|phrase|sentence))?\s*:?\s*(['\"])(.+)\1{END}",
+         lambda m: m.group(2),
+         0.95, {"reverse"}),
+    Rule("reverse_string",
+         rf"^{POLITE}(?:what\s+is\s+|what's\s+)?(?:the\s+)?reverse(?:\s+of)?(?:\s+the\s+(?:word|string))?\s+(\w+){END}",
+         lambda m: m.group(1),
+         0.9, {"reverse"}),
+    Rule("timer",
+         rf"^{POLITE}(?:set\s+(?:a\s+|an\s+|the\s+)?)?(?:timer|countdown)\s+(?:for\s+)?{NUMBER}\s*({'|'.join(TIME_UNITS)})?{END}",
+         timer_seconds,
+         0.95, {"timer", "countdown"}),
+    Rule("timer",
+         rf"^{POLITE}set\s+(?:a\s+|an\s+)?{NUMBER}[\s-]*({'|'.join(TIME_UNITS)})\s+(?:timer|countdown){END}",
+         timer_seconds,
+         0.95, {"timer", "countdown"}),
+    Rule("summarise_text",
+         rf"^{POLITE}(?:summari[sz]e|(?:generate|give\s+me|write)\s+(?:a\s+)?summary\s+of)\b.*\S",
+         lambda m: m.group(0),
+         0.92, {"summarise", "summarize", "summary"}),
+]
+
+
+class IntentRouter:
+    def __init__(self, tools_dict, rules = None, threshold = 0.9):
+        """
+        Resolves obvious tool calls locally with compiled patterns, so they skip the LLM round trip.
+
+        Parameters:
+        tools_dict (dict): The tools registered in a ToolBox (as returned by `ToolBox.store`); rules for
+                           any other tool are ignored.
+        rules (list): The Rule objects to use; defaults to DEFAULT_RULES.
+        threshold (float): Minimum rule confidence for a prompt to be routed without the LLM.
+        """
+        self.tool_names = set(tools_dict)
+        self.threshold = threshold
+        self.rules = []
+        self.keyword_index = {}  # keyword -> indices of the rules it selects
+        self.hits = 0
+        self.misses = 0
+        self.tool_hits = {}
+        for rule in (DEFAULT_RULES if rules is None else rules):
+            self.add_rule(rule)
+
+    def add_rule(self, rule):
+        """
+        Registers a rule and indexes its keywords, if its tool is registered.
+        """
+        if rule.tool_name not in self.tool_names:
+            return
+        self.rules.append(rule)
+        for keyword in rule.keywords:
+            self.keyword_index.setdefault(keyword, []).append(len(self.rules) - 1)
+
+    def candidates(self, prompt):
+        """
+        Returns the rules worth trying for a prompt, in registration order, using the keyword index.
+        """
+        indices = set()
+        for token in TOKEN.findall(prompt.lower()):
+            indices.update(self.keyword_index.get(token, ()))
+        return [self.rules[i] for i in sorted(indices)]
+
+    def route(self, prompt):
+        """
+        Tries to resolve the prompt to a tool call without the LLM.
+
+        Parameters:
+        prompt (str): The user's prompt.
+
+        Returns:
+        dict: `tool_choice`, `tool_input` and `confidence` of the best matching rule, or None if no rule
+              matched with at least the threshold confidence (the LLM should decide).
+        """
+        prompt = prompt.strip()
+        best = None
+        for rule in self.candidates(prompt):
+            if rule.confidence < self.threshold or (best is not None and rule.confidence <= best[0].confidence):
+                continue
+            match = rule.pattern.match(prompt)
+            if match:
+                best = (rule, match)
+
+        if best is None:
+            self.misses += 1
+            return None
+
+        rule, match = best
+        self.hits += 1
+        self.tool_hits[rule.tool_name] = self.tool_hits.get(rule.tool_name, 0) + 1
+        return {"tool_choice": rule.tool_name, "tool_input": rule.build_input(match), "confidence": rule.confidence}
+
+    def stats(self):
+        """
+        Returns the router's hit/miss counters.
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / total if total else 0.0,
+                "tool_hits": dict(self.tool_hits)}
@@ -0,0 +1,343 @@
+from agent import add_agent_arguments, build_agent, build_client
+from ollama_client import OllamaPool
+from model_registry import registry
+from summarizer import summary_batcher
+from timer_scheduler import get_scheduler, timer_owner
+from metrics import metrics, set_debug
+from aiohttp import web
+import argparse, asyncio, json, time
+
+
+class Overloaded(Exception):
+    def __init__(self, status, reason):
+        """
+        Raised when a request is shed instead of being admitted.
+
+        Parameters:
+        status (int): HTTP status to answer with: 429 when the client is over its own limit, 503 when
+                      the server or one of its backends is saturated.
+        reason (str): Human-readable reason sent back to the client.
+        """
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency = 8, max_queue = 64, per_client = 4, queue_timeout = 10, saturation_checks = ()):
+        """
+        Decides which requests get to run, so overload turns into fast rejections instead of ever-growing latency.
+
+        At most `max_concurrency` requests run at once; up to `max_queue` more wait for a slot, and the
+        rest are rejected straight away.
+
+        Parameters:
+        max_concurrency (int): Requests processed at the same time.
+        max_queue (int): Requests allowed to wait for a slot.
+        per_client (int): Requests a single client may have running or waiting at the same time.
+        queue_timeout (float): Seconds a request may wait for a slot before it is rejected.
+        saturation_checks (iterable): Functions without arguments returning a reason string when a backend is
+                                      saturated (the request is then rejected with 503), or None.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.per_client = per_client
+        self.queue_timeout = queue_timeout
+        self.saturation_checks = list(saturation_checks)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {}  # reason -> count
+        self._clients = {}  # client id -> requests running or waiting
+        self._slots = None
+        self._loop = None
+
+    def reject(self, status, reason):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        raise Overloaded(status, reason)
+
+    async def acquire(self, client_id):
+        """
+        Waits for a slot for the client's request.
+
+        Raises:
+        Overloaded: If the request should be shed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+
+        if self._clients.get(client_id, 0) >= self.per_client:
+            self.reject(429, "too many concurrent requests from this client")
+        for check in self.saturation_checks:
+            reason = check()
+            if reason:
+                self.reject(503, reason)
+        if self.active >= self.max_concurrency and self.waiting >= self.max_queue:
+            self.reject(503, "request queue is full")
+
+        self._clients[client_id] = self._clients.get(client_id, 0) + 1
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.release_client(client_id)
+            self.reject(503, "timed out waiting for a free slot")
+        except BaseException:
+            self.release_client(client_id)
+            raise
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+
+    def release(self, client_id):
+        """
+        Frees the slot of a finished request.
+        """
+        self.active -= 1
+        self._slots.release()
+        self.release_client(client_id)
+
+    def release_client(self, client_id):
+        count = self._clients.get(client_id, 0) - 1
+        if count > 0:
+            self._clients[client_id] = count
+        else:
+            self._clients.pop(client_id, None)
+
+    def stats(self):
+        return {"active": self.active, "waiting": self.waiting, "admitted": self.admitted,
+                "rejected": dict(self.rejected), "clients": len(self._clients)}
+
+
+def backend_saturation(client, max_in_flight):
+    """
+    Returns a saturation check that trips when the Ollama client has `max_in_flight` requests outstanding.
+    """
+    def check():
+        if client.in_flight >= max_in_flight:
+            return "model backend is saturated"
+        return None
+    return check
+
+
+def summarizer_saturation(max_pending):
+    """
+    Returns a saturation check that trips when `max_pending` texts are waiting for the summarizer.
+    """
+    def check():
+        if summary_batcher.pending >= max_pending:
+            return "summarizer is saturated"
+        return None
+    return check
+
+
+class ChatServer:
+    def __init__(self, agent, admission, client, request_timeout = 60):
+        """
+        HTTP front-end for one shared agent, running on the server's long-lived event loop.
+
+        Parameters:
+        agent (Agent): The agent answering every request.
+        admission (AdmissionController): Decides which requests are run and which are shed.
+        client (OllamaClient): The agent's model client, closed when the server shuts down.
+        request_timeout (float): Seconds after which a running request is given up (504).
+        """
+        self.agent = agent
+        self.admission = admission
+        self.client = client
+        self.request_timeout = request_timeout
+
+    @staticmethod
+    def client_id(request):
+        """
+        Identifies the caller for the per-client limit: the `X-Client-Id` header, or else the remote address.
+        """
+        return request.headers.get("X-Client-Id") or request.remote or "unknown"
+
+    @staticmethod
+    async def read_prompt(request):
+        """
+        Returns the prompt from a `{"prompt": "..."}` request body.
+
+        Raises:
+        web.HTTPBadRequest: If the body isn't JSON or has no prompt.
+        """
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text = "body must be JSON")
+        prompt = body.get("prompt") if isinstance(body, dict) else None
+        if not isinstance(prompt, str) or not prompt.strip():
+            raise web.HTTPBadRequest(text = "body needs a non-empty 'prompt'")
+        return prompt
+
+    @staticmethod
+    def shed(error):
+        return web.json_response({"error": error.reason}, status = error.status, headers = {"Retry-After": "1"})
+
+    async def chat(self, request):
+        """
+        POST /chat: answers `{"prompt": "..."}` with `{"response": "...", "timings": {...}}` once the answer is complete,
+        plus an `error` if the model failed.
+        """
+        prompt = await self.read_prompt(request)
+        client_id = self.client_id(request)
+        try:
+            await self.admission.acquire(client_id)
+        except Overloaded as e:
+            return self.shed(e)
+
+        timer_owner.set(client_id)  # timers set by this request are collected with GET /timers
+        start = time.perf_counter()
+        turn = {}
+        try:
+            chunks = []
+
+            async def collect():
+                async for chunk in self.agent.work_stream(prompt, turn):
+                    chunks.append(chunk)
+
+            await asyncio.wait_for(collect(), self.request_timeout)
+        except asyncio.TimeoutError:
+            return web.json_response({"error": f"no answer within {self.request_timeout} seconds"}, status = 504)
+        finally:
+            self.admission.release(client_id)
+        body = {"response": "".join(chunks), "timings": {"total": round(time.perf_counter() - start, 4)}}
+        if turn.get("error"):
+            body["error"] = turn["error"]  # the model failed; the response is an error message or a partial answer
+        return web.json_response(body)
+
+    async def chat_stream(self, request):
+        """
+        POST /chat/stream: streams the answer to `{"prompt": "..."}` as newline-delimited JSON, one
+        `{"chunk": "..."}` line per piece and a final `{"done": true, "timings": {...}}` line, with an `error` if the model failed.
+        """
+        prompt = await self.read_prompt(request)
+        client_id = self.client_id(request)
+        try:
+            await self.admission.acquire(client_id)
+        except Overloaded as e:
+            return self.shed(e)
+
+        timer_owner.set(client_id)
+        start = time.perf_counter()
+        first_chunk = None
+        stream_response = web.StreamResponse(headers = {"Content-Type": "application/x-ndjson"})
+        try:
+            await stream_response.prepare(request)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.request_timeout
+            turn = {}
+            chunks = self.agent.work_stream(prompt, turn)
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    if first_chunk is None:
+                        first_chunk = round(time.perf_counter() - start, 4)
+                    await stream_response.write((json.dumps({"chunk": chunk}) + "\n").encode())
+                final = {"done": True, "timings": {"first_chunk": first_chunk, "total": round(time.perf_counter() - start, 4)}}
+                if turn.get("error"):
+                    final["error"] = turn["error"]
+            except asyncio.TimeoutError:
+                final = {"done": True, "error": f"no answer within {self.request_timeout} seconds"}
+            finally:
+                await chunks.aclose()
+            await stream_response.write((json.dumps(final) + "\n").encode())
+            await stream_response.write_eof()
+        finally:
+            self.admission.release(client_id)
+        return stream_response
+
+    async def timers(self, request):
+        """
+        GET /timers: `{"expired": [{"timer_id": ..., "duration": ...}, ...]}`, the timers this client set that
+        expired since its last call. Timers outlive the request that set them, so clients poll for their expiry.
+        """
+        expired = get_scheduler().take_expired(self.client_id(request))
+        return web.json_response({"expired": [{"timer_id": handle.timer_id, "duration": handle.duration} for handle in expired]})
+
+    async def health(self, request):
+        """
+        GET /health: load of the server and its backends.
+        """
+        return web.json_response({
+            "status": "ok",
+            "admission": self.admission.stats(),
+            "model_in_flight": self.client.in_flight,
+            "model_endpoints": self.client.stats() if isinstance(self.client, OllamaPool) else None,
+            "summarizer_pending": summary_batcher.pending,
+            "summarizer_loaded": registry.is_loaded("summarizer"),
+            "cache": self.agent.cache.stats() if self.agent.cache is not None else None,
+            "tools": self.agent.executor.stats(),
+        })
+
+    async def metrics(self, request):
+        """
+        GET /metrics: every counter and histogram in the Prometheus text format, or as JSON with `?format=json`.
+        """
+        if request.query.get("format") == "json":
+            return web.Response(text = metrics.json(), content_type = "application/json")
+        return web.Response(text = metrics.prometheus(), headers = {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    def app(self):
+        """
+        Builds the aiohttp application; the shared Ollama client is closed when it shuts down.
+        """
+        app = web.Application()
+        app.add_routes([web.post("/chat", self.chat), web.post("/chat/stream", self.chat_stream), web.get("/timers", self.timers),
+                        web.get("/health", self.health), web.get("/metrics", self.metrics)])
+
+        async def close_client(app):
+            await self.client.close()
+
+        app.on_cleanup.append(close_client)
+        return app
+
+
+def build_server(args, client = None, max_concurrency = 8, max_queue = 64, per_client = 4, queue_timeout = 10, request_timeout = 60,
+                 max_model_in_flight = None, max_summary_pending = 32):
+    """
+    Builds the ChatServer with its agent (see agent.build_agent, which `args` are passed to) and admission controller.
+
+    Requests are shed with 503 when the model client has `max_model_in_flight` calls outstanding (by
+    default its whole connection pool, so new calls would only queue inside it) or when
+    `max_summary_pending` texts are waiting for the summarizer.
+    """
+    client = client or build_client(args)
+    agent = build_agent(args, client)
+    checks = [backend_saturation(client, max_model_in_flight or client.pool_size), summarizer_saturation(max_summary_pending)]
+    admission = AdmissionController(max_concurrency, max_queue, per_client, queue_timeout, checks)
+    return ChatServer(agent, admission, client, request_timeout)
+
+
+if __name__ == "__main__":
+    """
+    Serves the agent over HTTP on a single event loop, e.g.
+
+        python server.py --port 8080
+        curl -X POST localhost:8080/chat -d '{"prompt": "Calculate 15 plus 7"}'
+    """
+    parser = argparse.ArgumentParser(description = "Serve the agent over HTTP.")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8080)
+    add_agent_arguments(parser)
+    parser.add_argument("--max-concurrency", type = int, default = 8, help = "requests processed at the same time")
+    parser.add_argument("--max-queue", type = int, default = 64, help = "requests allowed to wait for a slot")
+    parser.add_argument("--per-client", type = int, default = 4, help = "concurrent requests allowed per client")
+    parser.add_argument("--queue-timeout", type = float, default = 10, help = "seconds a request may wait for a slot")
+    parser.add_argument("--request-timeout", type = float, default = 60, help = "seconds a request may run")
+    parser.add_argument("--debug", action = "store_true", help = "print the debug output of the agent and its tools")
+    args = parser.parse_args()
+
+    set_debug(args.debug)  # per-request prints cost I/O on the hot path
+
+    registry.warm_up("summarizer")
+    server = build_server(args, max_concurrency = args.max_concurrency, max_queue = args.max_queue, per_client = args.per_client,
+                          queue_timeout = args.queue_timeout, request_timeout = args.request_timeout)
+    web.run_app(server.app(), host = args.host, port = args.port)
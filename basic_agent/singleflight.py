@@ -0,0 +1,138 @@
+import asyncio
+
+
+class _Call:
+    def __init__(self, loop):
+        """
+        One in-flight call shared by every caller with the same key.
+        """
+        self.loop = loop
+        self.task = None
+        self.waiters = 0
+        # for streams: items produced so far, and an event set (then replaced) whenever one is added
+        self.items = []
+        self.updated = asyncio.Event()
+        self.done = False
+        self.error = None
+        self.abandoned = False
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesces identical in-flight requests: concurrent callers with the same key share one underlying
+        call instead of each making their own.
+
+        The shared call is only cancelled once every caller waiting on it has been cancelled, so one
+        impatient caller can't cancel the work for the others. Keys are forgotten as soon as their call
+        finishes; this is not a cache.
+        """
+        self._calls = {}
+        self._streams = {}
+        self.calls = 0  # calls made through the group
+        self.executed = 0  # underlying calls actually started
+        self.shared = 0  # calls that joined one already in flight
+
+    def _join(self, table, key, start):
+        """
+        Returns the in-flight call for the key on the running loop, starting a new one if there is none.
+        """
+        loop = asyncio.get_running_loop()
+        self.calls += 1
+        call = table.get(key)
+        if call is None or call.loop is not loop or call.abandoned or call.task.done():
+            call = _Call(loop)
+            call.task = loop.create_task(start(call))
+            call.task.add_done_callback(lambda _: table.pop(key, None) if table.get(key) is call else None)
+            table[key] = call
+            self.executed += 1
+        else:
+            self.shared += 1
+        call.waiters += 1
+        return call
+
+    def _leave(self, call):
+        call.waiters -= 1
+        if call.waiters == 0 and not call.task.done():
+            # the last interested caller is gone
+            call.abandoned = True
+            call.task.cancel()
+
+    async def do(self, key, factory):
+        """
+        Runs `factory()` once for all concurrent callers with the same key and returns its result to each.
+
+        Parameters:
+        key (hashable): Identifies identical requests.
+        factory (callable): Function without arguments returning the coroutine to run.
+
+        Returns:
+        object: The coroutine's result.
+
+        Raises:
+        Exception: Whatever the coroutine raised, to every caller sharing it.
+        """
+        async def start(call):
+            return await factory()
+
+        call = self._join(self._calls, key, start)
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            self._leave(call)
+
+    async def stream(self, key, factory):
+        """
+        Streaming variant of do: runs the async generator `factory()` once for all concurrent callers with
+        the same key and yields every item to each of them. Callers joining late first get the items
+        produced so far.
+
+        Parameters:
+        key (hashable): Identifies identical requests.
+        factory (callable): Function without arguments returning the async generator to run.
+
+        Yields:
+        object: The generator's items, in order.
+
+        Raises:
+        Exception: Whatever the generator raised, to every caller sharing it.
+        """
+        async def start(call):
+            generator = factory()
+            try:
+                async for item in generator:
+                    call.items.append(item)
+                    call.updated.set()
+                    call.updated = asyncio.Event()
+            except Exception as e:
+                call.error = e
+            finally:
+                call.done = True
+                call.updated.set()
+                await generator.aclose()
+
+        call = self._join(self._streams, key, start)
+        index = 0
+        try:
+            while True:
+                updated = call.updated
+                while index < len(call.items):
+                    yield call.items[index]
+                    index += 1
+                if call.done:
+                    if call.error is not None:
+                        raise call.error
+                    return
+                if call.task.done():
+                    # cancelled before it could finish
+                    raise asyncio.CancelledError()
+                await updated.wait()
+        finally:
+            self._leave(call)
+
+    def stats(self):
+        """
+        Returns how many calls were made, how many actually ran and how many were shared.
+        """
+        return {"calls": self.calls, "executed": self.executed, "shared": self.shared,
+                "in_flight": len(self._calls) + len(self._streams)}
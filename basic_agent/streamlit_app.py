@@ -1,19 +1,86 @@
-import streamlit as st, asyncio
-from tool_functions import basic_calculator, reverse_string, timer, summarise_text
-from agent import OllamaModel, Agent  # import the relevant classes
+import streamlit as st, argparse, time, uuid
+from agent import add_agent_arguments, build_agent, build_client, format_seconds
+from model_registry import registry
+from event_loop import BackgroundLoop
+from timer_scheduler import take_expired, timer_owner
 
-# initialize the tools and model as in your original script
-tools = [basic_calculator, reverse_string, timer, summarise_text]
-model_service = OllamaModel
-model_name = "llama3.2:3b"  
-stop = "<|eot_id|>"
+# Streamlit re-runs this script on every interaction, so everything that should outlive a click is a
+# cached resource: created once per process and shared by all sessions
 
-# initialize the agent
-# agent = Agent(tools = tools, model_service = model_service, model_name = model_name, stop = stop)
+@st.cache_resource
+def get_loop():
+    """
+    The event loop all agent work runs on; pooled connections, timers and coalesced calls live on it.
+    """
+    return BackgroundLoop(name = "streamlit-agent-loop")
+
+@st.cache_resource
+def get_args():
+    """
+    The agent's options, the same as for `python agent.py`, given after `--`, e.g.
+    `streamlit run streamlit_app.py -- --prompt-mode compact --cache-db cache.sqlite`.
+    """
+    return add_agent_arguments(argparse.ArgumentParser(description = "Chat with the agent in the browser.")).parse_args()
+
+@st.cache_resource
+def get_client():
+    """
+    Ollama client with the connection pool shared by all sessions; a pool over several servers with `--ollama-url`.
+    """
+    return build_client(get_args())
+
+@st.cache_resource
+def warm_up_summarizer():
+    """
+    Starts loading the summarization model in the background once per process; the page renders without waiting for it.
+    """
+    registry.warm_up("summarizer")
+
+@st.cache_resource
+def get_agent():
+    """
+    The agent with its router and response cache. It keeps no per-conversation state, so one instance
+    serves every session.
+    """
+    return build_agent(get_args(), get_client())
+
+def timed(chunks, timings):
+    """
+    Passes the chunks through, recording the time to the first one and the total time in `timings`.
+    """
+    start = time.perf_counter()
+    for chunk in chunks:
+        if "first_chunk" not in timings:
+            timings["first_chunk"] = time.perf_counter() - start
+        yield chunk
+    timings["total"] = time.perf_counter() - start
+
+async def owned_by(owner, chunks):
+    """
+    Passes the chunks through on the loop with `owner` as the owner of any timer the turn sets.
+    """
+    timer_owner.set(owner)
+    async for chunk in chunks:
+        yield chunk
+
+@st.fragment(run_every = 1)
+def announce_expired_timers(loop, owner):
+    """
+    Checks every second for this session's timers that have expired and announces them. Expiry can't be part
+    of an answer, which is long finished by then, so it is shown as a toast and added to the chat history.
+    """
+    for handle in loop.run(take_expired(owner)):
+        message = f"Timer #{handle.timer_id} for {handle.duration:g} seconds has expired!"
+        st.toast(message)
+        st.session_state["history"].append(("assistant", f"[timer]: {message}"))
 
 # streamlit interface
 def main():
-    agent = Agent(tools = tools, model_service = model_service, model_name = model_name, stop = stop) # agent initialized
+    warm_up_summarizer()
+    agent = get_agent()
+    loop = get_loop()
+    history = st.session_state.setdefault("history", [])  # (role, text) pairs of this browser session
+    owner = st.session_state.setdefault("timer_owner", uuid.uuid4().hex)  # whose timers this session shows
 
     st.title("AI Agent 01")
     st.write("\n**[agent]:** Hello, I'm your AI Assistant!")
@@ -23,17 +90,30 @@ def main():
     st.write("    3. Set a timer (e.g., 'Set a timer for 10 seconds')")
     st.write("    4. Summarize text (e.g., 'Summarize the text: This is a long text')")
     st.write("    5. Answer general questions (e.g., 'What day comes after Sunday?')")
-    
-    user_input = st.text_input("**[me]:**", "")
-    
-    if st.button("Submit") and user_input:
-        # display loading message while processing
-        with st.spinner("Thinking..."):
-            response = asyncio.run(agent.work(user_input))  # running agent's work method to process the input
+
+    announce_expired_timers(loop, owner)
+
+    for role, text in history:
+        with st.chat_message(role):
+            st.write(text)
+
+    user_input = st.chat_input("Ask me anything")
+    if user_input:
+        history.append(("user", user_input))
+        with st.chat_message("user"):
+            st.write(user_input)
+
+        with st.chat_message("assistant"):
+            # the answer is produced on the background loop and streamed into the page as it arrives;
+            # timings are measured here, since the shared agent's last_metrics may belong to another session
+            timings = {}
+            response = st.write_stream(timed(loop.stream(owned_by(owner, agent.work_stream(user_input))), timings))
             if response:
-                st.write(f"**[agent]:** {response}")
+                st.caption(f"Time to first chunk: {format_seconds(timings.get('first_chunk'))}, total: {format_seconds(timings.get('total'))}")
             else:
-                st.write("I'm not sure how to answer that, please try again.")
+                response = "I'm not sure how to answer that, please try again."
+                st.write(response)
+        history.append(("assistant", response))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,226 @@
+from model_registry import registry
+from batching import MicroBatcher
+import asyncio, collections, contextlib, os
+
+SUMMARIZER_MODEL = "Falconsai/text_summarization"
+MAX_INPUT_TOKENS = 512  # the model's context; longer inputs are truncated
+SUMMARY_MAX_TOKENS = 100
+
+# inference backends: the full-precision model as loaded (pytorch), the same under torch.inference_mode
+# (inference), or with its linear layers dynamically quantized to int8 (int8)
+BACKENDS = ("pytorch", "inference", "int8")
+
+# long documents are cut into chunks of CHUNK_TOKENS (leaving room for the "summarize: " prefix)
+# that overlap by CHUNK_OVERLAP tokens, so sentences on a boundary aren't lost
+CHUNK_TOKENS = 480
+CHUNK_OVERLAP = 64
+PIECE_CHARS = 4000  # text is tokenized this many characters at a time
+
+
+def summarizer_config():
+    """
+    Reads the summarizer settings from the environment.
+
+    Environment variables:
+    SUMMARIZER_BACKEND: One of BACKENDS (default "pytorch").
+    SUMMARIZER_THREADS: Number of CPU threads torch may use (default 0, torch's own choice).
+    SUMMARIZER_DECODING: "beam" (default) or "greedy".
+    SUMMARIZER_NUM_BEAMS: Beams for beam search (default 4).
+
+    Returns:
+    dict: The settings.
+
+    Raises:
+    ValueError: If the backend or decoding isn't supported.
+    """
+    config = {
+        "backend": os.getenv("SUMMARIZER_BACKEND", "pytorch"),
+        "threads": int(os.getenv("SUMMARIZER_THREADS", "0")),
+        "decoding": os.getenv("SUMMARIZER_DECODING", "beam"),
+        "num_beams": int(os.getenv("SUMMARIZER_NUM_BEAMS", "4")),
+    }
+    if config["backend"] not in BACKENDS:
+        raise ValueError(f"Unsupported summarizer backend: '{config['backend']}'. Supported backends are: {', '.join(BACKENDS)}.")
+    if config["decoding"] not in ("beam", "greedy"):
+        raise ValueError(f"Unsupported decoding: '{config['decoding']}'. Use 'beam' or 'greedy'.")
+    return config
+
+
+config = summarizer_config()
+
+
+def load_summarizer():
+    """
+    Loads the summarization tokenizer and model, prepared for the configured backend.
+
+    Returns:
+    tuple: The tokenizer and the seq2seq model.
+    """
+    # transformers is imported here rather than at module level: the import alone takes seconds
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    if config["threads"]:
+        torch.set_num_threads(config["threads"])
+
+    tokenizer = AutoTokenizer.from_pretrained(SUMMARIZER_MODEL) # loading tokenizer
+    model = AutoModelForSeq2SeqLM.from_pretrained(SUMMARIZER_MODEL) # loading model
+    model.eval()
+
+    if config["backend"] == "int8":
+        # int8 weights for the linear layers, activations quantized on the fly; CPU only
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype = torch.qint8)
+    return tokenizer, model
+
+
+def generation_kwargs():
+    """
+    Returns the decoding settings passed to `model.generate`.
+    """
+    if config["decoding"] == "greedy":
+        return {"num_beams": 1, "do_sample": False}
+    return {"num_beams": config["num_beams"], "early_stopping": True}
+
+
+registry.register("summarizer", load_summarizer)
+
+
+def inference_mode():
+    """
+    Returns torch's inference mode context for the optimized backends, or a no-op for the baseline.
+    """
+    if config["backend"] == "pytorch":
+        return contextlib.nullcontext()
+    import torch
+    return torch.inference_mode()
+
+
+def summarise_batch(texts):
+    """
+    Summarises several texts with one padded, batched `generate` call. Blocking; runs in a worker thread.
+
+    Parameters:
+    texts (list): The texts to summarise.
+
+    Returns:
+    list: One summary per text, in the same order.
+    """
+    tokenizer, model = registry.get("summarizer")
+
+    # prepare input, padded to the longest text in the batch
+    inputs = tokenizer([f"summarize: {text}" for text in texts],
+            max_length = MAX_INPUT_TOKENS, 
+            return_tensors = "pt", 
+            truncation = True,
+            padding = True)
+    
+    # generate summaries
+    with inference_mode():
+        summary_ids = model.generate(inputs.input_ids, 
+            attention_mask = inputs.attention_mask,
+            max_length = SUMMARY_MAX_TOKENS, 
+            **generation_kwargs())
+    
+    # decode summaries
+    return tokenizer.batch_decode(summary_ids, skip_special_tokens = True)
+
+
+# concurrent summarise_text calls that arrive within 10 ms of each other share one generate call
+summary_batcher = MicroBatcher(summarise_batch, max_batch_size = 8, max_wait_ms = 10)
+
+
+
+def iter_pieces(source, piece_chars = PIECE_CHARS):
+    """
+    Splits text into pieces of at most about `piece_chars` characters, breaking before whitespace.
+
+    Parameters:
+    source (str or iterable): The text, or an iterable of text parts (e.g. an open file).
+
+    Yields:
+    str: Consecutive pieces of the text.
+    """
+    parts = [source] if isinstance(source, str) else source
+    carry = ""
+    for part in parts:
+        carry += part
+        while len(carry) > piece_chars:
+            cut = carry.rfind(" ", 0, piece_chars)
+            cut = piece_chars if cut <= 0 else cut
+            yield carry[:cut]
+            carry = carry[cut:]
+    if carry.strip():
+        yield carry
+
+
+async def iter_chunks(source, tokenizer, chunk_tokens = CHUNK_TOKENS, overlap = CHUNK_OVERLAP):
+    """
+    Streams the text as overlapping chunks of at most `chunk_tokens` tokens, tokenizing piece by piece
+    so only about one chunk is held in memory at a time.
+
+    Yields:
+    str: The decoded text of each chunk.
+    """
+    buffer = []
+    fresh = 0  # tokens in the buffer not yet included in a chunk
+    for piece in iter_pieces(source):
+        token_ids = await asyncio.to_thread(tokenizer.encode, piece, add_special_tokens = False)
+        buffer.extend(token_ids)
+        fresh += len(token_ids)
+        while len(buffer) >= chunk_tokens:
+            yield tokenizer.decode(buffer[:chunk_tokens], skip_special_tokens = True)
+            buffer = buffer[chunk_tokens - overlap:]
+            fresh = len(buffer) - overlap
+    if fresh > 0:
+        yield tokenizer.decode(buffer, skip_special_tokens = True)
+
+
+async def summarise_long(source, max_in_flight = 8, fanout = None):
+    """
+    Map-reduce summarisation for text of any length.
+
+    Chunks are summarised in parallel through the batched path, at most `max_in_flight` at a time. Their
+    summaries are combined `fanout` at a time into summaries of summaries, level by level, so memory
+    stays bounded however long the input is. The remaining summaries are finally combined into one.
+
+    Parameters:
+    source (str or iterable): The text, or an iterable of text parts (e.g. an open file).
+    max_in_flight (int): Largest number of chunk summaries being generated at once.
+    fanout (int): Summaries joined per reduce step; defaults to as many as fit into one chunk.
+
+    Returns:
+    str: The summary of the whole text.
+    """
+    tokenizer, _ = await asyncio.to_thread(registry.get, "summarizer")
+    fanout = fanout or max(2, CHUNK_TOKENS // SUMMARY_MAX_TOKENS)
+    levels = []  # levels[i] holds summaries that each cover fanout**i chunks, in document order
+    in_flight = collections.deque()
+
+    async def add_summary(summary, level = 0):
+        while True:
+            if len(levels) == level:
+                levels.append([])
+            levels[level].append(summary)
+            if len(levels[level]) < fanout:
+                return
+            summary = await summary_batcher.submit(" ".join(levels[level]))
+            levels[level] = []
+            level += 1
+
+    try:
+        async for chunk in iter_chunks(source, tokenizer):
+            in_flight.append(asyncio.ensure_future(summary_batcher.submit(chunk)))
+            if len(in_flight) >= max_in_flight:
+                await add_summary(await in_flight.popleft())
+        while in_flight:
+            await add_summary(await in_flight.popleft())
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+    # higher levels cover earlier parts of the text
+    summaries = [summary for level in reversed(levels) for summary in level]
+    while len(summaries) > 1:
+        groups = [summaries[i:i + fanout] for i in range(0, len(summaries), fanout)]
+        summaries = await asyncio.gather(*(summary_batcher.submit(" ".join(group)) for group in groups))
+    return summaries[0] if summaries else ""
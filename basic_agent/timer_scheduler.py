@@ -0,0 +1,173 @@
+import asyncio, contextvars, heapq, inspect, itertools
+
+# who the timers set in the current context belong to, e.g. a browser session or an HTTP client; front-ends
+# set it around a request so they can later collect that requester's expired timers (see TimerScheduler.take_expired)
+timer_owner = contextvars.ContextVar("timer_owner", default = None)
+
+
+class TimerHandle:
+    def __init__(self, timer_id, duration, deadline, callback, owner = None):
+        """
+        A scheduled timer, as returned by TimerScheduler.schedule.
+
+        Parameters:
+        timer_id (int): Unique id of the timer within its scheduler.
+        duration (float): The requested duration in seconds.
+        deadline (float): Event-loop time at which the timer expires.
+        callback (callable): Called with the handle when the timer expires, or None.
+        owner (hashable): Who set the timer, or None.
+        """
+        self.timer_id = timer_id
+        self.duration = duration
+        self.deadline = deadline
+        self.callback = callback
+        self.owner = owner
+        self.cancelled = False
+        self.fired = False
+
+    def cancel(self):
+        """
+        Cancels the timer; it is dropped from the scheduler's heap when it reaches the top.
+        """
+        self.cancelled = True
+
+
+class TimerScheduler:
+    def __init__(self, max_queued = 1024):
+        """
+        Runs any number of timers from a single wakeup task that sleeps until the earliest deadline.
+
+        Timers live in a heap ordered by deadline. Expired timers are delivered through their callback
+        (plain functions and coroutine functions are both accepted) and put on the `expired` queue.
+
+        Parameters:
+        max_queued (int): Capacity of the `expired` queue; when nobody consumes it, the oldest
+                          notifications are dropped to make room.
+        """
+        self.expired = asyncio.Queue(maxsize = max_queued)
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._callback_tasks = set()
+
+    def schedule(self, duration, callback = None, owner = None):
+        """
+        Registers a timer and returns immediately.
+
+        Parameters:
+        duration (float): Seconds until the timer expires.
+        callback (callable): Optional function called with the TimerHandle on expiry.
+        owner (hashable): Who the timer belongs to, for `take_expired`.
+
+        Returns:
+        TimerHandle: The handle of the new timer.
+        """
+        loop = asyncio.get_running_loop()
+        handle = TimerHandle(next(self._ids), duration, loop.time() + duration, callback, owner)
+        heapq.heappush(self._heap, (handle.deadline, handle.timer_id, handle))
+
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        elif self._heap[0][2] is handle:
+            # the new timer is due before the one the wakeup task is sleeping on
+            self._wakeup.set()
+        return handle
+
+    def take_expired(self, owner):
+        """
+        Removes the timers of `owner` from the `expired` queue and returns them, oldest first; the other
+        owners' timers stay queued. Call it on the scheduler's loop.
+
+        Returns:
+        list: The owner's TimerHandles that expired since the last call.
+        """
+        taken, kept = [], []
+        while not self.expired.empty():
+            handle = self.expired.get_nowait()
+            (taken if handle.owner == owner else kept).append(handle)
+        for handle in kept:
+            self.expired.put_nowait(handle)
+        return taken
+
+    def pending(self):
+        """
+        Returns the number of timers that are scheduled and not cancelled.
+        """
+        return sum(1 for _, _, handle in self._heap if not handle.cancelled)
+
+    async def _run(self):
+        """
+        The wakeup task: fires every due timer, then sleeps until the next deadline or a new earlier timer.
+        """
+        loop = asyncio.get_running_loop()
+        while self._heap:
+            now = loop.time()
+            while self._heap and (self._heap[0][0] <= now or self._heap[0][2].cancelled):
+                _, _, handle = heapq.heappop(self._heap)
+                if not handle.cancelled:
+                    self._fire(handle)
+            if not self._heap:
+                break
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._heap[0][0] - now)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, handle):
+        """
+        Delivers an expired timer to the queue and to its callback.
+        """
+        handle.fired = True
+        if self.expired.full():
+            self.expired.get_nowait()
+        self.expired.put_nowait(handle)
+        if handle.callback is None:
+            return
+        try:
+            result = handle.callback(handle)
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._callback_tasks.add(task)
+                task.add_done_callback(self._callback_tasks.discard)
+        except Exception as e:
+            print(f"[timer]: Callback of timer #{handle.timer_id} failed: {str(e)}.")
+
+    def cancel_all(self):
+        """
+        Cancels every pending timer and stops the wakeup task.
+        """
+        for _, _, handle in self._heap:
+            handle.cancel()
+        self._heap.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+_scheduler = None
+_scheduler_loop = None
+
+def get_scheduler():
+    """
+    Returns the process-wide scheduler of the running event loop, creating it on first use.
+
+    Timers are bound to the loop they were scheduled on, so a new scheduler is created if the
+    running loop has changed.
+    """
+    global _scheduler, _scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler_loop is not loop:
+        _scheduler = TimerScheduler()
+        _scheduler_loop = loop
+    return _scheduler
+
+
+async def take_expired(owner):
+    """
+    Returns the timers of `owner` that expired since the last call, from the scheduler of the running loop;
+    for front-ends that run it on the agent's loop, e.g. with BackgroundLoop.run.
+    """
+    return get_scheduler().take_expired(owner)
@@ -0,0 +1,205 @@
+import asyncio, concurrent.futures, functools, inspect, time
+from metrics import metrics
+
+MODES = ("inline", "thread", "process")
+
+TOOL_QUEUE_SECONDS = metrics.histogram("tool_queue_seconds", "Time tool calls waited for their tool's concurrency limit.")
+TOOL_SECONDS = metrics.histogram("tool_seconds", "Execution time of tool calls.")
+TOOL_CALLS = metrics.counter("tool_calls_total", "Tool calls by outcome: ok, error or timeout.")
+
+
+class ToolTimeoutError(Exception):
+    """
+    A TimeoutError raised by the tool itself (e.g. by a request it made). It is re-raised as this so it
+    isn't taken for the executor's own timeout, which since Python 3.11 is the same builtin TimeoutError.
+    """
+
+
+class ToolSpec:
+    def __init__(self, mode = "inline", timeout = None, max_concurrency = None, pure = False):
+        """
+        How a tool is run by the ToolExecutor.
+
+        Parameters:
+        mode (str): `inline` to run it on the event loop (for async tools, or quick ones), `thread` to run
+                    it in a thread pool (for blocking calls), or `process` to run it in a process pool (for
+                    CPU-heavy work; the function must be defined at module level so it can be pickled).
+                    Only synchronous functions can run in a pool; an async tool that does blocking or
+                    CPU-heavy work must hand it to a thread itself (e.g. with `asyncio.to_thread`).
+        timeout (float): Seconds after which a call is given up, or None. Inline, the timeout can only
+                         interrupt an async tool at its `await` points, so synchronous inline tools can't have one.
+        max_concurrency (int): Calls that may run at the same time; further calls wait. None means no limit.
+        pure (bool): Whether the result depends only on the input, so it may be cached and shared.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown tool mode {mode!r}; expected one of {', '.join(MODES)}.")
+        self.mode = mode
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.pure = pure
+
+
+def tool(mode = "inline", timeout = None, max_concurrency = None, pure = False):
+    """
+    Decorator declaring how a tool is run; the function itself is returned unchanged, with its
+    ToolSpec attached as `tool_spec`. See ToolSpec for the parameters.
+    """
+    spec = ToolSpec(mode, timeout, max_concurrency, pure)
+
+    def decorate(func):
+        if mode != "inline" and inspect.iscoroutinefunction(func):
+            raise ValueError(f"Tool {func.__name__} is a coroutine function, it can only run inline.")
+        if mode == "inline" and timeout is not None and not inspect.iscoroutinefunction(func):
+            # nothing could interrupt it: the call would block the loop past its timeout and still return
+            raise ValueError(f"Tool {func.__name__} is synchronous and runs inline, where a timeout can't be enforced; "
+                             f"run it in a thread or process, or drop the timeout.")
+        func.tool_spec = spec
+        return func
+    return decorate
+
+
+class ToolStats:
+    def __init__(self):
+        """
+        Call counts and timings of one tool, in seconds.
+        """
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.running = 0
+        self.queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.execution = 0.0
+        self.max_execution = 0.0
+
+    def as_dict(self):
+        calls = self.calls or 1
+        return {"calls": self.calls, "errors": self.errors, "timeouts": self.timeouts, "running": self.running,
+                "avg_queue_wait_ms": round(self.queue_wait / calls * 1000, 3), "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+                "avg_execution_ms": round(self.execution / calls * 1000, 3), "max_execution_ms": round(self.max_execution * 1000, 3)}
+
+
+class ToolExecutor:
+    def __init__(self, max_threads = 8, max_processes = 2):
+        """
+        Runs tools the way their ToolSpec declares, so a slow or CPU-heavy tool can't stall the event loop.
+
+        Every call is bounded by the tool's concurrency limit and, where it can be, by its timeout. Time
+        spent waiting for a free slot (queue wait) and time spent running are recorded per tool. A call
+        running in a thread or process that times out is reported to the caller straight away, but the
+        work can't be interrupted, so it runs on until it finishes in the background. An inline (async)
+        tool is only timed out at an `await`; whatever it runs synchronously in between blocks the loop.
+
+        Parameters:
+        max_threads (int): Size of the thread pool for `thread` tools.
+        max_processes (int): Size of the process pool for `process` tools, started on first use.
+        """
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self.default_spec = ToolSpec()
+        self._threads = None
+        self._processes = None
+        self._limits = {}  # tool name -> (loop, semaphore)
+        self._stats = {}
+
+    def spec(self, func):
+        return getattr(func, "tool_spec", self.default_spec)
+
+    def limit(self, name, spec):
+        """
+        Returns the semaphore bounding the tool's concurrency on the running loop, or None if unbounded.
+        """
+        if spec.max_concurrency is None:
+            return None
+        loop = asyncio.get_running_loop()
+        entry = self._limits.get(name)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.Semaphore(spec.max_concurrency))
+            self._limits[name] = entry
+        return entry[1]
+
+    def pool(self, mode):
+        if mode == "thread":
+            if self._threads is None:
+                self._threads = concurrent.futures.ThreadPoolExecutor(self.max_threads, thread_name_prefix = "tool")
+            return self._threads
+        if self._processes is None:
+            self._processes = concurrent.futures.ProcessPoolExecutor(self.max_processes)
+        return self._processes
+
+    async def execute(self, func, spec, args):
+        try:
+            if spec.mode == "inline":
+                result = func(*args)
+                return await result if inspect.isawaitable(result) else result
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool(spec.mode), functools.partial(func, *args))
+        except (TimeoutError, asyncio.TimeoutError) as e:
+            # when the executor's own timeout expires, the tool is cancelled instead, so this came from the tool
+            raise ToolTimeoutError(str(e) or "timed out") from e
+
+    async def run(self, func, *args):
+        """
+        Runs a tool with the given arguments.
+
+        Parameters:
+        func (callable): The tool; tools without a `tool_spec` run inline, unbounded.
+        *args: The tool's arguments.
+
+        Returns:
+        object: The tool's result, or an `[error]` message if it failed or timed out.
+        """
+        name = func.__name__
+        spec = self.spec(func)
+        stats = self._stats.setdefault(name, ToolStats())
+        stats.calls += 1
+        semaphore = self.limit(name, spec)
+
+        queued = time.perf_counter()
+        if semaphore is not None:
+            await semaphore.acquire()
+        started = time.perf_counter()
+        stats.queue_wait += started - queued
+        stats.max_queue_wait = max(stats.max_queue_wait, started - queued)
+        TOOL_QUEUE_SECONDS.observe(started - queued, tool = name)
+        stats.running += 1
+        outcome = "ok"
+        try:
+            return await asyncio.wait_for(self.execute(func, spec, args), spec.timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            outcome = "timeout"
+            return f"[error]: Tool '{name}' timed out after {spec.timeout} seconds.\n"
+        except Exception as e:
+            stats.errors += 1
+            outcome = "error"
+            return f"[error]: Tool '{name}' failed: {str(e)}.\n"
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.execution += elapsed
+            stats.max_execution = max(stats.max_execution, elapsed)
+            TOOL_SECONDS.observe(elapsed, tool = name)
+            TOOL_CALLS.inc(tool = name, outcome = outcome)
+            stats.running -= 1
+            if semaphore is not None:
+                semaphore.release()
+
+    def stats(self):
+        """
+        Returns the call counts and timings of every tool run so far.
+        """
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def shutdown(self, wait = True):
+        """
+        Shuts the thread and process pools down.
+        """
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait = wait)
+        self._threads = None
+        self._processes = None
+
+
+# process-wide executor shared by every Agent that isn't given its own
+default_executor = ToolExecutor()
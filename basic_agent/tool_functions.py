@@ -1,17 +1,52 @@
-import json, operator, time, asyncio
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import json
+from expressions import OPERATIONS, apply, evaluate, to_operand
+from timer_scheduler import get_scheduler, timer_owner
+from summarizer import summary_batcher, summarise_long, CHUNK_TOKENS
+from tool_executor import tool
+from metrics import debug
 
-tokenizer = AutoTokenizer.from_pretrained("Falconsai/text_summarization") # loading tokenizer
-model = AutoModelForSeq2SeqLM.from_pretrained("Falconsai/text_summarization") # loading model
+MAX_SHOWN = 1000  # elements of an array result written out in full
 
-async def basic_calculator(input_str):
+def format_number(value):
     """
-    Perform a numeric operation on two numbers based on the input string or dictionary.
+    Formats one number of a calculator result, with at most six decimals.
+    """
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, float):
+        # handle floating point precision
+        return f"{value:.6f}".rstrip('0').rstrip('.')
+    return str(value)
+
+def format_result(result):
+    """
+    Formats a calculator result: a number, or the elements of an array (the first MAX_SHOWN of them).
+    """
+    if isinstance(result, (bool, float)):
+        return format_number(result)
+    if hasattr(result, "tolist"):  # numpy arrays and scalars to Python lists and numbers
+        result = result.tolist()
+    if not isinstance(result, list):
+        return format_number(result)
+    shown = ", ".join(format_result(value) for value in result[:MAX_SHOWN])
+    if len(result) > MAX_SHOWN:
+        shown += f", ... ({len(result)} values)"
+    return f"[{shown}]"
+
+# each tool declares how the ToolExecutor runs it; the calculator may crunch large arrays, so it is synchronous
+# and runs in a thread, the others are async or quick and run inline (the summarizer hands its inference to a
+# worker thread itself)
+@tool(mode = "thread", timeout = 1, pure = True)
+def basic_calculator(input_str):
+    """
+    Evaluate an arithmetic expression, or perform a numeric operation on two numbers, based on the input string or dictionary.
+    Lists of numbers are computed element-wise in one go (with numpy), so bulk arithmetic takes a single call.
 
     Parameters:
-    input_str (str or dict): Either a JSON string representing a dictionary with keys 'num1', 'num2', and 'operation',
-                            or a dictionary directly. Example: '{"num1": 5, "num2": 3, "operation": "add"}'
-                            or {"num1": 67869, "num2": 9030393, "operation": "divide"}
+    input_str (str or dict): An expression, e.g. "(15 + 7) * 2", or a JSON string or dictionary with either the key
+                            'expression' plus the values of the names it uses, e.g. {"expression": "sum(x * 1.08)", "x": [10, 20.5]},
+                            or the keys 'num1', 'num2' and 'operation', e.g. '{"num1": 5, "num2": 3, "operation": "add"}'
+                            or {"num1": 67869, "num2": 9030393, "operation": "divide"}; num1 and num2 may be lists.
 
     Returns:
     str: The formatted result of the operation.
@@ -20,6 +55,7 @@ async def basic_calculator(input_str):
     Exception: If an error occurs during the operation (e.g., division by zero).
     ValueError: If an unsupported operation is requested or input is invalid.
     """
+    input_dict = {}
     try:
         # handle both dictionary and string inputs
         if isinstance(input_str, dict):
@@ -28,68 +64,56 @@ async def basic_calculator(input_str):
             # clean and parse the input string
             input_str_clean = input_str.replace("'", "\"")
             input_str_clean = input_str_clean.strip().strip("\"")
-            input_dict = json.loads(input_str_clean)
-        
+            try:
+                input_dict = json.loads(input_str_clean)
+            except json.JSONDecodeError:
+                input_dict = None
+            if not isinstance(input_dict, dict):
+                # not a JSON object: the string is the expression itself
+                input_dict = {"expression": input_str.strip().strip("\"'")}
+
+        if "expression" in input_dict:
+            expression = str(input_dict["expression"])
+            variables = {name: value for name, value in input_dict.items() if name != "expression"}
+            debug(f"[calculator]: expression: {expression}")
+            result = evaluate(expression, variables)
+            return f"[calculator]: The answer is: {format_result(result)}.\n"
+
         # validate required fields
         if not all(key in input_dict for key in ['num1', 'num2', 'operation']):
-            return "Error: Input must contain 'num1', 'num2', and 'operation'.\n"
+            return "Error: Input must contain 'expression', or 'num1', 'num2', and 'operation'.\n"
 
-        num1 = float(input_dict['num1'])  # convert to float to handle decimal numbers
-        num2 = float(input_dict['num2'])
-        print(f"[calculator]: num1: {num1}, num2: {num2}")
+        num1 = to_operand(input_dict['num1'])  # a float to handle decimal numbers, or an array of them
+        num2 = to_operand(input_dict['num2'])
+        debug(f"[calculator]: num1: {num1}, num2: {num2}")
 
-        operation = input_dict['operation'].lower()
-        print(f"[calculator]: operation: {operation}")  # make case-insensitive
-    except (json.JSONDecodeError, KeyError) as e:
+        operation = str(input_dict['operation']).lower()
+        debug(f"[calculator]: operation: {operation}")  # make case-insensitive
+    except (KeyError, TypeError) as e:
+        if "expression" in input_dict:
+            return f"[error]: {e}\n"  # e.g. a function called with the wrong number of arguments
         return "Invalid input format. Please provide valid numbers and operation.\n"
+    except ZeroDivisionError:
+        return "[error]: Division by zero is not allowed.\n"
     except ValueError as e:
-        return "Error: Please provide valid numerical values.\n"
-
-    # define the supported operations with error handling
-    operations = {
-        'add': operator.add, # + 
-        'plus': operator.add, # + 
-        'subtract': operator.sub, # -
-        'minus': operator.sub,  # -
-        'multiply': operator.mul, # *
-        'times': operator.mul,  # *
-        'divide': operator.truediv, # /
-        'floor_divide': operator.floordiv, # //
-        'modulus': operator.mod, # %
-        'power': operator.pow, # **
-        'lt': operator.lt, # <
-        'le': operator.le, # <=
-        'eq': operator.eq, # ==
-        'ne': operator.ne, # != 
-        'ge': operator.ge, # >=
-        'gt': operator.gt # >
-    }
+        return f"[error]: {e}\n" if "expression" in input_dict else "Error: Please provide valid numerical values.\n"
+    except Exception as e:
+        return f"[error]: Error during calculation: {str(e)}.\n"
 
     # check if the operation is supported
-    if operation not in operations:
-        return f"[error]: Unsupported operation: '{operation}'. Supported operations are: {', '.join(operations.keys())}.\n"
+    if operation not in OPERATIONS:
+        return f"[error]: Unsupported operation: '{operation}'. Supported operations are: {', '.join(OPERATIONS.keys())}.\n"
 
     try:
-        # special handling for division by zero
-        if (operation in ['divide', 'floor_divide', 'modulus']) and num2 == 0:
-            return "[error]: Division by zero is not allowed.\n"
-
-        # perform the operation
-        result = operations[operation](num1, num2)
-        
-        # format result based on type
-        if isinstance(result, bool):
-            result_str = "True" if result else "False"
-        elif isinstance(result, float):
-            # handle floating point precision
-            result_str = f"{result:.6f}".rstrip('0').rstrip('.')
-        else:
-            result_str = str(result)
-
-        return f"[calculator]: The answer is: {result_str}.\n"
+        # perform the operation; element-wise when either number is a list
+        result = apply(OPERATIONS[operation], num1, num2)
+        return f"[calculator]: The answer is: {format_result(result)}.\n"
+    except ZeroDivisionError:
+        return "[error]: Division by zero is not allowed.\n"
     except Exception as e:
         return f"[error]: Error during calculation: {str(e)}.\n"
 
+@tool(timeout = 1, pure = True)
 async def reverse_string(input_str):
     """
     Reverse the given string.
@@ -104,7 +128,7 @@ async def reverse_string(input_str):
     if not isinstance(input_str, str):
         return "[error]: Input must be a string\n"
     
-    print(f"[string-reverser]: Input string: '{input_str}'.")
+    debug(f"[string-reverser]: Input string: '{input_str}'.")
     
     # reverse the string using slicing
     reversed_string = input_str[::-1]
@@ -114,6 +138,13 @@ async def reverse_string(input_str):
     
     return result
 
+def announce_expiry(handle):
+    """
+    Default expiry notification of the timer tool.
+    """
+    print(f"\n[timer]: Timer #{handle.timer_id} for {handle.duration:g} seconds has expired!")
+
+@tool(timeout = 1)
 async def timer(input_str):
     """
     Timer function to set a timer for a specified duration.
@@ -122,7 +153,8 @@ async def timer(input_str):
     input_str (str): The duration of the timer in seconds.
 
     Returns:
-    str: A message indicating the timer has expired after the set-timer expires.
+    str: A message confirming the timer has been set. The timer runs in the background: its expiry is printed when it fires and
+         queued for whoever set it (the `timer_owner` of the request), for the front-end to show; it is never part of an answer.
     """
     # check if input is a string
     if not isinstance(input_str, str):
@@ -134,29 +166,19 @@ async def timer(input_str):
     except ValueError:
         return "[error]: Invalid duration. Please provide a valid number of seconds.\n"
 
-    # setting timer
-    i = duration
-    while i > 0:
-        if i == duration:
-            print(f"[timer]: Setting timer for {duration} seconds...")
-        elif i == duration - 1:
-            print(f"{i} seconds remaining...")
-        elif i > 10:
-            if i % 5 == 0:
-                print(i)
-                i -= 5
-                time.sleep(5)
-                continue
-        else:
-            print(i)
-        time.sleep(1)
-        i -= 1
-        
-    return f"[timer]: Timer for {duration} seconds has expired!\n"
+    if duration < 0:
+        return "[error]: Invalid duration. Please provide a positive number of seconds.\n"
+
+    # setting timer; the scheduler wakes up once for the earliest deadline instead of sleeping in the event loop
+    handle = get_scheduler().schedule(duration, callback = announce_expiry, owner = timer_owner.get())
+    debug(f"[timer]: Setting timer #{handle.timer_id} for {duration} seconds...")
 
+    return f"[timer]: Timer #{handle.timer_id} set for {duration} seconds.\n"
+
+@tool(timeout = 300, max_concurrency = 32, pure = True)
 async def summarise_text(input_str):
     """
-    Text summarising function to generate concise and meaningful summaries of the input text.
+    Text summarising function to generate concise and meaningful summaries of the input text, of any length.
 
     Parameters:
     input_str (str): The text that needs to be summarized.
@@ -168,31 +190,22 @@ async def summarise_text(input_str):
     if not isinstance(input_str, str):
         return "[error]: Input must be a string.\n"
     
-    # prepare input
-    inputs = await asyncio.to_thread(tokenizer,
-            f"summarize: {input_str}", 
-            max_length = 512, 
-            return_tensors = "pt", 
-            truncation = True)
-    
-    # generate summary
-    summary_ids = await asyncio.to_thread(model.generate,
-        inputs.input_ids, 
-        num_beams = 4, 
-        max_length = 100, 
-        early_stopping = True)
-    
-    # decode summary
-    summary = await asyncio.to_thread(tokenizer.decode,
-        summary_ids[0], 
-        skip_special_tokens = True)
+    if len(input_str) <= CHUNK_TOKENS:
+        # too few characters to exceed one chunk: queue it for the next batched generate call
+        summary = await summary_batcher.submit(input_str)
+    else:
+        # may be longer than the model's 512 tokens: summarise it chunk by chunk instead of truncating
+        summary = await summarise_long(input_str)
 
     # # using the Hugging Face pipeline for summarization
     # summarizer = pipeline("summarization", model = "Falconsai/text_summarization")
     # # summarizer = pipeline("summarization", model = "sshleifer/distilbart-cnn-12-6")
     # summary = await asyncio.to_thread(summarizer, input_str, max_length = 100, min_length = 20, do_sample = False)
 
-    print(f"[summarizer]: Input text: '{input_str}'")
+    debug(f"[summarizer]: Input text: '{input_str}'")
 
     # return f"[summarizer]: {summary[0]['summary_text']}\n"
-    return f"[summarizer]: {summary}\n"
\ No newline at end of file
+    return f"[summarizer]: {summary}\n"
+
+# tools whose result depends only on their input, so it can be cached
+PURE_TOOLS = tuple(func.__name__ for func in (basic_calculator, reverse_string, timer, summarise_text) if func.tool_spec.pure)
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the Tavily agent. Run them from the `tavily_agent` directory, e.g.
+`python -m benchmarks.bench_memory`.
+"""
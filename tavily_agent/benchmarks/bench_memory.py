@@ -0,0 +1,101 @@
+import argparse, json, math, pickle, time
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+from memory import MemoryManager, BoundedMemorySaver
+from tavily_agent import build_graph, system_prompt
+
+# stands in for two Tavily results
+SEARCH_RESULT = json.dumps([{"url": f"https://example.com/{i}", "content": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20}
+                            for i in range(2)])
+
+
+@tool
+def search(query: str) -> str:
+    """Search the web for the query."""
+    return SEARCH_RESULT
+
+
+class StubChatModel:
+    def __init__(self, prefill_rate, answer_words = 40, search_every = 3):
+        """
+        A chat model whose latency grows with the context it is sent, like a real one: it sleeps
+        for the prompt's tokens at `prefill_rate` tokens per second. Every `search_every`th user
+        message is answered with a search first.
+        """
+        self.prefill_rate = prefill_rate
+        self.answer = " ".join(["word"] * answer_words)
+        self.search_every = search_every
+        self.prompt_tokens = []
+        self.calls = 0
+
+    def bind_tools(self, tools):
+        return self
+
+    def invoke(self, messages):
+        tokens = count_tokens_approximately(messages)
+        self.prompt_tokens.append(tokens)
+        time.sleep(tokens / self.prefill_rate)
+        self.calls += 1
+        user_turns = sum(1 for message in messages if message.type == "human")
+        if not isinstance(messages[-1], ToolMessage) and self.search_every and self.calls % self.search_every == 0 and user_turns:
+            return AIMessage("", tool_calls = [{"name": "search", "args": {"query": messages[-1].content}, "id": f"call_{self.calls}"}])
+        return AIMessage(self.answer)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered)))) - 1] if ordered else 0.0
+
+
+def run(name, memory, checkpointer, turns, prefill_rate):
+    llm = StubChatModel(prefill_rate)
+    graph = build_graph(llm, [search], memory, checkpointer)
+    config = {"configurable": {"thread_id": "bench"}}
+    latencies = []
+    start = time.perf_counter()
+    for turn in range(turns):
+        turn_start = time.perf_counter()
+        graph.invoke({"messages": [("user", f"Question number {turn}: what happened in the news today about topic {turn}?")]}, config)
+        latencies.append(time.perf_counter() - turn_start)
+    elapsed = time.perf_counter() - start
+    state = graph.get_state(config).values
+    tail = max(1, turns // 10)
+    return {
+        "name": name,
+        "count": turns,
+        "throughput_per_s": round(turns / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "first_turns_ms": round(sum(latencies[:tail]) / tail * 1000, 3),
+        "last_turns_ms": round(sum(latencies[-tail:]) / tail * 1000, 3),
+        "last_prompt_tokens": llm.prompt_tokens[-1],
+        "max_prompt_tokens": max(llm.prompt_tokens),
+        "stored_messages": len(state["messages"]),
+        "checkpoints": sum(len(checkpoints) for namespaces in checkpointer.storage.values() for checkpoints in namespaces.values()),
+        "checkpointer_kb": round(len(pickle.dumps((dict(checkpointer.storage), dict(checkpointer.writes)))) / 1024, 1),
+    }
+
+
+def main(turns, max_tokens, prefill_rate):
+    results = [
+        # no budget and the stock checkpointer: everything is kept and sent every turn
+        run("unbounded", MemoryManager(system_prompt, max_tokens = 10 ** 9), MemorySaver(), turns, prefill_rate),
+        run(f"budget_{max_tokens}", MemoryManager(system_prompt, max_tokens = max_tokens), BoundedMemorySaver(), turns, prefill_rate),
+        run(f"budget_{max_tokens}_summary", MemoryManager(system_prompt, max_tokens = max_tokens, summarizer = lambda summary, messages: f"{summary} {len(messages)} earlier messages about the news.".strip()[-400:]),
+            BoundedMemorySaver(), turns, prefill_rate),
+    ]
+    for result in results:
+        fields = ", ".join(f"{key}={value}" for key, value in result.items() if key != "name")
+        print(f"[bench]: {result['name']}: {fields}")
+    print(json.dumps({"timestamp": time.time(), "results": results}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Per-turn latency, context size and checkpointer memory over a long conversation, with and without the token budget.")
+    parser.add_argument("--turns", type = int, default = 150)
+    parser.add_argument("--max-tokens", type = int, default = 2000, help = "token budget of the bounded runs")
+    parser.add_argument("--prefill-rate", type = float, default = 100000.0, help = "stub model prompt tokens per second")
+    args = parser.parse_args()
+    main(args.turns, args.max_tokens, args.prefill_rate)
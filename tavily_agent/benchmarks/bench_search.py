@@ -0,0 +1,94 @@
+import argparse, json, math, os, random, tempfile, time
+from langchain_core.messages import AIMessage
+from langgraph.prebuilt import ToolNode
+from search_cache import CachedSearch, SearchCache, stub_search
+
+TOPICS = ["weather in Paris", "latest AI news", "python 3.13 release", "stock market today", "world cup results",
+          "best pizza in Naples", "electric cars 2025", "mars mission update", "inflation rate", "new smartphone launches",
+          "climate summit", "olympics schedule", "bitcoin price", "tallest building", "covid vaccine news",
+          "space telescope images", "football transfer news", "oscars winners", "earthquake today", "nobel prize physics"]
+
+
+def variants(topic, rng):
+    """
+    The same query the way a model might phrase it on different turns.
+    """
+    return rng.choice([topic, topic.title(), topic.upper(), f"{topic}?", f"  {topic}  ", topic.replace(" ", "  ")])
+
+
+def steps(count, calls_per_step, seed):
+    """
+    Tool-call messages as the model would emit them: a few searches per step, popular topics more often.
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+    messages = []
+    for step in range(count):
+        topics = rng.choices(TOPICS, weights, k = calls_per_step)
+        calls = [{"name": "tavily_search_results_json", "args": {"query": variants(topic, rng)}, "id": f"call_{step}_{i}"}
+                 for i, topic in enumerate(topics)]
+        messages.append(AIMessage("", tool_calls = calls))
+    return messages
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered)))) - 1] if ordered else 0.0
+
+
+def run(name, tool, backend, messages, max_concurrency, cached = None):
+    node = ToolNode([tool])
+    before = len(backend.metadata["queries"])
+    latencies = []
+    start = time.perf_counter()
+    for message in messages:
+        step_start = time.perf_counter()
+        node.invoke({"messages": [message]}, {"configurable": {}, "max_concurrency": max_concurrency})
+        latencies.append(time.perf_counter() - step_start)
+    elapsed = time.perf_counter() - start
+    result = {"name": name, "count": len(latencies), "throughput_per_s": round(len(latencies) / elapsed, 2),
+              "p50_ms": round(percentile(latencies, 50) * 1000, 3), "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+              "backend_calls": len(backend.metadata["queries"]) - before}
+    if cached is not None:
+        stats = cached.cache.stats()
+        result.update(hit_ratio = round(stats["hit_ratio"], 3), disk_hits = stats["disk_hits"], shared = cached.shared,
+                      entries = stats["entries"])
+    return result
+
+
+def main(step_count, calls_per_step, latency, seed):
+    messages = steps(step_count, calls_per_step, seed)
+    results = []
+    backend = stub_search(latency)
+    results.append(run("uncached_sequential", backend, backend, messages, 1))
+    results.append(run("uncached_parallel", backend, backend, messages, calls_per_step))
+
+    cached = CachedSearch(backend)
+    results.append(run("cached_parallel", cached.as_tool(), backend, messages, calls_per_step, cached))
+
+    # a restart: the in-memory cache is gone, the SQLite file still has the results
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "search.sqlite")
+        run("disk_warm_up", CachedSearch(backend, SearchCache(path = path)).as_tool(), backend, messages, calls_per_step)
+        restarted = CachedSearch(backend, SearchCache(path = path))
+        results.append(run("cached_after_restart", restarted.as_tool(), backend, messages, calls_per_step, restarted))
+
+    # a failing API: the errors come back as strings, and must be retried rather than served from the cache
+    failing = stub_search(latency, error = "HTTPError('429 Client Error: Too Many Requests')")
+    cached_failing = CachedSearch(failing)
+    results.append(run("cached_backend_errors", cached_failing.as_tool(), failing, messages, calls_per_step, cached_failing))
+
+    for result in results:
+        fields = ", ".join(f"{key}={value}" for key, value in result.items() if key != "name")
+        print(f"[bench]: {result['name']}: {fields}")
+    print(json.dumps({"timestamp": time.time(), "results": results}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Tool-step latency, backend calls and hit ratio of the search tool with and without the cache, against a stub backend.")
+    parser.add_argument("--steps", type = int, default = 100)
+    parser.add_argument("--calls-per-step", type = int, default = 4, help = "search calls the model emits per step")
+    parser.add_argument("--latency", type = float, default = 0.05, help = "stub search latency in seconds")
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+    main(args.steps, args.calls_per_step, args.latency, args.seed)
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from langchain_core.messages import HumanMessage, RemoveMessage, SystemMessage, trim_messages
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.checkpoint.memory import MemorySaver
+
+SUMMARY_PROMPT = ("Summarize the conversation below in a few sentences, keeping names, facts, numbers and anything "
+                  "the user asked to remember. Earlier summary (may be empty): {summary}")
+
+
+class MemoryManager:
+    def __init__(self, system_prompt, max_tokens = 2000, token_counter = count_tokens_approximately, summarizer = None):
+        """
+        Keeps a conversation within a fixed token budget.
+
+        The system prompt is never stored in the conversation; it is put in front of the window sent to
+        the model on every call. The window holds the current turn (from the latest user message on, so a
+        tool call is never separated from its result) and as many earlier messages as still fit, always
+        starting at a user message. Messages that no longer fit are removed from the graph state by
+        `prune`, so the history kept per thread stays bounded, and are optionally folded into a running summary.
+
+        Parameters:
+        system_prompt (str or SystemMessage): The system prompt.
+        max_tokens (int): Token budget of everything sent to the model: system prompt, summary and messages.
+        token_counter (callable): Counts the tokens of a list of messages; approximate by default.
+        summarizer (callable): `summarizer(summary, messages)` returns a new summary covering the old one and
+                               the dropped messages; None to drop old messages without a summary.
+        """
+        self.system_message = system_prompt if isinstance(system_prompt, SystemMessage) else SystemMessage(system_prompt)
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.summarizer = summarizer
+
+    def system(self, summary = ""):
+        """
+        Returns the system message, with the summary of earlier turns appended if there is one.
+        """
+        if not summary:
+            return self.system_message
+        return SystemMessage(f"{self.system_message.content}\n\nSummary of the earlier conversation: {summary}")
+
+    def split(self, messages, summary = ""):
+        """
+        Splits the history into the messages that fit the budget and the older ones that don't.
+
+        Returns:
+        tuple: `(dropped, kept)` lists of messages, oldest first.
+        """
+        messages = list(messages)
+        start = max((i for i, message in enumerate(messages) if isinstance(message, HumanMessage)), default = 0)
+        current = messages[start:]  # the turn in progress is always sent, even if it alone exceeds the budget
+        budget = self.max_tokens - self.token_counter([self.system(summary)] + current)
+        earlier = []
+        if budget > 0 and start > 0:
+            earlier = trim_messages(messages[:start], max_tokens = budget, token_counter = self.token_counter,
+                                    strategy = "last", start_on = "human", allow_partial = False)
+        kept = earlier + current
+        kept_ids = {id(message) for message in kept}
+        return [message for message in messages if id(message) not in kept_ids], kept
+
+    def window(self, messages, summary = ""):
+        """
+        Returns the messages to send to the model: the system prompt once, then the newest messages within the budget.
+        """
+        return [self.system(summary)] + self.split(messages, summary)[1]
+
+    def prune(self, state):
+        """
+        Graph node that removes the messages outside the budget from the state, once a turn is complete.
+
+        Returns:
+        dict: A state update with a RemoveMessage for every dropped message and, with a summarizer, the new summary.
+        """
+        summary = state.get("summary", "")
+        dropped, _ = self.split(state["messages"], summary)
+        if not dropped:
+            return {}
+        update = {"messages": [RemoveMessage(id = message.id) for message in dropped]}
+        if self.summarizer is not None:
+            update["summary"] = self.summarizer(summary, dropped)
+        return update
+
+
+def llm_summarizer(llm):
+    """
+    Returns a summarizer for MemoryManager that asks the chat model to fold dropped messages into the summary.
+    """
+    def summarize(summary, messages):
+        response = llm.invoke([SystemMessage(SUMMARY_PROMPT.format(summary = summary)), *messages,
+                               HumanMessage("Write the updated summary now.")])
+        return response.content
+    return summarize
+
+
+class BoundedMemorySaver(MemorySaver):
+    def __init__(self, max_checkpoints = 2, max_threads = 1000, **kwargs):
+        """
+        An in-memory checkpointer that keeps a bounded amount of state.
+
+        MemorySaver keeps every checkpoint of every thread forever, each with a full copy of the messages,
+        so memory grows with every step of every conversation. This one keeps the latest `max_checkpoints`
+        checkpoints per thread (the latest and its parent are needed to resume) and the `max_threads`
+        most recently used threads.
+        """
+        super().__init__(**kwargs)
+        self.max_checkpoints = max(2, max_checkpoints)
+        self.max_threads = max_threads
+        self._threads = OrderedDict()  # thread_id -> None, least recently used first
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in sorted(checkpoints)[:-self.max_checkpoints]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        self._threads[thread_id] = None
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_threads:
+            self.delete_thread(next(iter(self._threads)))
+        return saved
+
+    def delete_thread(self, thread_id):
+        """
+        Forgets a thread's checkpoints and pending writes.
+        """
+        self._threads.pop(thread_id, None)
+        self.storage.pop(thread_id, None)
+        for key in [key for key in self.writes if key[0] == thread_id]:
+            del self.writes[key]
+
+    def stats(self):
+        """
+        Returns how many threads, checkpoints and pending writes are held.
+        """
+        return {"threads": len(self.storage), "checkpoints": sum(len(checkpoints) for namespaces in self.storage.values()
+                                                                 for checkpoints in namespaces.values()),
+                "writes": len(self.writes)}
@@ -0,0 +1,191 @@
+import collections, concurrent.futures, json, re, sqlite3, threading, time
+from langchain_core.tools import StructuredTool, tool
+
+MISSING = object()  # returned by SearchCache.get when a query isn't cached
+
+WORD = re.compile(r"\w+")
+
+
+def normalize_query(query, **options):
+    """
+    Builds the cache key of a search: the query's words in lower case, so case, punctuation and spacing
+    don't matter, plus any options that change the results (e.g. max_results).
+    """
+    key = " ".join(WORD.findall(str(query).lower()))
+    if options:
+        key += " |" + json.dumps(options, sort_keys = True, default = str)
+    return key
+
+
+class SearchCache:
+    def __init__(self, ttl = 3600, max_entries = 512, path = None, max_disk_entries = 10000):
+        """
+        Cache of search results: an in-memory LRU whose entries expire after `ttl` seconds, optionally
+        backed by a SQLite file so results survive restarts. The file is pruned as results are written, so
+        it holds at most `max_disk_entries` results and no stale ones.
+
+        Parameters:
+        ttl (float): Seconds a result stays valid; search results go stale, so this is kept short.
+        max_entries (int): Results kept in memory before the least recently used one is evicted.
+        path (str): SQLite file to also keep the results in; None for memory only.
+        max_disk_entries (int): Results kept in the SQLite file before the oldest are dropped.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries = collections.OrderedDict()  # key -> (expiry time, results)
+        self._lock = threading.Lock()
+        self._connection = None
+        if path is not None:
+            self._connection = sqlite3.connect(path, check_same_thread = False)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS search (key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS search_expires ON search (expires)")
+            self._connection.commit()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.disk_expirations = 0
+
+    def get(self, key):
+        """
+        Returns the cached results for the key, or MISSING if they aren't cached or have expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            if self._connection is not None:
+                row = self._connection.execute("SELECT value, expires FROM search WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[1] > time.time():
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, value):
+        """
+        Caches the results of a search.
+        """
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires)
+            if self._connection is not None:
+                self._connection.execute("INSERT OR REPLACE INTO search (key, value, expires) VALUES (?, ?, ?)",
+                                         (key, json.dumps(value, default = str), expires))
+                self._prune_file(expires - self.ttl)
+                self._connection.commit()
+
+    def _remember(self, key, value, expires):
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last = False)
+            self.evictions += 1
+
+    def _prune_file(self, now):
+        """
+        Drops stale results from the SQLite file, then the soonest to expire beyond `max_disk_entries`
+        (with one ttl for all results, those are the ones searched longest ago). Called with the lock held.
+        """
+        self.disk_expirations += self._connection.execute("DELETE FROM search WHERE expires <= ?", (now,)).rowcount
+        excess = self._connection.execute("SELECT COUNT(*) FROM search").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            self.disk_evictions += self._connection.execute(
+                "DELETE FROM search WHERE key IN (SELECT key FROM search ORDER BY expires LIMIT ?)", (excess,)).rowcount
+
+    def stats(self):
+        """
+        Returns the hit ratio, the number of entries in memory, and what was evicted from memory and pruned from disk.
+        """
+        total = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0, "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions, "disk_expirations": self.disk_expirations}
+
+
+class CachedSearch:
+    def __init__(self, search_tool, cache = None):
+        """
+        Wraps a search tool with a SearchCache. Identical searches running at the same time (e.g. two tool
+        calls of one step, which ToolNode runs in parallel threads) share one request to the backend.
+
+        Parameters:
+        search_tool (BaseTool): The search tool, e.g. TavilySearchResults; called with `{"query": ...}`.
+        cache (SearchCache): The cache; a new in-memory one by default.
+        """
+        self.search_tool = search_tool
+        self.cache = cache if cache is not None else SearchCache()
+        self.options = {"tool": search_tool.name, "max_results": getattr(search_tool, "max_results", None)}
+        self.shared = 0  # searches answered by a concurrent identical one
+        self._in_flight = {}  # key -> Future of the running search
+        self._lock = threading.Lock()
+
+    def search(self, query):
+        """
+        Returns the results for the query from the cache, from an identical search in flight, or from the backend.
+        Errors are passed to every waiting caller and not cached, whether the tool raises them or, like
+        TavilySearchResults, returns them as a string instead of a list of results.
+        """
+        key = normalize_query(query, **self.options)
+        results = self.cache.get(key)
+        if results is not MISSING:
+            return results
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = concurrent.futures.Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            results = self.search_tool.invoke({"query": query})
+            if isinstance(results, list):
+                self.cache.set(key, results)
+            future.set_result(results)
+            return results
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def as_tool(self):
+        """
+        Returns the cached search as a tool with the wrapped tool's name, description and arguments, so
+        the model calls it exactly as it would call the original.
+        """
+        return StructuredTool.from_function(func = self.search, name = self.search_tool.name,
+                                            description = self.search_tool.description, args_schema = self.search_tool.args_schema)
+
+
+def stub_search(latency = 0.3, max_results = 2, error = None):
+    """
+    Returns an offline stand-in for TavilySearchResults: same name and arguments, deterministic results
+    after `latency` seconds. The queries it served are kept in its `metadata["queries"]`. With `error`,
+    it returns that string instead, as TavilySearchResults does when the API call fails.
+    """
+    @tool("tavily_search_results_json")
+    def search(query: str) -> list:
+        """A search engine optimized for comprehensive, accurate, and trusted results. Useful for when you need
+        to answer questions about current events. Input should be a search query."""
+        time.sleep(latency)
+        search.metadata["queries"].append(query)
+        if error is not None:
+            return error
+        return [{"url": f"https://example.com/{'-'.join(WORD.findall(query.lower()))}/{i}",
+                 "content": f"Result {i} for '{query}'."} for i in range(max_results)]
+    search.metadata = {"queries": []}
+    return search
@@ -1,58 +1,92 @@
 from dotenv import load_dotenv
 from typing import Annotated
-from langchain_ollama import ChatOllama
-from langchain_community.tools.tavily_search import TavilySearchResults
 # from langchain_core.messages import BaseMessage
 from typing_extensions import TypedDict
 
-from langgraph.graph import StateGraph
+from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode, tools_condition
-
-load_dotenv()
+from memory import MemoryManager, BoundedMemorySaver, llm_summarizer
+from search_cache import CachedSearch, SearchCache, stub_search
+import argparse, uuid
 
 class State(TypedDict):
     messages: Annotated[list, add_messages]
+    summary: str  # running summary of the turns trimmed from `messages`
+
+system_prompt = "You are a helpful assistant that can perform searches and answer questions based on the provided tools. Please try to respond in a friendly and clear manner.\
+        If the user greets you, respond with a greeting. If the user asks a question, try to answer it. If the user asks for help, offer to perform a search."
+
+def build_graph(llm, tools, memory = None, checkpointer = None):
+    """
+    Builds the chatbot graph: the model answers or calls a tool, tool results go back to the model, and
+    once the answer is given the memory manager trims the conversation to its token budget.
+
+    Parameters:
+    llm: The chat model; it is bound to the tools here.
+    tools (list): The tools the model may call.
+    memory (MemoryManager): Keeps the context within a token budget; defaults to 2000 tokens without a summary.
+    checkpointer: Keeps each thread's state between turns (pass `thread_id` in the config); defaults to a BoundedMemorySaver.
+
+    Returns:
+    CompiledStateGraph: The compiled graph.
+    """
+    memory = memory or MemoryManager(system_prompt)
+    llm_with_tools = llm.bind_tools(tools)
+
+    def chatbot(state: State):
+        # the system prompt is added to the window sent to the model, never to the stored history
+        return {"messages": [llm_with_tools.invoke(memory.window(state["messages"], state.get("summary", "")))]}
+
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_node("tools", ToolNode(tools = tools))
+    graph_builder.add_node("memory", memory.prune)
+
+    graph_builder.add_conditional_edges(
+        "chatbot",
+        tools_condition,
+        {"tools": "tools", END: "memory"},
+    )
+    # any time a tool is called, we return to the chatbot to decide the next step
+    graph_builder.add_edge("tools", "chatbot")
+    graph_builder.add_edge("memory", END)
+    graph_builder.set_entry_point("chatbot")
+    return graph_builder.compile(checkpointer = checkpointer if checkpointer is not None else BoundedMemorySaver())
+
+if __name__ == "__main__":
+    from langchain_ollama import ChatOllama
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+    parser = argparse.ArgumentParser(description = "Chat with the Tavily search agent in the terminal.")
+    parser.add_argument("--max-tokens", type = int, default = 2000, help = "token budget of the context sent to the model")
+    parser.add_argument("--summarize", action = "store_true", help = "summarize trimmed turns instead of dropping them (one extra model call per trim)")
+    parser.add_argument("--thread", default = None, help = "conversation id; defaults to a new one")
+    parser.add_argument("--search-cache", default = None, help = "SQLite file that keeps search results across restarts")
+    parser.add_argument("--search-ttl", type = float, default = 3600, help = "seconds a cached search result stays valid")
+    parser.add_argument("--max-parallel-tools", type = int, default = 4, help = "tool calls of one step run at the same time")
+    parser.add_argument("--offline", action = "store_true", help = "use a local stub instead of the Tavily API")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    search = stub_search() if args.offline else TavilySearchResults(max_results = 2)
+    tool = CachedSearch(search, SearchCache(ttl = args.search_ttl, path = args.search_cache)).as_tool()
+    llm = ChatOllama(model = "llama3.2:3b", temperature = 0.2)
+    memory = MemoryManager(system_prompt, max_tokens = args.max_tokens, summarizer = llm_summarizer(llm) if args.summarize else None)
+    graph = build_graph(llm, [tool], memory)
+    # ToolNode runs the tool calls of one step in parallel threads, up to max_concurrency at a time
+    config = {"configurable": {"thread_id": args.thread or str(uuid.uuid4())}, "max_concurrency": args.max_parallel_tools}
+
+    while True:
+        user_input = input("User: ")
+        if user_input.lower() in ["quit", "exit", "q"]:
+            print("Goodbye!")
+            break
 
-graph_builder = StateGraph(State)
-
-tool = TavilySearchResults(max_results = 2)
-tools = [tool]
-llm = ChatOllama(model = "llama3.2:3b", temperature = 0.2)
-llm_with_tools = llm.bind_tools(tools)
-
-system_prompt = {
-    "role": "system",
-    "content": "You are a helpful assistant that can perform searches and answer questions based on the provided tools. Please try to respond in a friendly and clear manner.\
-        If the user greets you, respond with a greeting. If the user asks a question, try to answer it. If the user asks for help, offer to perform a search.",
-}
-
-def chatbot(state: State):
-    state["messages"].insert(0, system_prompt)
-    return {"messages": [llm_with_tools.invoke(state["messages"])]}
-
-graph_builder.add_node("chatbot", chatbot)
-
-tool_node = ToolNode(tools = [tool])
-graph_builder.add_node("tools", tool_node)
-
-graph_builder.add_conditional_edges(
-    "chatbot",
-    tools_condition,
-)
-# any time a tool is called, we return to the chatbot to decide the next step
-graph_builder.add_edge("tools", "chatbot")
-graph_builder.set_entry_point("chatbot")
-graph = graph_builder.compile()
-
-while True:
-    user_input = input("User: ")
-    if user_input.lower() in ["quit", "exit", "q"]:
-        print("Goodbye!")
-        break
-
-    # process user input through langgraph
-    for event in graph.stream({"messages": [("user", user_input)]}):
-        print(event)
-        for value in event.values():
-            print("Assistant:", value["messages"][-1].content)
\ No newline at end of file
+        # process user input through langgraph; only the new message is sent, the checkpointer holds the history
+        for event in graph.stream({"messages": [("user", user_input)]}, config):
+            print(event)
+            for node, value in event.items():
+                if node != "memory" and value:
+                    print("Assistant:", value["messages"][-1].content)